@@ -0,0 +1,138 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple, TypeVar
+import pandas as pd
+
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+
+# how many client calls run at the same time, each on its own thread of the client executor.
+# NOTE: the threads mostly wait on the api, so this is well above the cpu count. Each call may have
+# up to max_in_flight (4) queries of the sync client in flight, so 64 calls is at most 256 queries
+# at the same time, past that the rate limit of the transport is what bounds a backfill of
+# hundreds of nodes and more threads only wait on it.
+MAX_CONCURRENCY = 64
+
+T = TypeVar("T")
+
+
+class AsyncGridStatusPriceClient:
+    """
+    The asyncio flavour of GridStatusPriceClient, so one event loop can drive many
+    node/market requests at the same time.
+    NOTE: the gridstatusio client and the parquet cache are blocking, so every call runs the
+    sync client on a thread of an executor of max_concurrency threads owned by the client (cache
+    reads and writes included), and neither the event loop nor the default executor of the loop
+    (min(32, cpu + 4) threads) is blocked. At most max_concurrency calls run at the same time, the
+    rest wait on the semaphore. The single flight and the cache key locks of the sync client still
+    apply, so concurrent requests for the same node share one fetch.
+    Call close (or use it as an async context manager) to stop the threads.
+    """
+
+    def __init__(
+        self,
+        price_client: GridStatusPriceClient = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be at least 1")
+        self.price_client = price_client or GridStatusPriceClient()
+        self.max_concurrency = max_concurrency
+        # the threads are only started when there is work for them
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="gridstatus-async")
+        # NOTE: on python 3.9 a semaphore is bound to the loop it is created in,
+        # so we make one per event loop instead of in here
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    async def get_energy_price_actual_with_cache(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        node: str,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        return await self._run(
+            self.price_client.get_energy_price_actual_with_cache,
+            iso, market_type, price_type, node, start_time, end_time,
+        )
+
+    async def get_energy_price_actual_many_with_cache(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        nodes: List[str],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> Dict[str, pd.DataFrame]:
+        return await self._run(
+            self.price_client.get_energy_price_actual_many_with_cache,
+            iso, market_type, price_type, nodes, start_time, end_time,
+        )
+
+    async def get_as_price_actual_with_cache(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_types: List[PriceType],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        return await self._run(
+            self.price_client.get_as_price_actual_with_cache,
+            iso, market_type, price_types, start_time, end_time,
+        )
+
+    async def get_energy_price_actual(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        node: str,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        return await self._run(
+            self.price_client.get_energy_price_actual,
+            iso, market_type, price_type, node, start_time, end_time,
+        )
+
+    async def gather_energy_price_actual_with_cache(
+        self,
+        iso: ISOType,
+        requests: List[Tuple[MarketType, PriceType, str, datetime, datetime]],
+    ) -> List[pd.DataFrame]:
+        """
+        runs the (market_type, price_type, node, start_time, end_time) requests concurrently,
+        the results are in the same order as the requests.
+        """
+        return list(await asyncio.gather(*[
+            self.get_energy_price_actual_with_cache(iso, *request) for request in requests
+        ]))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncGridStatusPriceClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    async def _run(self, fn: Callable[..., T], *args) -> T:
+        async with self._semaphore():
+            return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            # drop the semaphores of the loops that are gone, e.g. from earlier asyncio.run calls
+            self._semaphores = {
+                other: semaphore for other, semaphore in self._semaphores.items() if not other.is_closed()
+            }
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
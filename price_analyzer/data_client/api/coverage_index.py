@@ -0,0 +1,90 @@
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from price_analyzer.utils.timestamps import to_ns
+
+
+class CoverageIndex:
+    """
+    Sorted, non-overlapping [start, end) ranges (epoch nanoseconds, UTC) that we have
+    prices for in the cache of one node. It is kept next to the cache in the manifest so
+    finding the missing periods of a window is a bisect on the ranges instead of a scan
+    over the cached records.
+    """
+
+    def __init__(self, starts: List[int] = None, ends: List[int] = None):
+        self._starts: List[int] = list(starts or [])
+        self._ends: List[int] = list(ends or [])
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, value_column: Union[str, List[str]] = "price") -> "CoverageIndex":
+        """
+        builds the index from the intervals of the records that have a value,
+        with many value columns (the wide AS records) any of them having a value is enough.
+        """
+        if isinstance(value_column, str):
+            valid = df[value_column].notnull()
+        else:
+            valid = df[value_column].notnull().any(axis=1)
+        starts = pd.DatetimeIndex(df.loc[valid, "interval_start_utc"]).as_unit("ns").asi8
+        ends = pd.DatetimeIndex(df.loc[valid, "interval_end_utc"]).as_unit("ns").asi8
+        return cls._from_ranges(starts, ends)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List[int]]) -> "CoverageIndex":
+        return cls(data["starts"], data["ends"])
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return {"starts": list(self._starts), "ends": list(self._ends)}
+
+    def union(self, other: "CoverageIndex") -> "CoverageIndex":
+        return self._from_ranges(
+            np.asarray(self._starts + other._starts, dtype=np.int64),
+            np.asarray(self._ends + other._ends, dtype=np.int64),
+        )
+
+    def missing(self, start_time: datetime, end_time: datetime) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Returns the [start, end) periods within the window that are not covered.
+        """
+        start, end = to_ns(start_time), to_ns(end_time)
+        missing_ranges = []
+        cursor = start
+
+        # first range that ends after the window start, from there we walk until the window end
+        i = bisect_right(self._ends, start)
+        while i < len(self._starts) and self._starts[i] < end:
+            if self._starts[i] > cursor:
+                missing_ranges.append((cursor, self._starts[i]))
+            cursor = max(cursor, self._ends[i])
+            i += 1
+        if cursor < end:
+            missing_ranges.append((cursor, end))
+
+        return [(_to_timestamp(gap_start), _to_timestamp(gap_end)) for gap_start, gap_end in missing_ranges]
+
+    @classmethod
+    def _from_ranges(cls, starts: np.ndarray, ends: np.ndarray) -> "CoverageIndex":
+        if len(starts) == 0:
+            return cls()
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+
+        # a range starts a new block if it begins after everything before it has ended
+        running_end = np.maximum.accumulate(ends)
+        is_block_start = np.ones(len(starts), dtype=bool)
+        is_block_start[1:] = starts[1:] > running_end[:-1]
+        block_starts = np.flatnonzero(is_block_start)
+        block_lasts = np.append(block_starts[1:] - 1, len(starts) - 1)
+
+        return cls(starts[block_starts].tolist(), running_end[block_lasts].tolist())
+
+
+def _to_timestamp(value: int) -> pd.Timestamp:
+    return pd.Timestamp(value, tz="UTC")
@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+
+@dataclass
+class FetchCostModel:
+    """
+    a rough cost of a query, a fixed cost per request (latency, rate limits)
+    and a cost per record we download.
+    """
+    request_cost_seconds: float = 0.5
+    row_cost_seconds: float = 0.0005
+
+
+@dataclass
+class FetchPlan:
+    missing_periods: List[Tuple[datetime, datetime]]
+    periods: List[Tuple[datetime, datetime]] = field(default_factory=list)
+    redundant_rows: int = 0
+    estimated_cost_seconds: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.missing_periods)} missing periods in {len(self.periods)} requests, "
+            f"{self.redundant_rows} cached records downloaded again, "
+            f"estimated cost {self.estimated_cost_seconds:.2f}s"
+        )
+
+
+def plan_fetches(
+    missing_periods: List[Tuple[datetime, datetime]],
+    interval: timedelta,
+    cost_model: FetchCostModel,
+    locations_count: int = 1,
+) -> FetchPlan:
+    """
+    Plans the requests for the missing periods, two neighbouring gaps are fetched in one
+    request when downloading the cached records between them again is cheaper than
+    another request. Each merge decision only depends on the span between the two gaps,
+    so walking the gaps in order once gives the cheapest plan for this cost model.
+    """
+    plan = FetchPlan(missing_periods=list(missing_periods))
+    if not missing_periods:
+        return plan
+
+    ordered = sorted(missing_periods)
+    periods = [ordered[0]]
+    for start, end in ordered[1:]:
+        last_start, last_end = periods[-1]
+        between_rows = max(int((start - last_end) / interval), 0) * locations_count
+        if between_rows * cost_model.row_cost_seconds < cost_model.request_cost_seconds:
+            periods[-1] = (last_start, max(last_end, end))
+            plan.redundant_rows += between_rows
+        else:
+            periods.append((start, end))
+
+    total_rows = sum(int((end - start) / interval) for start, end in periods) * locations_count
+    plan.periods = periods
+    plan.estimated_cost_seconds = (
+        len(periods) * cost_model.request_cost_seconds + total_rows * cost_model.row_cost_seconds
+    )
+    return plan
@@ -1,24 +1,69 @@
 import os
-from datetime import datetime
-from typing import Tuple, Dict
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Tuple, TypeVar, Union
 import pandas as pd
 from zoneinfo import ZoneInfo
 from gridstatusio import GridStatusClient
 
 from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
-from price_analyzer.data_client.api.persist_cache import get_cache_file, get_missing_periods, persist_cache_file
+from price_analyzer.data_client.api.fetch_planner import FetchCostModel, FetchPlan, plan_fetches
+from price_analyzer.data_client.api.single_flight import SingleFlight
+from price_analyzer.data_client.api.transport import RetryingTransport
+from price_analyzer.data_client.api.persist_cache import (
+    get_cache_dir,
+    get_cache_file,
+    get_coverage_index,
+    get_missing_periods,
+    append_cache_segment,
+    merge_cache_frames,
+    compact_frame,
+    PRICE_DTYPES,
+    AS_PRICE_TYPES,
+    AS_CACHE_NODE,
+)
 
 QUERY_LIMIT = 10_000
 
+# how many queries for the missing periods we keep in flight at the same time
+MAX_IN_FLIGHT = 4
+
+# default length of the chunks the iterators yield, about a month keeps a chunk of 5 min LMPs
+# for a few nodes in the tens of MBs
+CHUNK_LENGTH = timedelta(days=30)
+
 UTC = ZoneInfo("UTC")
 
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# shared by all the clients, since they all write to the same cache volume
+CACHE_FILLS = SingleFlight()
+
 PRICE_DATA_NAME_MAP: Dict[Tuple[MarketType, PriceType], str] = {
     (MarketType.DAM, PriceType.SPP): "ercot_spp_day_ahead_hourly",
     (MarketType.RTM, PriceType.SPP): "ercot_spp_real_time_15_min",
     (MarketType.RTM, PriceType.LMP): "ercot_lmp_by_settlement_point",
     (MarketType.DAM, PriceType.LMP): "ercot_lmp_by_bus_dam",  # NOTE: usually we care about the three above
+    # all the AS products are columns of the same table
+    (MarketType.DAM, PriceType.REGUP): "ercot_as_prices",
+    (MarketType.DAM, PriceType.REGDOWN): "ercot_as_prices",
+    (MarketType.DAM, PriceType.RRS): "ercot_as_prices",
 }
 
+# interval length of the records in each dataset, used to plan query windows under QUERY_LIMIT
+DATASET_INTERVAL_MINUTES: Dict[str, int] = {
+    "ercot_spp_day_ahead_hourly": 60,
+    "ercot_spp_real_time_15_min": 15,
+    "ercot_lmp_by_settlement_point": 5,
+    "ercot_lmp_by_bus_dam": 60,
+    "ercot_as_prices": 60,
+}
+
+AS_KEY_COLUMNS = ["interval_start_utc", "interval_end_utc", "market"]
+
 
 
 
@@ -26,6 +71,10 @@ class GridStatusPriceClient:
     def __init__(
         self,
         api_clinet: GridStatusClient = None,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        fetch_cost_model: FetchCostModel = None,
+        transport: RetryingTransport = None,
+        price_dtype: str = "float64",
     ):
         # NOTE: we usualy prefer to pass the api_client and not instantiate it within the class
         # but here to make things easier, we add the option to make it optional.
@@ -41,6 +90,20 @@ class GridStatusPriceClient:
            
         else:
             self.client = api_clinet
+
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight should be at least 1")
+        self.max_in_flight = max_in_flight
+        self.fetch_cost_model = fetch_cost_model or FetchCostModel()
+        # the plan of the last cache fill, to see how the missing periods were fetched
+        self.last_fetch_plan: FetchPlan = None
+        # all the queries go through the transport, for rate limiting, retries and the request budget,
+        # pass one to tune these for a backfill, the default one only retries
+        self.transport = transport or RetryingTransport(self.client)
+        if price_dtype not in PRICE_DTYPES:
+            raise ValueError(f"price_dtype should be one of {PRICE_DTYPES}")
+        # NOTE: float32 is plenty for $/MWh prices and halves the price column, in memory and in the cache
+        self.price_dtype = price_dtype
     
     
 
@@ -56,52 +119,257 @@ class GridStatusPriceClient:
         # this is a wrapper for the get_energy_price_actual method
         # the caching purpose is to avoid query for the same records
         # of price
-        cache_file = get_cache_file(
+        return self._get_with_cache(iso, market_type, price_type, node, start_time, end_time)
+
+    def get_as_price_actual_with_cache(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_types: List[PriceType],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        """
+        the AS prices of all the products come in one wide record per interval, so they are fetched
+        and cached together and any number of products is one cache read (and at most one fill).
+        Returns interval_start_utc, interval_end_utc, market and a column per product
+        named like the PriceType value e.g. regulation_up.
+        """
+        if not price_types or any(price_type not in AS_PRICE_TYPES for price_type in price_types):
+            raise ValueError(f"price_types should be some of {AS_PRICE_TYPES}")
+        # NOTE: all the products map to the same dataset and cache key, so the first one stands for all
+        _construct_dataset_name(iso, market_type, price_types[0])
+
+        records = self._get_with_cache(iso, market_type, price_types[0], AS_CACHE_NODE, start_time, end_time)
+        return records.reindex(columns=AS_KEY_COLUMNS + [price_type.value for price_type in price_types])
+
+    def _get_with_cache(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        node: str,
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        coverage = get_coverage_index(
             iso=iso,
             market_type=market_type,
             price_type=price_type,
             node=node,
         )
         missing_periods = get_missing_periods(
-            cache_file,
+            coverage,
             start_time,
             end_time,
         )
+        cache_file = get_cache_file(
+            iso=iso,
+            market_type=market_type,
+            price_type=price_type,
+            node=node,
+            start_time=start_time,
+            end_time=end_time,
+        )
 
         if not missing_periods:
             # return the portion of the cache file that is within the start_time and end_time
-            return cache_file[
+            return self._compact(cache_file[
                 (cache_file['interval_start_utc'] >= start_time) &
                 (cache_file['interval_end_utc'] <= end_time)
-            ]
+            ])
+
+
+        # concurrent callers for the same node and gaps share one fetch and one cache write,
+        # the key is the cache dir so the AS products share it too
+        new_records = CACHE_FILLS.do(
+            (get_cache_dir(iso, market_type, price_type, node), tuple(missing_periods)),
+            lambda: self._fill_missing_periods(iso, market_type, price_type, node, missing_periods),
+        )
+
+        cache_file = merge_cache_frames([cache_file, new_records])
+        return self._compact(cache_file[
+            (cache_file['interval_start_utc'] >= start_time) &
+            (cache_file['interval_end_utc'] <= end_time)
+        ])
+
+
+    def iter_energy_price_actual_chunks(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        node: str,
+        start_time: datetime,
+        end_time: datetime,
+        chunk: timedelta = CHUNK_LENGTH,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        the same as get_energy_price_actual_with_cache, but yields the window in time ordered
+        chunks of at most chunk length, so a long history never has to be in memory at once.
+        The next chunk is fetched (from the cache or the api) while the current one is processed.
+        """
+        return _iter_chunks(
+            lambda chunk_start, chunk_end: self.get_energy_price_actual_with_cache(
+                iso, market_type, price_type, node, chunk_start, chunk_end,
+            ),
+            start_time,
+            end_time,
+            chunk,
+        )
+
+    def iter_energy_price_actual_many_chunks(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        nodes: List[str],
+        start_time: datetime,
+        end_time: datetime,
+        chunk: timedelta = CHUNK_LENGTH,
+    ) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        the same as iter_energy_price_actual_chunks for many nodes, each chunk is keyed by node.
+        """
+        return _iter_chunks(
+            lambda chunk_start, chunk_end: self.get_energy_price_actual_many_with_cache(
+                iso, market_type, price_type, nodes, chunk_start, chunk_end,
+            ),
+            start_time,
+            end_time,
+            chunk,
+        )
+
+    def _fill_missing_periods(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        node: str,
+        missing_periods: List[Tuple[datetime, datetime]],
+    ) -> pd.DataFrame:
+        # the missing periods are independent, so we query them concurrently
+        fetched = self._fetch_periods(
+            iso=iso,
+            market_type=market_type,
+            price_type=price_type,
+            # the AS prices are system wide, there is no location to filter on
+            nodes=None if price_type in AS_PRICE_TYPES else node,
+            periods=missing_periods,
+        )
+
+        # only the fetched records are appended to the cache, so the write does not
+        # grow with the size of the cache, the planner may have fetched some cached
+        # records again to save requests, those are left out
+        new_records = merge_cache_frames([_select_periods(fetched, missing_periods)])
+        append_cache_segment(
+            df=new_records,
+            iso=iso,
+            market_type=market_type,
+            price_type=price_type,
+            node=node,
+        )
+        return new_records
 
+    def get_energy_price_actual_many_with_cache(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        nodes: List[str],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        the same as get_energy_price_actual_with_cache but for many nodes, the missing periods
+        of all the nodes are queried together in one dataset query for all the nodes that miss
+        something, then the results are split by location and each node cache is written once.
+        """
+        missing_by_node = {
+            node: get_missing_periods(
+                get_coverage_index(iso=iso, market_type=market_type, price_type=price_type, node=node),
+                start_time,
+                end_time,
+            )
+            for node in nodes
+        }
+        nodes_to_fetch = [node for node in nodes if missing_by_node[node]]
 
-        for start, end in missing_periods:
-            # we will query the api for the missing periods
-            results = self.get_energy_price_actual(
+        fetched_by_node: Dict[str, pd.DataFrame] = {}
+        if nodes_to_fetch:
+            fetched = self._fetch_periods(
+                iso=iso,
+                market_type=market_type,
+                price_type=price_type,
+                nodes=nodes_to_fetch,
+                periods=_merge_periods([
+                    period for node in nodes_to_fetch for period in missing_by_node[node]
+                ]),
+            )
+            fetched_by_node = _split_by_location(fetched, nodes_to_fetch)
+
+        results = {}
+        for node in nodes:
+            cache_file = get_cache_file(
                 iso=iso,
                 market_type=market_type,
                 price_type=price_type,
                 node=node,
-                start_time=start,
-                end_time=end,
+                start_time=start_time,
+                end_time=end_time,
             )
-            # append the results to the cache file
-            cache_file = pd.concat([cache_file, results], ignore_index=True)
-        
-        persist_cache_file(
-            df=cache_file,
-            iso=iso,
-            market_type=market_type,
-            price_type=price_type,
-            node=node,
+            if node in fetched_by_node:
+                # the shared query may overlap what this node already has, we only keep its own gaps
+                new_records = merge_cache_frames([
+                    _select_periods(fetched_by_node[node], missing_by_node[node])
+                ])
+                append_cache_segment(
+                    df=new_records,
+                    iso=iso,
+                    market_type=market_type,
+                    price_type=price_type,
+                    node=node,
+                )
+                cache_file = merge_cache_frames([cache_file, new_records])
+
+            results[node] = self._compact(cache_file[
+                (cache_file['interval_start_utc'] >= start_time) &
+                (cache_file['interval_end_utc'] <= end_time)
+            ])
+        return results
+
+    def _fetch_periods(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        nodes: Union[str, List[str], None],
+        periods: List[Tuple[datetime, datetime]],
+    ) -> pd.DataFrame:
+        """
+        queries the periods with at most max_in_flight queries at the same time,
+        the results are stitched in the same order as the periods.
+        Nearby periods are coalesced first by the fetch planner, when fetching the cached
+        records between them again is cheaper than one more request.
+        """
+        data_set_name: str = _construct_dataset_name(iso, market_type, price_type)
+        plan = plan_fetches(
+            periods,
+            _dataset_interval(data_set_name),
+            self.fetch_cost_model,
+            _locations_count(nodes),
         )
-        
-        return cache_file[
-            (cache_file['interval_start_utc'] >= start_time) &
-            (cache_file['interval_end_utc'] <= end_time)
-        ]
+        self.last_fetch_plan = plan
+        logger.info("fetch plan for %s %s: %s", data_set_name, nodes, plan)
 
+        # the periods are planned into query windows all together, so a long period
+        # and a few short ones share the same max_in_flight bound
+        windows = [
+            window for start, end in plan.periods
+            for window in _plan_query_windows(data_set_name, start, end, _locations_count(nodes))
+        ]
+        results = self._query_windows(data_set_name, nodes, windows)
+        return _reformat_results(results, price_type, self.price_dtype)
 
     def get_energy_price_actual(
         self,
@@ -116,6 +384,8 @@ class GridStatusPriceClient:
         This is an implementation to get_price_actual from gridstatus.io api
         the time stamps should be in UTC, this is used for backend!
         also here we limit this query to one node at a time.
+        The window is split into query windows that stay under QUERY_LIMIT records,
+        based on the interval length of the dataset, and the results are stitched back together.
         """
         # NOTE: looks like that there is the client only returns dataframes
         # I thought there is a parameter to receive a json/dict response
@@ -124,16 +394,95 @@ class GridStatusPriceClient:
         _validate_inputs(price_type, node, start_time, end_time)
         
         data_set_name: str = _construct_dataset_name(iso, market_type, price_type)
+        windows = _plan_query_windows(data_set_name, start_time, end_time)
+        results = self._query_windows(data_set_name, node, windows)
+        return _reformat_results(results, price_type, self.price_dtype)
+
+    def get_energy_price_actual_many(
+        self,
+        iso: ISOType,
+        market_type: MarketType,
+        price_type: PriceType,
+        nodes: List[str],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        the same as get_energy_price_actual but for many nodes in one dataset query,
+        the results are split by location.
+        """
+        for node in nodes:
+            _validate_inputs(price_type, node, start_time, end_time)
+
+        data_set_name: str = _construct_dataset_name(iso, market_type, price_type)
+        windows = _plan_query_windows(data_set_name, start_time, end_time, len(nodes))
+        results = self._query_windows(data_set_name, nodes, windows)
+        return _split_by_location(_reformat_results(results, price_type, self.price_dtype), nodes)
+
+    def _compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        # the cache may hold float64 prices written before the client asked for float32
+        return compact_frame(df, self.price_dtype)
+
+    def _query_windows(
+        self,
+        data_set_name: str,
+        nodes: Union[str, List[str], None],
+        windows: List[Tuple[datetime, datetime]],
+    ) -> pd.DataFrame:
+        """
+        queries the windows with at most max_in_flight queries at the same time
+        and stitches the results in time order.
+        """
+        def query(window: Tuple[datetime, datetime]) -> pd.DataFrame:
+            return self._query_window(data_set_name, nodes, *window)
+
+        if self.max_in_flight == 1 or len(windows) <= 1:
+            results = [query(window) for window in windows]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(windows))) as executor:
+                results = list(executor.map(query, windows))
+
+        results = [result for result in results if not result.empty]
+        if not results:
+            return pd.DataFrame()
+        return pd.concat(results, ignore_index=True)
+
+    def _query_window(
+        self,
+        data_set_name: str,
+        nodes: Union[str, List[str], None],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
         start_ts, end_ts = _convert_to_timestamps(start_time, end_time)
-        results: pd.DataFrame =  self.client.get_dataset(
+        filter_kwargs = {}
+        if isinstance(nodes, str):
+            filter_kwargs.update(filter_column="location", filter_value=nodes)
+        elif nodes is not None:
+            filter_kwargs.update(filter_column="location", filter_value=list(nodes), filter_operator="in")
+        results: pd.DataFrame = self.transport.get_dataset(
             dataset=data_set_name,
             start=start_ts,
             end=end_ts,
             limit=QUERY_LIMIT,
-            filter_column="location",
-            filter_value=node,
+            **filter_kwargs,
         )
-        return _reformat_results(results, price_type)
+        if len(results) < QUERY_LIMIT:
+            return results
+
+        # we got a full page, so the results are probably truncated, we split the window
+        # in half (on the dataset intervals) and query the halves instead
+        interval = _dataset_interval(data_set_name)
+        half_intervals = ((end_time - start_time) // interval) // 2
+        if half_intervals < 1:
+            raise RuntimeError(
+                f"query for {data_set_name} {start_ts} to {end_ts} is truncated at {QUERY_LIMIT} records"
+            )
+        middle = start_time + half_intervals * interval
+        return pd.concat([
+            self._query_window(data_set_name, nodes, start_time, middle),
+            self._query_window(data_set_name, nodes, middle, end_time),
+        ], ignore_index=True)
         
 
     def get_as_price_actual(
@@ -143,20 +492,125 @@ class GridStatusPriceClient:
         start_time: datetime,
         end_time: datetime,
     ) -> pd.DataFrame:
-        raise NotImplementedError("this method is not implemented yet")
-        # NOTE: so I have to come back to this but based on the question it seems we only care about 
-        # energy prices, but here is one note, for the service we probably not going to do per product
-        # query, since this returns all of the as prices in different columns.
-        # table name is ercot_as_prices
+        """
+        the AS prices from the api without the cache, as the wide records of ercot_as_prices,
+        a column per product. for the service we do not query per product,
+        see get_as_price_actual_with_cache.
+        """
+        data_set_name: str = _construct_dataset_name(iso, market_type, AS_PRICE_TYPES[0])
+        windows = _plan_query_windows(data_set_name, start_time, end_time)
+        results = self._query_windows(data_set_name, None, windows)
+        return _reformat_results(results, AS_PRICE_TYPES[0], self.price_dtype)
 
 
-def _reformat_results(results: pd.DataFrame, price_type: PriceType) -> pd.DataFrame:
+def _reformat_results(results: pd.DataFrame, price_type: PriceType, price_dtype: str = "float64") -> pd.DataFrame:
     # here I want to change the column "spp" or "lmp" to "price"
     if price_type == PriceType.SPP:
         results.rename(columns={"spp": "price"}, inplace=True)
     elif price_type == PriceType.LMP:
         results.rename(columns={"lmp": "price"}, inplace=True)
-    return results       
+    # and we only keep the columns we cache, with the repeated strings as categoricals
+    return compact_frame(results, price_dtype)
+
+def _split_by_location(results: pd.DataFrame, nodes: List[str]) -> Dict[str, pd.DataFrame]:
+    """ this function splits the results of a many nodes query by location,
+    nodes without any record get an empty frame.
+    """
+    if results.empty:
+        return {node: results for node in nodes}
+    by_location = dict(list(results.groupby("location", sort=False, observed=True)))
+    return {
+        node: by_location[node].reset_index(drop=True) if node in by_location else results.iloc[0:0]
+        for node in nodes
+    }
+
+def _select_periods(df: pd.DataFrame, periods: List[Tuple[datetime, datetime]]) -> pd.DataFrame:
+    if df.empty:
+        return df
+    interval_start = pd.to_datetime(df["interval_start_utc"], utc=True)
+    mask = pd.Series(False, index=df.index)
+    for start, end in periods:
+        mask |= (interval_start >= start) & (interval_start < end)
+    return df[mask]
+
+def _merge_periods(periods: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """ this function merges overlapping or touching periods into one.
+    """
+    merged = []
+    for start, end in sorted(periods):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _chunk_windows(start_time: datetime, end_time: datetime, chunk: timedelta) -> List[Tuple[datetime, datetime]]:
+    if chunk <= timedelta(0):
+        raise ValueError("chunk should be a positive timedelta")
+    windows = []
+    chunk_start = start_time
+    while chunk_start < end_time:
+        chunk_end = min(chunk_start + chunk, end_time)
+        windows.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    return windows
+
+def _iter_chunks(
+    fetch: Callable[[datetime, datetime], T],
+    start_time: datetime,
+    end_time: datetime,
+    chunk: timedelta,
+) -> Iterator[T]:
+    """ this function yields fetch for each chunk window in order, with one chunk fetched ahead
+    on a single worker, so at most two chunks are in memory at the same time.
+    """
+    # the windows are checked here and not in the generator, so a bad chunk fails on the call
+    windows = _chunk_windows(start_time, end_time, chunk)
+
+    def generate() -> Iterator[T]:
+        if not windows:
+            return
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            next_result = executor.submit(fetch, *windows[0])
+            for next_window in windows[1:]:
+                result = next_result.result()
+                next_result = executor.submit(fetch, *next_window)
+                yield result
+            yield next_result.result()
+        finally:
+            # when the caller stops early we do not wait on a chunk nobody will look at
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return generate()
+
+def _locations_count(nodes: Union[str, List[str], None]) -> int:
+    return 1 if nodes is None or isinstance(nodes, str) else len(nodes)
+
+def _dataset_interval(data_set_name: str) -> timedelta:
+    return timedelta(minutes=DATASET_INTERVAL_MINUTES[data_set_name])
+
+
+def _plan_query_windows(
+    data_set_name: str,
+    start_time: datetime,
+    end_time: datetime,
+    locations_count: int = 1,
+) -> List[Tuple[datetime, datetime]]:
+    """ this function splits the window into query windows that each return less than
+    QUERY_LIMIT records, so a full page always means the query was truncated.
+    """
+    interval = _dataset_interval(data_set_name)
+    intervals_per_window = max((QUERY_LIMIT - 1) // locations_count, 1)
+    window_length = intervals_per_window * interval
+
+    windows = []
+    window_start = start_time
+    while window_start < end_time:
+        window_end = min(window_start + window_length, end_time)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
 
 def _convert_to_timestamps(start_time: datetime, end_time: datetime) -> Tuple[str, str]:
     """ this function converts the datetime objects to timestamps in isoforamt
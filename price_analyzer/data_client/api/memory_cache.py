@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, Optional
+import pandas as pd
+
+from price_analyzer.utils.timestamps import to_utc
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class MemoryCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class _Entry:
+    frame: pd.DataFrame
+    generation: int
+    start_time: Optional[pd.Timestamp]
+    end_time: Optional[pd.Timestamp]
+    size_bytes: int
+
+
+class LRUFrameCache:
+    """
+    A bounded in-memory tier in front of the on disk price cache.
+    We keep one frame per cache key with the window it was loaded for and the
+    generation of the cache at that time, so a request is served from memory only
+    if the window is inside the loaded one and nothing was written since.
+    When the total size passes max_bytes the least recently used frames are dropped.
+    NOTE: the frames are shared with the callers, so they should not be modified in place.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.stats = MemoryCacheStats()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def size_of(self, key: Hashable) -> int:
+        """
+        the memory footprint of the frame kept for a key, 0 if there is none.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.size_bytes if entry is not None else 0
+
+    def sizes(self) -> Dict[Hashable, int]:
+        with self._lock:
+            return {key: entry.size_bytes for key, entry in self._entries.items()}
+
+    def get(
+        self,
+        key: Hashable,
+        generation: int,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.generation != generation or not _covers(entry, to_utc(start_time), to_utc(end_time)):
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry.frame
+
+    def put(
+        self,
+        key: Hashable,
+        generation: int,
+        frame: pd.DataFrame,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> None:
+        size_bytes = int(frame.memory_usage(deep=True).sum())
+        with self._lock:
+            self._remove(key)
+            if size_bytes > self.max_bytes:
+                # no point in flushing everything else for a frame that does not fit
+                return
+
+            self._entries[key] = _Entry(frame, generation, to_utc(start_time), to_utc(end_time), size_bytes)
+            self._size_bytes += size_bytes
+            while self._size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.size_bytes
+                self.stats.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        drops the frame of a key, or everything if the key is not given.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._size_bytes = 0
+            else:
+                self._remove(key)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry.size_bytes
+
+
+def _covers(entry: _Entry, start_time: Optional[pd.Timestamp], end_time: Optional[pd.Timestamp]) -> bool:
+    # None on the entry side means it was loaded without a bound on that side
+    if entry.start_time is not None and (start_time is None or start_time < entry.start_time):
+        return False
+    if entry.end_time is not None and (end_time is None or end_time > entry.end_time):
+        return False
+    return True
@@ -1,9 +1,15 @@
+import os
+import json
+from dataclasses import dataclass
 from pathlib import Path
 import pandas as pd
-from typing import  List, Tuple 
+from typing import  List, Tuple, Optional, Dict, Any
 from datetime import datetime
 
 from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+from price_analyzer.data_client.api.memory_cache import LRUFrameCache
+from price_analyzer.data_client.api.coverage_index import CoverageIndex
+from price_analyzer.data_client.api.single_flight import cache_key_lock
 
 CACHE_VOLUME_PATH = Path(__file__).parent / "data_store_volume"
 
@@ -16,14 +22,84 @@ COLUMN_NAMES = [
     "price",
 ]
 
-def get_cache_file_path(
+# the ancillary service prices come as one wide record per interval with a column per product,
+# named like the PriceType values, they are cached as they are under one key for all the products
+AS_PRODUCT_COLUMNS = [
+    "regulation_up",
+    "regulation_down",
+    "responsive_reserves",
+    "non_spinning_reserves",
+    "ecrs",
+]
+
+AS_COLUMN_NAMES = [
+    "interval_start_utc",
+    "interval_end_utc",
+    "market",
+] + AS_PRODUCT_COLUMNS
+
+AS_PRICE_TYPES = [PriceType.REGUP, PriceType.REGDOWN, PriceType.RRS]
+
+# all the AS products share this price dir, and the prices are system wide so they go under one node
+AS_CACHE_PRICE_DIR = "AS"
+AS_CACHE_NODE = "SYSTEM"
+
+TIMESTAMP_COLUMNS = ["interval_start_utc", "interval_end_utc"]
+
+# the same few strings on every record, so they are stored as categoricals (dictionary encoded in parquet)
+CATEGORICAL_COLUMNS = ["location", "location_type", "market"]
+
+# float64 by default, float32 halves the price column when the precision is not needed
+PRICE_DTYPES = ("float64", "float32")
+
+PARTITION_SUFFIX = ".parquet"
+
+SEGMENTS_DIR_NAME = "segments"
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+# once a node has this many append segments, the next append folds them into the partitions
+COMPACTION_SEGMENT_LIMIT = 32
+
+# the reads take no lock, a compaction in another worker can drop the segments of the manifest
+# a reader has just read, so the reader starts over from the new manifest this many times
+READ_ATTEMPTS = 5
+
+# repeated reads of the same node and window in one process are served from here,
+# the entries are keyed by the node cache dir and checked against the manifest generation
+MEMORY_CACHE = LRUFrameCache()
+
+
+def get_cache_dir(
     iso: ISOType,
     market_type: MarketType,
     price_type: PriceType,
     node: str,
 ) -> Path:
     """
-    Constructs the cache file path based on the parameters provided.
+    Constructs the cache directory for a node, partitions for each month live in here
+    e.g. ERCOT/DAM/SPP/HB_HOUSTON/2024-10.parquet
+    the AS products all map to the same dir e.g. ERCOT/DAM/AS/SYSTEM/2024-10.parquet
+    """
+    price_dir = AS_CACHE_PRICE_DIR if price_type in AS_PRICE_TYPES else price_type.name
+    return CACHE_VOLUME_PATH / iso.name / market_type.name / price_dir / node
+
+
+def get_partition_path(cache_dir: Path, month: pd.Timestamp) -> Path:
+    """
+    Constructs the partition file path for the month that includes the given timestamp.
+    """
+    return cache_dir / f"{month.year:04d}-{month.month:02d}{PARTITION_SUFFIX}"
+
+
+def get_legacy_cache_file_path(
+    iso: ISOType,
+    market_type: MarketType,
+    price_type: PriceType,
+    node: str,
+) -> Path:
+    """
+    Constructs the old single csv cache file path, only used for migrating to partitions.
     """
     file_name = f"{iso.name}_{market_type.name}_{price_type.name}_{node}.csv"
 
@@ -31,92 +107,187 @@ def get_cache_file_path(
 
 
 
-def get_cache_file(iso: ISOType, market_type: MarketType, price_type: PriceType, node: str) -> pd.DataFrame:
+def get_cache_file(
+    iso: ISOType,
+    market_type: MarketType,
+    price_type: PriceType,
+    node: str,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> pd.DataFrame:
     """
-    Retrieves the cache file path for the given parameters.
-    If the file does not exist, creates an empty DataFrame.
+    Retrieves the cached records for the given parameters.
+    Only the monthly partitions and append segments overlapping [start_time, end_time)
+    are read, if the window is not given everything is read.
+    If there is nothing cached, returns an empty DataFrame.
+    Reads go through MEMORY_CACHE first, so the returned frame should not be modified in place.
+    NOTE: no lock is taken, if a compaction removes a segment while we read it we read the new
+    manifest and start over, the records of the segment are in the partitions by then.
     """
-    cache_file_path = get_cache_file_path(iso, market_type, price_type, node)
-    
+    cache_dir = get_cache_dir(iso, market_type, price_type, node)
+    for attempt in range(READ_ATTEMPTS):
+        manifest = read_manifest(cache_dir)
 
-    if not cache_file_path.exists():
-        # Create an empty DataFrame and save it to the cache file
-    
-        cache_df = pd.DataFrame(columns=COLUMN_NAMES)
-    else:
-        # Load the existing cache file into a DataFrame
-        cache_df = pd.read_csv(
-            cache_file_path,
-            parse_dates=["interval_start_utc", "interval_end_utc"]
+        cache_df = MEMORY_CACHE.get(cache_dir, manifest["generation"], start_time, end_time)
+        if cache_df is not None:
+            return cache_df
+
+        # segments are newer than the partitions, so they go last and win on duplicates
+        paths = _list_partitions(cache_dir, start_time, end_time) + _list_segments(
+            cache_dir, manifest, start_time, end_time,
         )
-        
-    return cache_df
+        try:
+            cache_df = merge_cache_frames([pd.read_parquet(path) for path in paths])
+        except FileNotFoundError:
+            if attempt == READ_ATTEMPTS - 1:
+                raise
+            continue
+
+        MEMORY_CACHE.put(cache_dir, manifest["generation"], cache_df, start_time, end_time)
+        return cache_df
+
+
+def merge_cache_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates cache frames in order, on the same interval the later frames win.
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return _empty_cache_frame()
+    return _normalize_frame(pd.concat(frames, ignore_index=True))
+
+
+def get_coverage_index(
+    iso: ISOType,
+    market_type: MarketType,
+    price_type: PriceType,
+    node: str,
+) -> CoverageIndex:
+    """
+    Retrieves the coverage index of a node cache from its manifest.
+    Caches written before we had the index get it built from the records once.
+    """
+    cache_dir = get_cache_dir(iso, market_type, price_type, node)
+    manifest = read_manifest(cache_dir)
+    if "coverage" in manifest:
+        return CoverageIndex.from_dict(manifest["coverage"])
+
+    if not cache_dir.exists():
+        return CoverageIndex()
+
+    with cache_key_lock(cache_dir):
+        manifest = read_manifest(cache_dir)
+        if "coverage" not in manifest:
+            manifest["coverage"] = _manifest_coverage(cache_dir, manifest).to_dict()
+            _write_manifest(cache_dir, manifest)
+    return CoverageIndex.from_dict(manifest["coverage"])
+
+
+@dataclass
+class CacheFootprint:
+    memory_bytes: int
+    disk_bytes: int
+
+
+def get_cache_footprint(
+    iso: ISOType,
+    market_type: MarketType,
+    price_type: PriceType,
+    node: str,
+) -> CacheFootprint:
+    """
+    Reports how much a cache key takes, in MEMORY_CACHE (0 if it is not loaded)
+    and on disk for the partitions and the append segments.
+    """
+    cache_dir = get_cache_dir(iso, market_type, price_type, node)
+    manifest = read_manifest(cache_dir)
+    paths = _list_partitions(cache_dir, None, None) + _list_segments(cache_dir, manifest, None, None)
+    return CacheFootprint(
+        memory_bytes=MEMORY_CACHE.size_of(cache_dir),
+        disk_bytes=sum(path.stat().st_size for path in paths if path.exists()),
+    )
+
+
+def compact_frame(df: pd.DataFrame, price_dtype: Optional[str] = None) -> pd.DataFrame:
+    """
+    Projects the frame down to COLUMN_NAMES (AS_COLUMN_NAMES for the AS records), encodes the
+    repeated string columns as categoricals and casts the prices to price_dtype. Without a
+    price_dtype float32 prices are kept as they are and everything else goes to float64.
+    NOTE: concat of categoricals with different categories gives back objects,
+    so this should be applied again after a concat.
+    """
+    if price_dtype is not None and price_dtype not in PRICE_DTYPES:
+        raise ValueError(f"price_dtype should be one of {PRICE_DTYPES}")
+    df = df.loc[:, [column for column in _cache_columns(df) if column in df.columns]]
+    dtypes = {column: "category" for column in CATEGORICAL_COLUMNS if column in df.columns}
+    for column in value_columns(df):
+        dtypes[column] = price_dtype or ("float32" if df[column].dtype == "float32" else "float64")
+    return df.astype(dtypes)
+
+
+def value_columns(df: pd.DataFrame) -> List[str]:
+    """
+    the price columns of a cache frame, price for the energy prices or the AS products.
+    """
+    if "price" in df.columns:
+        return ["price"]
+    return [column for column in AS_PRODUCT_COLUMNS if column in df.columns]
 
 
 def get_missing_periods(
-    df: pd.DataFrame,
+    coverage: CoverageIndex,
     start_time: datetime,
     end_time: datetime,
 ) -> List[Tuple[datetime, datetime]]:
     """
-    Returns a DataFrame with missing periods between start_time and end_time.
-    based on the existing intervals in cache DataFrame.
+    Returns the missing periods between start_time and end_time,
+    based on the coverage index of the cache, so we never look at the cached records here.
     """
-    # the dataframe should have all the columns n COLUMN_NAMES
-    # the rows could be sparce since we concatenate the queries
-    # that may span different time periods
-    # so we look at price columnn values if not null
-    # we are gong to start with the interval_start_utc column in the dataframe
-    # if the column does not nclude the start_time then the frst missing period
-    # would be from start_time to the first interval_start_utc
-    # then we contnue from the interval_start_utc to the end_time
-    # and check if any of the intervals are missing value (null prce)
-    # lastly we check if the end_time is included in the intervals
-    # if not then we add the last period from the last interval_end_utc to end
+    return coverage.missing(start_time, end_time)
 
 
-    existing_periods = pd.to_datetime(
-        df.loc[df['price'].notnull(), 'interval_start_utc'].dropna().unique()
-    )
-    existing_periods = pd.Series(existing_periods).sort_values().to_numpy()
-    
-    # Determine frequency
-    if not df.empty:
-        first_valid = df[df['price'].notnull()].iloc[0]
-        freq = pd.to_datetime(first_valid['interval_end_utc']) - pd.to_datetime(first_valid['interval_start_utc'])
-        # freq = pd.Timedelta('1H')
-    else:
-        freq = pd.Timedelta('1H')
-    freq_timedelta = pd.Timedelta(freq)
-
-    all_periods = pd.date_range(start=start_time, end=end_time - freq_timedelta, freq=freq_timedelta)
-    missing_periods = all_periods.difference(existing_periods)
-
-    if len(existing_periods) == 0:
-        # All periods are missing
-        missing_ranges = [(start_time, end_time)]
-        return missing_ranges
-
-    if missing_periods.empty:
-        return []
 
-    # Group consecutive missing periods into ranges
-    missing_ranges = []
-    start = missing_periods[0]
-    prev = missing_periods[0]
-    for current in missing_periods[1:]:
-        if (current - prev) != freq_timedelta:
-            # End of a missing range
-            missing_ranges.append((start, prev + freq_timedelta))
-            start = current
-        prev = current
-    # Add the last range
-    missing_ranges.append((start, prev + freq_timedelta))
-    return missing_ranges
+def persist_cache_file(
+    df: pd.DataFrame,
+    iso: ISOType,
+    market_type: MarketType,
+    price_type: PriceType,
+    node: str,
+) -> None:
+    """
+    Persists the DataFrame to the monthly partitions of the cache.
+    Only the partitions touched by the records in df are rewritten, the records
+    are merged with what is already in the partition and the new ones win on
+    the same interval_start_utc.
+    NOTE: the fetched records should go through append_cache_segment, this one is
+    for compaction and migration since it does not know about the segments.
+    All the manifest read-modify-writes happen under the cache key lock.
+    """
+    df = _normalize_frame(df)
+    if df.empty:
+        return
+
+    cache_dir = get_cache_dir(iso, market_type, price_type, node)
 
+    with cache_key_lock(cache_dir):
+        month_keys = _month_keys(df['interval_start_utc'])
+        for _, month_df in df.groupby(month_keys, sort=True):
+            partition_path = get_partition_path(cache_dir, month_df['interval_start_utc'].iloc[0])
+            if partition_path.exists():
+                month_df = _normalize_frame(
+                    pd.concat([pd.read_parquet(partition_path), month_df], ignore_index=True)
+                )
+            _write_parquet_atomic(month_df, partition_path)
 
+        manifest = read_manifest(cache_dir)
+        manifest["coverage"] = _manifest_coverage(cache_dir, manifest).union(
+            CoverageIndex.from_frame(df, value_columns(df))
+        ).to_dict()
+        manifest["generation"] += 1
+        _write_manifest(cache_dir, manifest)
 
-def persist_cache_file(
+
+def append_cache_segment(
     df: pd.DataFrame,
     iso: ISOType,
     market_type: MarketType,
@@ -124,12 +295,212 @@ def persist_cache_file(
     node: str,
 ) -> None:
     """
-    Persists the DataFrame to a cache file.
+    Appends the records as a new immutable segment file and registers it in the manifest,
+    so the cost of a write only depends on the number of records in df and not on the
+    size of the cache. When the number of segments passes COMPACTION_SEGMENT_LIMIT
+    they are folded into the partitions.
+    """
+    df = _normalize_frame(df)
+    if df.empty:
+        return
+
+    cache_dir = get_cache_dir(iso, market_type, price_type, node)
+    with cache_key_lock(cache_dir):
+        segments_dir = cache_dir / SEGMENTS_DIR_NAME
+        segments_dir.mkdir(parents=True, exist_ok=True)
+
+        manifest = read_manifest(cache_dir)
+        coverage = _manifest_coverage(cache_dir, manifest)
+        segment_name = f"{manifest['next_segment']:08d}{PARTITION_SUFFIX}"
+        _write_parquet_atomic(df, segments_dir / segment_name)
+
+        manifest["segments"].append({
+            "file": segment_name,
+            "start": df["interval_start_utc"].iloc[0].isoformat(),
+            "end": df["interval_end_utc"].max().isoformat(),
+            "rows": len(df),
+        })
+        # the coverage goes in the same manifest write as the segment, so they never disagree
+        manifest["coverage"] = coverage.union(CoverageIndex.from_frame(df, value_columns(df))).to_dict()
+        manifest["next_segment"] += 1
+        manifest["generation"] += 1
+        _write_manifest(cache_dir, manifest)
+
+    if len(manifest["segments"]) >= COMPACTION_SEGMENT_LIMIT:
+        compact_cache(iso, market_type, price_type, node)
+
+
+def compact_cache(
+    iso: ISOType,
+    market_type: MarketType,
+    price_type: PriceType,
+    node: str,
+) -> None:
+    """
+    Folds the append segments of a node into the monthly partitions.
+    The partitions are written before the manifest drops the segments, so if we stop half way
+    the segments are still there and the next compaction merges them again. A reader that still
+    has the old manifest finds its segments gone and reads again (see get_cache_file).
+    """
+    cache_dir = get_cache_dir(iso, market_type, price_type, node)
+    with cache_key_lock(cache_dir):
+        manifest = read_manifest(cache_dir)
+        if not manifest["segments"]:
+            return
+
+        segment_paths = _list_segments(cache_dir, manifest, None, None)
+        persist_cache_file(
+            merge_cache_frames([pd.read_parquet(path) for path in segment_paths]),
+            iso, market_type, price_type, node,
+        )
+
+        compacted = {path.name for path in segment_paths}
+        manifest = read_manifest(cache_dir)
+        manifest["segments"] = [
+            segment for segment in manifest["segments"] if segment["file"] not in compacted
+        ]
+        manifest["generation"] += 1
+        _write_manifest(cache_dir, manifest)
+
+        for path in segment_paths:
+            path.unlink(missing_ok=True)
+
+
+def read_manifest(cache_dir: Path) -> Dict[str, Any]:
     """
-    cache_file_path = get_cache_file_path(iso, market_type, price_type, node)
-    
-    # Ensure the directory exists
-    cache_file_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    # Save the DataFrame to CSV
-    df.to_csv(cache_file_path, index=False)
+    Reads the manifest of a node cache, that keeps the list of the append segments
+    and a generation number that is bumped on every write.
+    """
+    manifest_path = cache_dir / MANIFEST_FILE_NAME
+    if not manifest_path.exists():
+        return {"generation": 0, "next_segment": 0, "segments": []}
+    with open(manifest_path, mode="r") as file_handler:
+        return json.load(file_handler)
+
+
+def migrate_csv_cache(remove_csv: bool = False) -> List[Path]:
+    """
+    One-shot migration of the old {ISO}_{MARKET}_{PRICE}_{node}.csv cache files
+    into the monthly partitions, returns the csv files that were migrated.
+    """
+    migrated = []
+    for csv_path in sorted(CACHE_VOLUME_PATH.glob("*.csv")):
+        # node names have underscores in them (HB_HOUSTON) so only split the first three
+        parts = csv_path.stem.split("_", 3)
+        if len(parts) != 4:
+            continue
+        iso_name, market_name, price_name, node = parts
+        try:
+            iso = ISOType[iso_name]
+            market_type = MarketType[market_name]
+            price_type = PriceType[price_name]
+        except KeyError:
+            continue
+
+        cache_df = pd.read_csv(csv_path)
+        persist_cache_file(cache_df, iso, market_type, price_type, node)
+        migrated.append(csv_path)
+
+        if remove_csv:
+            csv_path.unlink()
+
+    return migrated
+
+
+def _list_partitions(
+    cache_dir: Path,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+) -> List[Path]:
+    if not cache_dir.exists():
+        return []
+    partition_paths = sorted(cache_dir.glob(f"*{PARTITION_SUFFIX}"))
+    if start_time is None and end_time is None:
+        return partition_paths
+
+    # partitions are named by month so we compare on the YYYY-MM names
+    first = _month_name(start_time) if start_time is not None else None
+    last = _month_name(end_time - pd.Timedelta(1, "ns")) if end_time is not None else None
+    return [
+        path for path in partition_paths
+        if (first is None or path.stem >= first) and (last is None or path.stem <= last)
+    ]
+
+
+def _manifest_coverage(cache_dir: Path, manifest: Dict[str, Any]) -> CoverageIndex:
+    if "coverage" in manifest:
+        return CoverageIndex.from_dict(manifest["coverage"])
+    # written before the index existed, so we build it from what is on disk
+    cache_df = merge_cache_frames([
+        pd.read_parquet(path)
+        for path in _list_partitions(cache_dir, None, None) + _list_segments(cache_dir, manifest, None, None)
+    ])
+    return CoverageIndex.from_frame(cache_df, value_columns(cache_df))
+
+
+def _list_segments(
+    cache_dir: Path,
+    manifest: Dict[str, Any],
+    start_time: Optional[datetime],
+    end_time: Optional[datetime],
+) -> List[Path]:
+    segments_dir = cache_dir / SEGMENTS_DIR_NAME
+    return [
+        segments_dir / segment["file"] for segment in manifest["segments"]
+        if (start_time is None or pd.Timestamp(segment["end"]) > pd.Timestamp(start_time))
+        and (end_time is None or pd.Timestamp(segment["start"]) < pd.Timestamp(end_time))
+    ]
+
+
+def _month_name(timestamp: datetime) -> str:
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC")
+    return f"{timestamp.year:04d}-{timestamp.month:02d}"
+
+
+def _month_keys(timestamps: pd.Series) -> pd.Series:
+    return timestamps.dt.year * 12 + timestamps.dt.month - 1
+
+
+def _cache_columns(df: pd.DataFrame) -> List[str]:
+    # a frame without a price column but with AS product columns is an AS record
+    if "price" not in df.columns and any(column in df.columns for column in AS_PRODUCT_COLUMNS):
+        return AS_COLUMN_NAMES
+    return COLUMN_NAMES
+
+
+def _empty_cache_frame() -> pd.DataFrame:
+    return _normalize_frame(pd.DataFrame(columns=COLUMN_NAMES))
+
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    makes sure the frame is compact, the timestamp columns are typed UTC timestamps, the records are
+    sorted and we keep a single (the last) record per interval.
+    """
+    df = compact_frame(df)
+    for column in TIMESTAMP_COLUMNS:
+        df[column] = pd.to_datetime(df[column], utc=True)
+    df = df.drop_duplicates(subset="interval_start_utc", keep="last")
+    return df.sort_values(by="interval_start_utc", kind="stable", ignore_index=True)
+
+
+def _write_parquet_atomic(df: pd.DataFrame, path: Path) -> None:
+    # write to a temp file first, so readers never see a half written partition
+    tmp_path = path.with_name(path.name + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _write_manifest(cache_dir: Path, manifest: Dict[str, Any]) -> None:
+    manifest_path = cache_dir / MANIFEST_FILE_NAME
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, mode="w") as file_handler:
+        json.dump(manifest, file_handler)
+    os.replace(tmp_path, manifest_path)
+
+
+if __name__ == "__main__":
+    for path in migrate_csv_cache():
+        print(f"migrated {path.name}")
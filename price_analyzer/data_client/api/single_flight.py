@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterator, Tuple, TypeVar
+from filelock import FileLock
+
+T = TypeVar("T")
+
+LOCK_FILE_NAME = ".lock"
+
+
+class SingleFlight:
+    """
+    Makes concurrent calls with the same key share one execution, the first caller
+    runs fn and the others wait for and get its result (or its exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_key_locks_guard = threading.Lock()
+_key_locks: Dict[Path, Tuple[threading.RLock, FileLock]] = {}
+
+
+@contextmanager
+def cache_key_lock(cache_dir: Path) -> Iterator[None]:
+    """
+    Locks a node cache for a read-modify-write, across the threads of this process
+    with a lock per cache dir and across processes with a lock file in the cache dir.
+    The lock is reentrant for the thread that holds it.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with _key_locks_guard:
+        if cache_dir not in _key_locks:
+            _key_locks[cache_dir] = (
+                threading.RLock(),
+                FileLock(str(cache_dir / LOCK_FILE_NAME), thread_local=False),
+            )
+        thread_lock, file_lock = _key_locks[cache_dir]
+
+    with thread_lock, file_lock:
+        yield
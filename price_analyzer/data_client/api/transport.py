@@ -0,0 +1,183 @@
+import re
+import time
+import random
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import pandas as pd
+import requests
+
+# the gridstatusio client raises plain exceptions like "Error 503: ..." or "Rate limited. ..."
+_STATUS_CODE_PATTERN = re.compile(r"Error (\d{3})")
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+LATENCY_BUCKETS_SECONDS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+
+class RequestBudgetExceeded(Exception):
+    pass
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 4
+    base_delay_seconds: float = 0.5
+    max_delay_seconds: float = 30.0
+
+
+class TokenBucket:
+    """
+    a token bucket rate limiter, rate_per_second tokens are added up to burst,
+    acquire blocks until a token is there.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second should be positive")
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_second)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate_per_second
+            time.sleep(wait_seconds)
+
+
+class LatencyHistogram:
+    """
+    counts of the request latencies in LATENCY_BUCKETS_SECONDS buckets,
+    the last count is for everything above the last bucket.
+    """
+
+    def __init__(self, buckets_seconds: List[float] = None):
+        self.buckets_seconds = buckets_seconds or LATENCY_BUCKETS_SECONDS
+        self.counts = [0] * (len(self.buckets_seconds) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets_seconds, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        upper bound of the bucket the q quantile falls in.
+        """
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets_seconds + [float("inf")], self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+
+class RetryingTransport:
+    """
+    Wraps the GridStatusClient get_dataset with a token bucket rate limiter, retries with
+    jittered exponential backoff for the retryable errors (rate limits, 5xx, connection errors)
+    and a request budget for the run. Every attempt counts against the budget.
+    The latencies are recorded per dataset in latency_histograms.
+    """
+
+    def __init__(
+        self,
+        client,
+        rate_per_second: Optional[float] = None,
+        burst: int = 1,
+        retry_policy: RetryPolicy = None,
+        request_budget: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        seed: Optional[int] = None,
+    ):
+        self.client = client
+        self.rate_limiter = TokenBucket(rate_per_second, burst) if rate_per_second else None
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.request_budget = request_budget
+        self.requests_made = 0
+        self.retries_made = 0
+        self.latency_histograms: Dict[str, LatencyHistogram] = {}
+        self._sleep = sleep
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def reset_budget(self, request_budget: Optional[int] = None) -> None:
+        """
+        starts a new run, with a new budget if given.
+        """
+        with self._lock:
+            self.requests_made = 0
+            self.retries_made = 0
+            if request_budget is not None:
+                self.request_budget = request_budget
+
+    def get_dataset(self, dataset: str, **kwargs) -> pd.DataFrame:
+        attempt = 0
+        while True:
+            self._take_budget(dataset)
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+            started = time.perf_counter()
+            try:
+                results = self.client.get_dataset(dataset=dataset, **kwargs)
+            except Exception as error:
+                self._record_latency(dataset, time.perf_counter() - started)
+                if attempt >= self.retry_policy.max_retries or not is_retryable(error):
+                    raise
+                with self._lock:
+                    self.retries_made += 1
+                self._sleep(self._backoff_seconds(attempt))
+                attempt += 1
+                continue
+
+            self._record_latency(dataset, time.perf_counter() - started)
+            return results
+
+    def _take_budget(self, dataset: str) -> None:
+        with self._lock:
+            if self.request_budget is not None and self.requests_made >= self.request_budget:
+                raise RequestBudgetExceeded(
+                    f"request budget of {self.request_budget} is used up, querying {dataset}"
+                )
+            self.requests_made += 1
+
+    def _backoff_seconds(self, attempt: int) -> float:
+        # full jitter, so concurrent retries do not come back at the same time
+        cap = min(
+            self.retry_policy.max_delay_seconds,
+            self.retry_policy.base_delay_seconds * 2 ** attempt,
+        )
+        with self._lock:
+            return self._random.uniform(0, cap)
+
+    def _record_latency(self, dataset: str, seconds: float) -> None:
+        with self._lock:
+            self.latency_histograms.setdefault(dataset, LatencyHistogram()).record(seconds)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    message = str(error)
+    if message.startswith("Rate limited"):
+        return True
+    match = _STATUS_CODE_PATTERN.search(message)
+    return bool(match) and int(match.group(1)) in RETRYABLE_STATUS_CODES
@@ -0,0 +1,180 @@
+import asyncio
+from datetime import datetime
+from typing import List, Dict
+import pandas as pd
+from price_analyzer.data_client.service.iasync_price_service import IAsyncPriceService
+from price_analyzer.data_client.service.gridstatus.price_service import (
+    _as_product_to_price,
+    _convert_df_to_energy_price,
+    _validate_inputs,
+)
+from price_analyzer.dtos.prices import Price, PriceLocation, PriceRequest
+from price_analyzer.dtos.basic_types import MarketType, PriceType, ISOType
+from price_analyzer.data_client.api.async_gridstatus_price import AsyncGridStatusPriceClient
+
+
+class AsyncPriceService(IAsyncPriceService):
+    """
+    the asyncio flavour of PriceService, with gather helpers to run many
+    node/market requests on one event loop.
+    """
+    def __init__(
+        self,
+        price_data_client: AsyncGridStatusPriceClient,
+    ):
+        self.price_data_client = price_data_client
+        self._iso = None
+
+    @property
+    def iso(self) -> ISOType:
+        if self._iso is None:
+            raise ValueError("ISO is not initialized")
+        return self._iso
+
+    def initialize_service_iso(self, iso: ISOType):
+        self._iso = iso
+
+    async def get_price_actual_df(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        location: PriceLocation,
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+    ) -> pd.DataFrame:
+        if price_type in [PriceType.LMP, PriceType.SPP]:
+            return await self.price_data_client.get_energy_price_actual_with_cache(
+                iso=self.iso,
+                market_type=market_type,
+                price_type=price_type,
+                node=location.name,
+                start_time=start_time,
+                end_time=end_time,
+            )
+        elif price_type in [PriceType.REGUP, PriceType.REGDOWN, PriceType.RRS]:
+            return _as_product_to_price(await self.get_as_prices_actual_df(
+                market_type, [price_type], start_time, end_time,
+            ), price_type)
+        else:
+            raise ValueError("Invalid price type for DataFrame retrieval")
+
+    async def get_as_prices_actual_df(
+        self,
+        market_type: MarketType,
+        price_types: List[PriceType],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        return await self.price_data_client.get_as_price_actual_with_cache(
+            iso=self.iso,
+            market_type=market_type,
+            price_types=price_types,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    async def get_price_actual_df_many(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        locations: List[PriceLocation],
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+    ) -> Dict[str, pd.DataFrame]:
+        if price_type in [PriceType.LMP, PriceType.SPP]:
+            return await self.price_data_client.get_energy_price_actual_many_with_cache(
+                iso=self.iso,
+                market_type=market_type,
+                price_type=price_type,
+                nodes=[location.name for location in locations],
+                start_time=start_time,
+                end_time=end_time,
+            )
+        else:
+            raise ValueError("Invalid price type for DataFrame retrieval")
+
+    async def get_price_actual(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        location: PriceLocation,
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+    ) -> Price:
+        _validate_inputs(market_type, price_type, location, start_time, end_time, resolution_minutes)
+
+        if price_type in [PriceType.LMP, PriceType.SPP]:
+            return await self._get_energy_price_actual(market_type, price_type, location, start_time, end_time, resolution_minutes)
+        elif price_type in [PriceType.REGUP, PriceType.REGDOWN, PriceType.RRS]:
+            return await self._get_as_price_actual(
+                price_type,
+                start_time,
+                end_time,
+                resolution_minutes
+            )
+        else:
+            raise ValueError("Invalid price type")
+
+    async def gather_price_actual_df(self, requests: List[PriceRequest]) -> List[pd.DataFrame]:
+        """
+        runs the requests concurrently, the results are in the same order as the requests,
+        how many actually run at the same time is bounded by the client.
+        """
+        return list(await asyncio.gather(*[
+            self.get_price_actual_df(
+                request.market_type,
+                request.price_type,
+                request.location,
+                request.start_time,
+                request.end_time,
+                request.resolution_minutes,
+            )
+            for request in requests
+        ]))
+
+    async def gather_price_actual(self, requests: List[PriceRequest]) -> List[Price]:
+        return list(await asyncio.gather(*[
+            self.get_price_actual(
+                request.market_type,
+                request.price_type,
+                request.location,
+                request.start_time,
+                request.end_time,
+                request.resolution_minutes,
+            )
+            for request in requests
+        ]))
+
+    async def _get_as_price_actual(
+        self,
+        price_type: PriceType,
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+    ) -> Price:
+        df = await self.get_price_actual_df(
+            MarketType.DAM, price_type, None, start_time, end_time, resolution_minutes,
+        )
+        return _convert_df_to_energy_price(df, start_time, end_time, resolution_minutes, price_type)
+
+    async def _get_energy_price_actual(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        location: PriceLocation,
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+    ) -> Price:
+        df: pd.DataFrame = await self.price_data_client.get_energy_price_actual(
+            iso=self.iso,
+            market_type=market_type,
+            price_type=price_type,
+            node=location.name,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        return _convert_df_to_energy_price(df, start_time, end_time, resolution_minutes, price_type)
@@ -1,11 +1,21 @@
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Dict, Iterator, Optional
 import pandas as pd
-import numpy as np
 from price_analyzer.data_client.service.iprice_service import IPriceService
-from price_analyzer.dtos.prices import Price, PriceLocation
+from price_analyzer.data_client.service.session_memo import SessionMemo
+from price_analyzer.data_client.service.resampling import (
+    UpsamplePolicy,
+    resample_prices,
+    resample_regular,
+    to_regular_grid,
+)
+from price_analyzer.utils.timestamps import infer_resolution_minutes
+import numpy as np
+from price_analyzer.dtos.prices import Price, PriceLocation, PriceMatrix
 from price_analyzer.dtos.basic_types import MarketType, PriceType, ISOType
-from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient, CHUNK_LENGTH
 
 
 class PriceService(IPriceService):
@@ -15,6 +25,10 @@ class PriceService(IPriceService):
     ):
         self.price_data_client = price_data_client
         self._iso = None
+        # only set within a session, see session()
+        self._memo: Optional[SessionMemo] = None
+        self._sessions = 0
+        self._session_lock = threading.Lock()
     
     @property
     def iso(self) -> ISOType:
@@ -32,6 +46,47 @@ class PriceService(IPriceService):
         """
         self._iso = iso
     
+    @contextmanager
+    def session(self) -> Iterator["PriceService"]:
+        """
+        within a session the frames we return are memoized by (market, price_type, location, resolution)
+        and their window, and a request for a window inside one we already loaded is sliced from it.
+        e.g.
+            with price_service.session():
+                get_price_stats(price_service, ...)
+                get_weekly_price_stats(price_service, ...)
+        nested sessions share the outer one, the memo is dropped when the outer one ends.
+        NOTE: nothing expires within a session, call invalidate if the prices may have changed.
+        """
+        with self._session_lock:
+            if self._sessions == 0:
+                self._memo = SessionMemo()
+            self._sessions += 1
+        try:
+            yield self
+        finally:
+            with self._session_lock:
+                self._sessions -= 1
+                if self._sessions == 0:
+                    self._memo = None
+
+    def invalidate(
+        self,
+        market_type: Optional[MarketType] = None,
+        price_type: Optional[PriceType] = None,
+        location: Optional[PriceLocation] = None,
+    ) -> None:
+        """
+        drops the memoized frames of the session that match all the given filters,
+        everything if none is given.
+        """
+        if self._memo is None:
+            return
+        filters = (market_type, price_type, location.name if location is not None else None)
+        self._memo.invalidate(lambda key: all(
+            value is None or value == key_value for value, key_value in zip(filters, key)
+        ))
+
     def get_price_actual_df(
         self,
         market_type: MarketType,
@@ -40,6 +95,32 @@ class PriceService(IPriceService):
         start_time: datetime,
         end_time: datetime,
         resolution_minutes: int,
+    ) -> pd.DataFrame:
+        memo = self._memo
+        if memo is None:
+            return self._get_price_actual_df(
+                market_type, price_type, location, start_time, end_time, resolution_minutes,
+            )
+
+        # the AS prices are system wide, so they do not depend on the location
+        location_name = location.name if location is not None and price_type in [PriceType.LMP, PriceType.SPP] else None
+        key = (market_type, price_type, location_name, resolution_minutes)
+        df = memo.get(key, start_time, end_time)
+        if df is None:
+            df = self._get_price_actual_df(
+                market_type, price_type, location, start_time, end_time, resolution_minutes,
+            )
+            memo.put(key, start_time, end_time, df)
+        return df
+
+    def _get_price_actual_df(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        location: PriceLocation,
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
     ) -> pd.DataFrame:
         if price_type in [PriceType.LMP, PriceType.SPP]:
             return  self.price_data_client.get_energy_price_actual_with_cache(
@@ -50,6 +131,132 @@ class PriceService(IPriceService):
                 start_time=start_time,
                 end_time=end_time,
             )
+        elif price_type in [PriceType.REGUP, PriceType.REGDOWN, PriceType.RRS]:
+            # NOTE: the AS prices are system wide, so the location is not used here
+            return _as_product_to_price(self.get_as_prices_actual_df(
+                market_type, [price_type], start_time, end_time,
+            ), price_type)
+        else:
+            raise ValueError("Invalid price type for DataFrame retrieval")
+
+    def get_as_prices_actual_df(
+        self,
+        market_type: MarketType,
+        price_types: List[PriceType],
+        start_time: datetime,
+        end_time: datetime,
+    ) -> pd.DataFrame:
+        """
+        the prices of many AS products in one frame with a column per product (the PriceType value),
+        they all come from the same cached record so this is one cache read and at most one api call.
+        """
+        return self.price_data_client.get_as_price_actual_with_cache(
+            iso=self.iso,
+            market_type=market_type,
+            price_types=price_types,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+    def get_price_actual_df_many(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        locations: List[PriceLocation],
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        the same as get_price_actual_df for many locations, they are fetched together
+        in one query and the results are keyed by the location name
+        """
+        if price_type in [PriceType.LMP, PriceType.SPP]:
+            return self.price_data_client.get_energy_price_actual_many_with_cache(
+                iso=self.iso,
+                market_type=market_type,
+                price_type=price_type,
+                nodes=[location.name for location in locations],
+                start_time=start_time,
+                end_time=end_time,
+            )
+        else:
+            raise ValueError("Invalid price type for DataFrame retrieval")
+
+    def get_price_matrix(
+        self,
+        locations: List[PriceLocation],
+        market_type: MarketType,
+        price_type: PriceType,
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+    ) -> PriceMatrix:
+        """
+        the prices of many locations on one time grid, for the cross node analysis.
+        The locations are read (and fetched if missing) in one batch, placed on the grid of
+        the dataset and resampled to resolution_minutes all together.
+        """
+        if not locations:
+            raise ValueError("at least one location is needed for a price matrix")
+        frames = self.get_price_actual_df_many(
+            market_type, price_type, locations, start_time, end_time, resolution_minutes,
+        )
+        return _convert_frames_to_price_matrix(
+            [frames[location.name] for location in locations],
+            locations, start_time, end_time, resolution_minutes, price_type,
+        )
+
+    def iter_price_actual_chunks(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        location: PriceLocation,
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+        chunk: timedelta = CHUNK_LENGTH,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        the same as get_price_actual_df but yields time ordered chunks of the window,
+        for the long pulls that we do not want to hold in memory all at once.
+        """
+        if price_type in [PriceType.LMP, PriceType.SPP]:
+            return self.price_data_client.iter_energy_price_actual_chunks(
+                iso=self.iso,
+                market_type=market_type,
+                price_type=price_type,
+                node=location.name,
+                start_time=start_time,
+                end_time=end_time,
+                chunk=chunk,
+            )
+        else:
+            raise ValueError("Invalid price type for DataFrame retrieval")
+
+    def iter_price_actual_chunks_many(
+        self,
+        market_type: MarketType,
+        price_type: PriceType,
+        locations: List[PriceLocation],
+        start_time: datetime,
+        end_time: datetime,
+        resolution_minutes: int,
+        chunk: timedelta = CHUNK_LENGTH,
+    ) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        the same as iter_price_actual_chunks for many locations, each chunk is keyed by the location name
+        """
+        if price_type in [PriceType.LMP, PriceType.SPP]:
+            return self.price_data_client.iter_energy_price_actual_many_chunks(
+                iso=self.iso,
+                market_type=market_type,
+                price_type=price_type,
+                nodes=[location.name for location in locations],
+                start_time=start_time,
+                end_time=end_time,
+                chunk=chunk,
+            )
         else:
             raise ValueError("Invalid price type for DataFrame retrieval")
 
@@ -88,7 +295,11 @@ class PriceService(IPriceService):
         end_time: datetime,
         resolution_minutes: int,
     ) -> Price:
-       raise NotImplementedError
+        # NOTE: the AS prices only come from the day ahead market
+        df = self.get_price_actual_df(
+            MarketType.DAM, price_type, None, start_time, end_time, resolution_minutes,
+        )
+        return _convert_df_to_energy_price(df, start_time, end_time, resolution_minutes, price_type)
     
     def _get_energy_price_actual(
         self,
@@ -99,6 +310,10 @@ class PriceService(IPriceService):
         end_time: datetime,
         resolution_minutes: int,
     ) -> Price:    
+        if self._memo is not None:
+            # in a session we go through the memoized frames
+            df = self.get_price_actual_df(market_type, price_type, location, start_time, end_time, resolution_minutes)
+            return _convert_df_to_energy_price(df, start_time, end_time, resolution_minutes, price_type)
         df: pd.DataFrame = self.price_data_client.get_energy_price_actual(
             iso=self.iso,
             market_type=market_type,
@@ -113,6 +328,15 @@ class PriceService(IPriceService):
 
 
 
+def _as_product_to_price(df: pd.DataFrame, price_type: PriceType) -> pd.DataFrame:
+    """
+    the column of one AS product renamed to price, so it looks like the energy prices
+    """
+    return df.loc[:, ["interval_start_utc", "interval_end_utc", "market", price_type.value]].rename(
+        columns={price_type.value: "price"}
+    )
+
+
 def _convert_df_to_energy_price(
     df: pd.DataFrame,
     start_time: datetime,
@@ -121,26 +345,66 @@ def _convert_df_to_energy_price(
     price_type: PriceType,
 ) -> Price:
     """
-    in this method we sort the dataframe by interval start,
-    then check for missing intervals, if any, and fill them with NaN,
-    then based on the resolution minutes, we could do some resampling
-    and convert the dataframe to a Price object
+    in this method we place the records on the regular grid of the window,
+    the missing intervals are NaN, then based on the resolution minutes
+    we resample (see resampling) and convert to a Price object.
+    when the records are already the grid we want, the Price is a view on the price column.
     """
-    df = df.sort_values(by='interval_start_utc')
-    df.set_index('interval_start_utc', inplace=True)
-    
-    # Create a date range with the given resolution
-    df_resampled = resample_dataframe(df, resolution_minutes)
-    
-    # Convert the dataframe to a Price object
-    price_values: List[float]= df_resampled['price'].tolist()
-    
+    interval_duration = timedelta(minutes=resolution_minutes)
+    if _is_regular_grid(df, start_time, end_time, interval_duration):
+        return Price.from_frame(df, price_type, start_time, interval_duration)
+
     return Price(
         price_type=price_type,
         start_time=start_time,
+        interval_duration=interval_duration,
+        values=resample_prices(df, start_time, end_time, resolution_minutes),
+    )
+
+
+def _convert_frames_to_price_matrix(
+    frames: List[pd.DataFrame],
+    locations: List[PriceLocation],
+    start_time: datetime,
+    end_time: datetime,
+    resolution_minutes: int,
+    price_type: PriceType,
+) -> PriceMatrix:
+    """
+    places the records of each location on the grid of the dataset as a column,
+    resamples all the columns at once and transposes to (locations, intervals)
+    """
+    source_minutes = next(
+        (infer_resolution_minutes(df) for df in frames if not df.empty), resolution_minutes,
+    )
+    grid = np.column_stack([
+        to_regular_grid(df, start_time, end_time, source_minutes) for df in frames
+    ])
+    values = resample_regular(grid, source_minutes, resolution_minutes)
+    intervals_count = int(-(-(end_time - start_time) // timedelta(minutes=resolution_minutes)))
+    return PriceMatrix(
+        price_type=price_type,
+        locations=list(locations),
+        values=np.ascontiguousarray(values[:intervals_count].T),
+        start_time=start_time,
         interval_duration=timedelta(minutes=resolution_minutes),
-        resolution_minutes=resolution_minutes,
-        values=price_values
+    )
+
+
+def _is_regular_grid(df: pd.DataFrame, start_time: datetime, end_time: datetime, interval_duration: timedelta) -> bool:
+    """
+    true if the records are exactly one per interval of [start_time, end_time), in order
+    """
+    intervals_count = (end_time - start_time) / interval_duration
+    if df.empty or len(df) != intervals_count:
+        return False
+    interval_start = df['interval_start_utc']
+    return bool(
+        interval_start.iloc[0] == start_time
+        and interval_start.iloc[-1] == end_time - interval_duration
+        and (df['interval_end_utc'] - interval_start == interval_duration).all()
+        and interval_start.is_monotonic_increasing
+        and interval_start.is_unique
     )
 
 
@@ -161,30 +425,31 @@ def _validate_inputs(
     pass
 
 
-def resample_dataframe(df, resolution_minutes):
-    # Infer the original resolution from the first row
-    original_resolution = (
-        df['interval_end_utc'].iloc[0] - df['interval_start_utc'].iloc[0]
-    ).seconds // 60
+def resample_dataframe(
+    df: pd.DataFrame,
+    resolution_minutes: int,
+    upsample: UpsamplePolicy = UpsamplePolicy.FFILL,
+) -> pd.DataFrame:
+    """
+    resamples the price records (interval_start_utc, interval_end_utc, price) to resolution_minutes,
+    over the window from the first interval start to the last interval end.
+    time weighted mean when downsampling, the upsample policy when upsampling.
+    returns the prices indexed by interval_start_utc, with the interval_end_utc.
+    """
+    if df.empty:
+        return pd.DataFrame(
+            {'interval_end_utc': pd.DatetimeIndex([], tz='UTC'), 'price': []},
+            index=pd.DatetimeIndex([], tz='UTC', name='interval_start_utc'),
+        )
+    start_time = pd.to_datetime(df['interval_start_utc'], utc=True).min()
+    end_time = pd.to_datetime(df['interval_end_utc'], utc=True).max()
+    values = resample_prices(df, start_time, end_time, resolution_minutes, upsample)
 
-    # Create a date range with the desired resolution
-    date_range = pd.date_range(
-        start=df['interval_start_utc'].min(), 
-        end=df['interval_end_utc'].max(), 
-        freq=f'{resolution_minutes}T',
+    interval_start = pd.date_range(start=start_time, periods=len(values), freq=pd.Timedelta(minutes=resolution_minutes))
+    return pd.DataFrame(
+        {
+            'interval_end_utc': interval_start + pd.Timedelta(minutes=resolution_minutes),
+            'price': values,
+        },
+        index=pd.Index(interval_start, name='interval_start_utc'),
     )
-
-    # Set the interval_start as the index
-    df.set_index('interval_start_utc', inplace=True)
-
-    if resolution_minutes < original_resolution:
-        # Downsampling
-        df_resampled = df.resample(f'{resolution_minutes}T').mean()
-    else:
-        # Upsampling
-        df_resampled = df.resample(f'{resolution_minutes}T').interpolate(method='linear')
-
-    # Reindex to ensure the DataFrame matches the desired date range
-    df_resampled = df_resampled.reindex(date_range, fill_value=np.nan)
-
-    return df_resampled
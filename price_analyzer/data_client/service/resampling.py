@@ -0,0 +1,147 @@
+from datetime import datetime
+from enum import Enum
+import numpy as np
+import pandas as pd
+
+from price_analyzer.utils.timestamps import (
+    NANOSECONDS_PER_MINUTE,
+    column_ns,
+    infer_resolution_minutes,
+    to_ns,
+)
+
+
+class UpsamplePolicy(Enum):
+    # a price holds for its whole interval, so the finer intervals get the same price
+    FFILL = 'ffill'
+    # a straight line between the interval starts, the last interval holds its price
+    LINEAR = 'linear'
+
+
+# NOTE: for downsampling the only policy is the time weighted mean, so the coarse price is the
+# average over its interval of the finer prices, weighted by how long each of them holds
+
+
+def resample_regular(
+    values: np.ndarray,
+    source_minutes: int,
+    target_minutes: int,
+    upsample: UpsamplePolicy = UpsamplePolicy.FFILL,
+) -> np.ndarray:
+    """
+    Resamples prices on a regular grid, values is (intervals,) or (intervals, nodes) and
+    interval i holds over [i * source_minutes, (i + 1) * source_minutes).
+    Coarser targets are the time weighted mean of the source intervals they overlap, from the
+    cumulative integral of the prices, so the ratio of the resolutions does not need to be whole.
+    Missing (nan) prices are left out of the mean, a target with no price at all is nan.
+    Finer targets follow the upsample policy, and are nan where the source interval is nan.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if source_minutes <= 0 or target_minutes <= 0:
+        raise ValueError("the resolutions should be positive")
+    if target_minutes == source_minutes or len(values) == 0:
+        return values.copy()
+
+    length_minutes = len(values) * source_minutes
+    targets_count = -(-length_minutes // target_minutes)
+    if target_minutes > source_minutes:
+        return _time_weighted_mean(values, source_minutes, target_minutes, targets_count)
+    return _upsample(values, source_minutes, target_minutes, targets_count, upsample)
+
+
+def to_regular_grid(
+    df: pd.DataFrame,
+    start_time: datetime,
+    end_time: datetime,
+    resolution_minutes: int,
+    value_column: str = "price",
+) -> np.ndarray:
+    """
+    Places the records of the frame on the regular grid of [start_time, end_time) by their
+    interval_start_utc, with integer arithmetic on the timestamps instead of a reindex.
+    The intervals without a record, or outside the window, are nan.
+    """
+    start, end = to_ns(start_time), to_ns(end_time)
+    step = resolution_minutes * NANOSECONDS_PER_MINUTE
+    grid = np.full(-(-(end - start) // step), np.nan)
+    if df.empty:
+        return grid
+
+    positions = (column_ns(df["interval_start_utc"]) - start) // step
+    inside = (positions >= 0) & (positions < len(grid))
+    grid[positions[inside]] = df[value_column].to_numpy(dtype=np.float64)[inside]
+    return grid
+
+
+def resample_prices(
+    df: pd.DataFrame,
+    start_time: datetime,
+    end_time: datetime,
+    resolution_minutes: int,
+    upsample: UpsamplePolicy = UpsamplePolicy.FFILL,
+) -> np.ndarray:
+    """
+    The prices of the frame over [start_time, end_time) at resolution_minutes,
+    one value per target interval starting at start_time.
+    """
+    if df.empty:
+        return np.full(_intervals_count(start_time, end_time, resolution_minutes), np.nan)
+    source_minutes = infer_resolution_minutes(df)
+    grid = to_regular_grid(df, start_time, end_time, source_minutes)
+    values = resample_regular(grid, source_minutes, resolution_minutes, upsample)
+    return values[:_intervals_count(start_time, end_time, resolution_minutes)]
+
+
+def _time_weighted_mean(
+    values: np.ndarray,
+    source_minutes: int,
+    target_minutes: int,
+    targets_count: int,
+) -> np.ndarray:
+    valid = ~np.isnan(values)
+    # integral of the prices and of the time with a price, at every source boundary
+    zeros = np.zeros((1,) + values.shape[1:])
+    price_integral = np.concatenate([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)]) * source_minutes
+    valid_integral = np.concatenate([zeros, np.cumsum(valid, axis=0)]) * source_minutes
+
+    # both integrals are linear within a source interval, so the value at a target boundary
+    # is interpolated from the two source boundaries around it
+    boundaries = np.minimum(np.arange(targets_count + 1) * target_minutes / source_minutes, len(values))
+    lower = np.minimum(np.floor(boundaries).astype(np.int64), len(values) - 1)
+    fraction = (boundaries - lower).reshape((-1,) + (1,) * (values.ndim - 1))
+
+    def at_boundaries(integral: np.ndarray) -> np.ndarray:
+        return integral[lower] + fraction * (integral[lower + 1] - integral[lower])
+
+    price_sums = np.diff(at_boundaries(price_integral), axis=0)
+    valid_minutes = np.diff(at_boundaries(valid_integral), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid_minutes > 0, price_sums / valid_minutes, np.nan)
+
+
+def _upsample(
+    values: np.ndarray,
+    source_minutes: int,
+    target_minutes: int,
+    targets_count: int,
+    upsample: UpsamplePolicy,
+) -> np.ndarray:
+    positions = np.arange(targets_count) * target_minutes / source_minutes
+    source_index = np.floor(positions).astype(np.int64)
+    held = values[source_index]
+    if upsample == UpsamplePolicy.FFILL:
+        return held
+    if upsample != UpsamplePolicy.LINEAR:
+        raise ValueError(f"unknown upsample policy {upsample}")
+
+    next_index = np.minimum(source_index + 1, len(values) - 1)
+    fraction = (positions - source_index).reshape((-1,) + (1,) * (values.ndim - 1))
+    following = values[next_index]
+    # a missing next price holds the current one, so only a missing current price gives nan
+    following = np.where(np.isnan(following), held, following)
+    return held + fraction * (following - held)
+
+
+def _intervals_count(start_time: datetime, end_time: datetime, resolution_minutes: int) -> int:
+    step = resolution_minutes * NANOSECONDS_PER_MINUTE
+    return int(-(-(to_ns(end_time) - to_ns(start_time)) // step))
@@ -0,0 +1,79 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Hashable, List, Optional
+import pandas as pd
+
+from price_analyzer.utils.timestamps import to_utc
+
+
+@dataclass
+class SessionMemoStats:
+    hits: int = 0
+    misses: int = 0
+
+
+@dataclass
+class _Entry:
+    start_time: pd.Timestamp
+    end_time: pd.Timestamp
+    frame: pd.DataFrame
+
+
+class SessionMemo:
+    """
+    The frames a service returned in a session, keyed by the request without the window.
+    A request is served from a frame loaded for a window that contains its own, sliced to
+    the requested window, so one analysis run reads each series once.
+    There is no expiry, entries stay until they are invalidated or the session ends.
+    NOTE: a request for the exact loaded window gets the stored frame itself, not a copy.
+    """
+
+    def __init__(self):
+        self.stats = SessionMemoStats()
+        self._entries: Dict[Hashable, List[_Entry]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, start_time: datetime, end_time: datetime) -> Optional[pd.DataFrame]:
+        start_time, end_time = to_utc(start_time), to_utc(end_time)
+        with self._lock:
+            for entry in self._entries.get(key, []):
+                if entry.start_time <= start_time and end_time <= entry.end_time:
+                    self.stats.hits += 1
+                    return _slice(entry, start_time, end_time)
+            self.stats.misses += 1
+            return None
+
+    def put(self, key: Hashable, start_time: datetime, end_time: datetime, frame: pd.DataFrame) -> None:
+        start_time, end_time = to_utc(start_time), to_utc(end_time)
+        with self._lock:
+            # a wider window makes the ones it contains useless
+            entries = [
+                entry for entry in self._entries.get(key, [])
+                if not (start_time <= entry.start_time and entry.end_time <= end_time)
+            ]
+            entries.append(_Entry(start_time, end_time, frame))
+            self._entries[key] = entries
+
+    def invalidate(self, matches: Optional[Callable[[Hashable], bool]] = None) -> None:
+        """
+        drops the entries of the keys that match, or everything if matches is not given.
+        """
+        with self._lock:
+            self._entries = {
+                key: entries for key, entries in self._entries.items()
+                if matches is not None and not matches(key)
+            }
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+
+def _slice(entry: _Entry, start_time: pd.Timestamp, end_time: pd.Timestamp) -> pd.DataFrame:
+    if entry.start_time == start_time and entry.end_time == end_time:
+        return entry.frame
+    frame = entry.frame
+    return frame[
+        (frame['interval_start_utc'] >= start_time) &
+        (frame['interval_end_utc'] <= end_time)
+    ]
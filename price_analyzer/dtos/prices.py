@@ -1,19 +1,153 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Tuple, Union
 from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
 
-from price_analyzer.dtos.basic_types import PriceType, PriceLocationType
+from price_analyzer.dtos.basic_types import MarketType, PriceType, PriceLocationType
 
 
 @dataclass
 class PriceLocation:
+    __slots__ = ("name", "location_type")
     name: str
     location_type: PriceLocationType
 
-@dataclass
+@dataclass(eq=False)
 class Price:
+    """
+    the prices of one product over a regular grid, starting at start_time with one value
+    per interval_duration. The values are a contiguous float64 (or float32) array, lists are
+    converted once on construction, use tolist() where a list of floats is needed.
+    NOTE: the values may be a view on the frame they came from (see from_frame),
+    so they should not be modified in place.
+    """
+    __slots__ = ("price_type", "values", "start_time", "interval_duration")
     price_type: PriceType
-    values: List[float]
+    values: np.ndarray
     start_time: datetime   # NOTE: let's come back to this
     interval_duration: timedelta
-    
\ No newline at end of file
+
+    def __post_init__(self):
+        self.values = _as_price_array(self.values)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        price_type: PriceType,
+        start_time: datetime,
+        interval_duration: timedelta,
+        value_column: str = "price",
+    ) -> "Price":
+        """
+        the prices of a frame that is already on the regular grid, the values are
+        a view on the column and not a copy whenever pandas can give one.
+        """
+        return cls(
+            price_type=price_type,
+            values=df[value_column].to_numpy(copy=False),
+            start_time=start_time,
+            interval_duration=interval_duration,
+        )
+
+    @property
+    def end_time(self) -> datetime:
+        return self.start_time + len(self.values) * self.interval_duration
+
+    def tolist(self) -> List[float]:
+        return self.values.tolist()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        # so np.asarray(price) is the values without a copy
+        if copy:
+            return np.array(self.values, dtype=dtype, copy=True)
+        return self.values if dtype is None else self.values.astype(dtype, copy=False)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Price):
+            return NotImplemented
+        return (
+            self.price_type == other.price_type
+            and self.start_time == other.start_time
+            and self.interval_duration == other.interval_duration
+            and np.array_equal(self.values, other.values, equal_nan=True)
+        )
+
+
+@dataclass(eq=False)
+class PriceMatrix:
+    """
+    the prices of many locations on one time grid, values is (locations, intervals) with
+    row i for locations[i] and column j for the interval starting at start_time + j * interval_duration.
+    Gaps are NaN, mask tells where there is a price.
+    """
+    __slots__ = ("price_type", "locations", "values", "start_time", "interval_duration")
+    price_type: PriceType
+    locations: List[PriceLocation]
+    values: np.ndarray
+    start_time: datetime
+    interval_duration: timedelta
+
+    def __post_init__(self):
+        self.values = _as_price_array(self.values)
+        if self.values.ndim != 2 or self.values.shape[0] != len(self.locations):
+            raise ValueError("values should be (locations, intervals)")
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def end_time(self) -> datetime:
+        return self.start_time + self.values.shape[1] * self.interval_duration
+
+    @property
+    def mask(self) -> np.ndarray:
+        return ~np.isnan(self.values)
+
+    @property
+    def interval_starts(self) -> pd.DatetimeIndex:
+        return pd.date_range(start=self.start_time, periods=self.values.shape[1], freq=self.interval_duration)
+
+    def price(self, location_name: str) -> Price:
+        """
+        the row of a location as a Price, a view on the matrix.
+        """
+        names = [location.name for location in self.locations]
+        return Price(
+            price_type=self.price_type,
+            values=self.values[names.index(location_name)],
+            start_time=self.start_time,
+            interval_duration=self.interval_duration,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        the matrix as a frame indexed by the interval starts with a column per location.
+        """
+        return pd.DataFrame(
+            self.values.T,
+            index=pd.Index(self.interval_starts, name="interval_start_utc"),
+            columns=[location.name for location in self.locations],
+        )
+
+
+@dataclass
+class PriceRequest:
+    market_type: MarketType
+    price_type: PriceType
+    location: PriceLocation
+    start_time: datetime
+    end_time: datetime
+    resolution_minutes: int
+
+
+def _as_price_array(values: Union[np.ndarray, List[float]]) -> np.ndarray:
+    # float32 arrays are kept as they are, everything else is float64, no copy if it already is
+    values = np.asarray(values)
+    dtype = np.float32 if values.dtype == np.float32 else np.float64
+    return np.ascontiguousarray(values, dtype=dtype)
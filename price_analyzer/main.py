@@ -22,47 +22,49 @@ def main():
     price_service = PriceService(price_data_client=GridStatusPriceClient())
     price_service.initialize_service_iso(ISOType.ERCOT)
 
-    daily_stats, daily_stats_extended = get_price_stats(
-        price_service=price_service,
-        market_type=MarketType.DAM,
-        price_type=PriceType.SPP,
-        location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
-        start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
-        end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
-    )
+    # the tasks below ask for the same DAM window again and again, in a session it is read once
+    with price_service.session():
+        daily_stats, daily_stats_extended = get_price_stats(
+            price_service=price_service,
+            market_type=MarketType.DAM,
+            price_type=PriceType.SPP,
+            location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
+            start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
+            end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
+        )
 
-    peak_offpeak_periods, peak_offpeak_periods_stats = get_period_price_stats(
-        price_service=price_service,
-        market_type=MarketType.DAM,
-        price_type=PriceType.SPP,
-        location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
-        start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
-        end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
-    )
+        peak_offpeak_periods, peak_offpeak_periods_stats = get_period_price_stats(
+            price_service=price_service,
+            market_type=MarketType.DAM,
+            price_type=PriceType.SPP,
+            location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
+            start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
+            end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
+        )
 
-    weekly_stats, weekly_stats_extended, weekday_weekend_stats = get_weekly_price_stats(
-        price_service=price_service,
-        market_type=MarketType.DAM,
-        price_type=PriceType.SPP,
-        location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
-        start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
-        end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
-    )
+        weekly_stats, weekly_stats_extended, weekday_weekend_stats = get_weekly_price_stats(
+            price_service=price_service,
+            market_type=MarketType.DAM,
+            price_type=PriceType.SPP,
+            location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
+            start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
+            end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
+        )
 
-    price_hourly_mean, hourly_variations = get_hourly_mean(
-        price_service=price_service,
-        market_type=MarketType.DAM,
-        price_type=PriceType.SPP,
-        location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
-        start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
-        end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
-    )
+        price_hourly_mean, hourly_variations = get_hourly_mean(
+            price_service=price_service,
+            market_type=MarketType.DAM,
+            price_type=PriceType.SPP,
+            location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
+            start_time=datetime(2024, 10, 1, 6, tzinfo=UTC),
+            end_time=datetime(2024, 10, 30, 5, tzinfo=UTC),
+        )
+
+        dart_stats = get_dam_rtm_price_stats(
+            price_service=price_service,
+            location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
+        )
 
-    dart_stats = get_dam_rtm_price_stats(
-        price_service=price_service,
-        location=PriceLocation(name="HB_HOUSTON", location_type=PriceLocationType.HUB),
-    )
-  
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
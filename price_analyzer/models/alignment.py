@@ -0,0 +1,106 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+from price_analyzer.dtos.prices import PriceMatrix
+from price_analyzer.utils.timestamps import column_ns
+
+# NOTE: the DAM clears hourly and the RTM every 15 minutes, a DART (DAM - RTM) is only meaningful
+# when every RTM interval is matched with the DAM hour it falls in. Matching the rows by position
+# pairs the n-th DAM hour with the n-th RTM interval, which is wrong after the first one.
+
+
+def align_to_intervals(
+    source_df: pd.DataFrame,
+    target_df: pd.DataFrame,
+    value_column: str = "price",
+) -> np.ndarray:
+    """
+    The value of the source record whose interval holds each target interval start, so a coarse
+    series (e.g. hourly DAM) is broadcast onto a finer grid (e.g. 15 minute RTM) by timestamp.
+    One searchsorted over the source starts, no resample or reindex, the frames do not need to
+    cover the same window. A target interval with no source record around it
+    (a gap, or outside the source window) is nan.
+    """
+    aligned = np.full(len(target_df), np.nan)
+    if source_df.empty or target_df.empty:
+        return aligned
+
+    source_starts = column_ns(source_df["interval_start_utc"])
+    source_ends = column_ns(source_df["interval_end_utc"])
+    values = source_df[value_column].to_numpy(dtype=np.float64)
+    if np.any(np.diff(source_starts) < 0):
+        order = np.argsort(source_starts, kind="stable")
+        source_starts, source_ends, values = source_starts[order], source_ends[order], values[order]
+
+    target_starts = column_ns(target_df["interval_start_utc"])
+    # the last source interval starting at or before the target start
+    index = np.searchsorted(source_starts, target_starts, side="right") - 1
+    found = index >= 0
+    index = np.maximum(index, 0)
+    inside = found & (target_starts < source_ends[index])
+    aligned[inside] = values[index[inside]]
+    return aligned
+
+
+def dam_rtm_dart(dam_df: pd.DataFrame, rtm_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The DART of one node on the RTM grid: every RTM interval with the DAM price of the hour
+    it falls in, the RTM price and their difference. The RTM intervals with no DAM price
+    are kept with a nan dart, so the gaps stay visible.
+    """
+    dam_price = align_to_intervals(dam_df, rtm_df)
+    rtm_price = rtm_df["price"].to_numpy(dtype=np.float64)
+    return pd.DataFrame({
+        "interval_start_utc": rtm_df["interval_start_utc"].array,
+        "interval_end_utc": rtm_df["interval_end_utc"].array,
+        "dam_price": dam_price,
+        "rtm_price": rtm_price,
+        "dart": dam_price - rtm_price,
+    })
+
+
+def dam_rtm_dart_many(
+    dam_frames: Dict[str, pd.DataFrame],
+    rtm_frames: Dict[str, pd.DataFrame],
+) -> Dict[str, pd.DataFrame]:
+    """
+    dam_rtm_dart for the nodes that have both a DAM and an RTM frame, e.g. the results of
+    PriceService.get_price_actual_df_many for the two markets.
+    """
+    return {
+        node: dam_rtm_dart(dam_frames[node], rtm_frames[node])
+        for node in dam_frames
+        if node in rtm_frames
+    }
+
+
+def dart_matrix(dam: PriceMatrix, rtm: PriceMatrix) -> PriceMatrix:
+    """
+    The DART of many nodes at once, from the DAM and the RTM prices on their regular grids,
+    on the grid of the RTM matrix with the rows of its locations.
+    Each RTM column is mapped to the DAM column it falls in with integer arithmetic on the
+    interval starts, then the whole (locations, intervals) block is subtracted in one go.
+    The locations or intervals missing from the DAM matrix are nan.
+    """
+    dam_rows = {location.name: row for row, location in enumerate(dam.locations)}
+    rows = np.array([dam_rows.get(location.name, -1) for location in rtm.locations], dtype=np.int64)
+
+    dam_step = pd.Timedelta(dam.interval_duration).value
+    offsets = (
+        (rtm.interval_starts.as_unit("ns").asi8 - pd.Timestamp(dam.start_time).value) // dam_step
+    )
+    columns = (offsets >= 0) & (offsets < dam.shape[1])
+
+    aligned = np.full(rtm.shape, np.nan)
+    if dam.values.size:
+        block = dam.values[np.maximum(rows, 0)][:, np.clip(offsets, 0, dam.shape[1] - 1)]
+        aligned = np.where((rows >= 0)[:, None] & columns[None, :], block, np.nan)
+
+    return PriceMatrix(
+        price_type=rtm.price_type,
+        locations=list(rtm.locations),
+        values=aligned - rtm.values,
+        start_time=rtm.start_time,
+        interval_duration=rtm.interval_duration,
+    )
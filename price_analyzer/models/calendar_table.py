@@ -0,0 +1,172 @@
+import logging
+import os
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+# the instants the table covers, one row per 5 minutes in UTC
+CALENDAR_START = pd.Timestamp("2010-01-01", tz="UTC")
+CALENDAR_END = pd.Timestamp("2041-01-01", tz="UTC")
+CALENDAR_RESOLUTION_MINUTES = 5
+
+# where the tables are saved, one .npy per timezone, CALENDAR_TABLE_PATH in the environment moves them
+# e.g. next to a shared cache volume so the workers build them once
+CALENDAR_TABLE_PATH = Path(os.getenv("CALENDAR_TABLE_PATH", Path(__file__).parent / "calendar_tables"))
+
+CALENDAR_DTYPE = np.dtype([
+    ("hour", np.int8),
+    ("date_ordinal", np.int32),   # the ordinal of the local date, like date.toordinal
+    ("day_of_week", np.int8),
+    ("month", np.int8),
+    ("iso_year", np.int16),
+    ("week_of_month", np.int8),
+])
+
+_STEP_NS = CALENDAR_RESOLUTION_MINUTES * 60 * 1_000_000_000
+_HOUR_NS = 60 * 60 * 1_000_000_000
+_DAY_NS = 24 * _HOUR_NS
+# the ordinal of 1970-01-01, a local date is its days since the epoch plus this
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# NOTE: the local time features of an instant only depend on the instant and the timezone, so we
+# compute them once per timezone for every 5 minutes of 2010-2040 (DST included, it is just the
+# tz_convert of the UTC grid) and keep them in a .npy file under CALENDAR_TABLE_PATH. The file is
+# memory-mapped, so the features of a frame are an integer offset lookup into the table and only
+# the pages that are used get read. ~3.3M rows of 10 bytes, ~33MB per timezone.
+_TABLES: Dict[str, np.ndarray] = {}
+_TABLES_LOCK = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def calendar_table(timezone: ZoneInfo) -> np.ndarray:
+    """
+    the memory-mapped calendar of a timezone, built and saved the first time it is used.
+    If it cannot be saved (or read) under CALENDAR_TABLE_PATH, e.g. a read-only install, the
+    built table is kept in memory for this process instead.
+    """
+    path = _calendar_path(timezone)
+    with _TABLES_LOCK:
+        if str(path) not in _TABLES:
+            _TABLES[str(path)] = _load_or_build(path, timezone)
+        return _TABLES[str(path)]
+
+
+def build_calendar_table(timezone: ZoneInfo) -> np.ndarray:
+    grid = pd.date_range(
+        start=CALENDAR_START, end=CALENDAR_END, freq=f"{CALENDAR_RESOLUTION_MINUTES}min", inclusive="left",
+    )
+    return _calendar_rows(grid, timezone)
+
+
+def calendar_features(interval_end_utc: pd.Series, timezone: ZoneInfo) -> pd.DataFrame:
+    """
+    hour, date, day_of_week, month, year (ISO) and week_of_month of the local time of each
+    timestamp, indexed like the timestamps and with the dtypes the .dt accessors give.
+    The timestamps on the 5 minute grid of 2010-2040 are looked up in the table, the few others
+    are computed from their own local time.
+    """
+    instants = pd.DatetimeIndex(interval_end_utc).tz_convert("UTC").as_unit("ns")
+    since_start = instants.asi8 - CALENDAR_START.value
+    offsets = since_start // _STEP_NS
+    on_table = (since_start % _STEP_NS == 0) & (offsets >= 0) & (offsets < _rows_count())
+
+    if on_table.all():
+        rows = calendar_table(timezone)[offsets]
+    else:
+        rows = np.empty(len(instants), dtype=CALENDAR_DTYPE)
+        if on_table.any():
+            rows[on_table] = calendar_table(timezone)[offsets[on_table]]
+        rows[~on_table] = _calendar_rows(instants[~on_table], timezone)
+
+    return pd.DataFrame({
+        "hour": rows["hour"].astype(np.int32),
+        "date": _dates(rows["date_ordinal"]),
+        "day_of_week": rows["day_of_week"].astype(np.int32),
+        "month": rows["month"].astype(np.int32),
+        "year": pd.array(rows["iso_year"], dtype="UInt32"),
+        "week_of_month": rows["week_of_month"].astype(np.int64),
+    }, index=interval_end_utc.index)
+
+
+def _calendar_rows(instants: pd.DatetimeIndex, timezone: ZoneInfo) -> np.ndarray:
+    # everything comes from the local wall clock as integers, the tz_convert is what handles DST
+    wall_clock = instants.tz_convert(timezone).tz_localize(None).as_unit("ns").asi8
+    days = wall_clock // _DAY_NS
+    local_dates = days.astype("datetime64[D]")
+    years = local_dates.astype("datetime64[Y]")
+    months = local_dates.astype("datetime64[M]")
+    # 1970-01-01 is a thursday, and monday is 0
+    day_of_week = (days + 3) % 7
+    # the ISO year of a day is the year of the thursday of its week
+    thursdays = (days - day_of_week + 3).astype("datetime64[D]")
+
+    rows = np.empty(len(instants), dtype=CALENDAR_DTYPE)
+    rows["hour"] = (wall_clock - days * _DAY_NS) // _HOUR_NS
+    rows["date_ordinal"] = days + _EPOCH_ORDINAL
+    rows["day_of_week"] = day_of_week
+    rows["month"] = (months - years).astype(np.int64) + 1
+    rows["iso_year"] = thursdays.astype("datetime64[Y]").astype(np.int64) + 1970
+    rows["week_of_month"] = (local_dates - months).astype(np.int64) // 7 + 1
+    return rows
+
+
+def _dates(ordinals: np.ndarray) -> np.ndarray:
+    # the features keep the python dates of .dt.date, they are made once per distinct day
+    days, positions = np.unique(ordinals, return_inverse=True)
+    dates = np.array([date.fromordinal(int(day)) for day in days], dtype=object)
+    return dates[positions.reshape(-1)]
+
+
+def _rows_count() -> int:
+    return int((CALENDAR_END.value - CALENDAR_START.value) // _STEP_NS)
+
+
+def _calendar_path(timezone: ZoneInfo) -> Path:
+    # e.g. US/Central -> US_Central.npy
+    return CALENDAR_TABLE_PATH / (str(timezone).replace("/", "_") + ".npy")
+
+
+def _load_or_build(path: Path, timezone: ZoneInfo) -> np.ndarray:
+    try:
+        if path.exists():
+            return np.load(path, mmap_mode="r")
+    except OSError as error:
+        logger.warning("could not read the calendar table %s, building it in memory: %s", path, error)
+        return build_calendar_table(timezone)
+
+    table = build_calendar_table(timezone)
+    try:
+        _save_table(path, table)
+        return np.load(path, mmap_mode="r")
+    except OSError as error:
+        logger.warning("could not save the calendar table %s, keeping it in memory: %s", path, error)
+        return table
+
+
+def _save_table(path: Path, table: np.ndarray) -> None:
+    # a temp file of our own, two processes may build the same table at the same time
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix=".tmp", delete=False)
+    tmp_path = Path(file_handler.name)
+    try:
+        with file_handler:
+            np.save(file_handler, table)
+        # the temp file is 0600, the table is read by the workers of the other users too
+        os.chmod(tmp_path, 0o644 & ~_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _umask() -> int:
+    # there is no way to read the umask without setting it
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
@@ -0,0 +1,221 @@
+import warnings
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+from price_analyzer.dtos.prices import Price
+from price_analyzer.utils.timestamps import infer_resolution_minutes
+
+MINUTES_PER_DAY = 24 * 60
+
+_MINUTE_NS = 60 * 1_000_000_000
+_DAY_NS = MINUTES_PER_DAY * _MINUTE_NS
+
+
+@dataclass(eq=False)
+class DailyProfileMatrix:
+    """
+    the prices of one location as a (days, intervals) matrix in local time, row i for the local
+    date dates[i] (consecutive days) and column j for the interval starting j * interval_minutes
+    after local midnight. Every day has the same width, so on the DST days the missing hour is
+    nan and the repeated hour is the mean of its two prices. Gaps are nan, mask tells where there
+    is a price.
+    With by_interval_end the intervals go by the local date and time of their end instead, like
+    the hour_info of the features (the hour ending at midnight is column 0 of the next day).
+    NOTE: build it once (from_frame or from_price) and hand it to the reductions and the stats,
+    instead of each of them regrouping the frame by date.
+    """
+    __slots__ = ("dates", "values", "interval_minutes", "timezone", "by_interval_end")
+    dates: np.ndarray   # datetime64[D]
+    values: np.ndarray
+    interval_minutes: int
+    timezone: ZoneInfo
+    by_interval_end: bool
+
+    def __post_init__(self):
+        self.dates = np.asarray(self.dates, dtype="datetime64[D]")
+        self.values = np.ascontiguousarray(self.values, dtype=np.float64)
+        if self.interval_minutes <= 0 or MINUTES_PER_DAY % self.interval_minutes != 0:
+            raise ValueError("interval_minutes should divide a day")
+        if self.values.ndim != 2 or self.values.shape != (len(self.dates), MINUTES_PER_DAY // self.interval_minutes):
+            raise ValueError("values should be (days, intervals of a day)")
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        timezone: ZoneInfo,
+        interval_minutes: Optional[int] = None,
+        value_column: str = "price",
+        by_interval_end: bool = False,
+    ) -> "DailyProfileMatrix":
+        """
+        the matrix of a price frame, at the resolution of the frame unless interval_minutes is
+        given, the records that fall in the same interval (e.g. 15 min prices in an hourly
+        matrix) are averaged, missing prices left out.
+        """
+        if interval_minutes is None:
+            interval_minutes = infer_resolution_minutes(df) if not df.empty else 60
+        column = "interval_end_utc" if by_interval_end else "interval_start_utc"
+        return cls._from_instants(
+            pd.DatetimeIndex(df[column]),
+            df[value_column].to_numpy(dtype=np.float64),
+            timezone,
+            interval_minutes,
+            by_interval_end,
+        )
+
+    @classmethod
+    def from_price(
+        cls,
+        price: Price,
+        timezone: ZoneInfo,
+        interval_minutes: Optional[int] = None,
+        by_interval_end: bool = False,
+    ) -> "DailyProfileMatrix":
+        if interval_minutes is None:
+            interval_minutes = int(price.interval_duration.total_seconds() // 60)
+        starts = pd.date_range(start=price.start_time, periods=len(price.values), freq=price.interval_duration)
+        if starts.tz is None:
+            starts = starts.tz_localize("UTC")
+        instants = starts + price.interval_duration if by_interval_end else starts
+        return cls._from_instants(instants, price.values, timezone, interval_minutes, by_interval_end)
+
+    @classmethod
+    def _from_instants(
+        cls,
+        instants: pd.DatetimeIndex,
+        values: np.ndarray,
+        timezone: ZoneInfo,
+        interval_minutes: int,
+        by_interval_end: bool,
+    ) -> "DailyProfileMatrix":
+        if interval_minutes <= 0 or MINUTES_PER_DAY % interval_minutes != 0:
+            raise ValueError("interval_minutes should divide a day")
+        width = MINUTES_PER_DAY // interval_minutes
+        days, columns = _local_day_and_column(instants, timezone, interval_minutes)
+        if len(days) == 0:
+            return cls(np.array([], dtype="datetime64[D]"), np.empty((0, width)), interval_minutes, timezone, by_interval_end)
+
+        first_day = days.min()
+        days_count = int(days.max() - first_day) + 1
+        cells = (days - first_day) * width + columns
+        valid = ~np.isnan(values)
+        sums = np.bincount(cells, weights=np.where(valid, values, 0.0), minlength=days_count * width)
+        counts = np.bincount(cells, weights=valid, minlength=days_count * width)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            matrix = np.where(counts > 0, sums / counts, np.nan)
+
+        return cls(
+            dates=np.arange(first_day, first_day + days_count).astype("datetime64[D]"),
+            values=matrix.reshape(days_count, width),
+            interval_minutes=interval_minutes,
+            timezone=timezone,
+            by_interval_end=by_interval_end,
+        )
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def width(self) -> int:
+        return self.values.shape[1]
+
+    @property
+    def mask(self) -> np.ndarray:
+        return ~np.isnan(self.values)
+
+    @property
+    def complete_days(self) -> np.ndarray:
+        return self.mask.all(axis=1)
+
+    @property
+    def interval_hours(self) -> np.ndarray:
+        # the local hour of each column
+        return np.arange(self.width) * self.interval_minutes // 60
+
+    @property
+    def day_of_week(self) -> np.ndarray:
+        # monday is 0, 1970-01-01 was a thursday
+        return (self.dates.astype(np.int64) + 3) % 7
+
+    def date_list(self) -> List[date]:
+        return self.dates.tolist()
+
+    def locate(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        the row and the column of each record of a frame, -1 for the ones outside of the matrix.
+        """
+        column = "interval_end_utc" if self.by_interval_end else "interval_start_utc"
+        days, columns = _local_day_and_column(pd.DatetimeIndex(df[column]), self.timezone, self.interval_minutes)
+        rows = days - (self.dates[0].astype(np.int64) if len(self.dates) else 0)
+        inside = (rows >= 0) & (rows < len(self.dates))
+        return np.where(inside, rows, -1), np.where(inside, columns, -1)
+
+    def daily_mean(self) -> np.ndarray:
+        return _nan_reduce(np.nanmean, self.values, axis=1)
+
+    def daily_std(self) -> np.ndarray:
+        return _nan_reduce(np.nanstd, self.values, axis=1)
+
+    def daily_min(self) -> np.ndarray:
+        return _nan_reduce(np.nanmin, self.values, axis=1)
+
+    def daily_max(self) -> np.ndarray:
+        return _nan_reduce(np.nanmax, self.values, axis=1)
+
+    def interval_mean(self) -> np.ndarray:
+        # the average day, the mean of each interval across the days
+        return _nan_reduce(np.nanmean, self.values, axis=0)
+
+    def hourly(self) -> "DailyProfileMatrix":
+        """
+        the same days at hourly resolution, the mean of the intervals of each hour.
+        """
+        if self.interval_minutes == 60:
+            return self
+        if 60 % self.interval_minutes != 0:
+            raise ValueError("the intervals should divide an hour")
+        per_hour = 60 // self.interval_minutes
+        return DailyProfileMatrix(
+            dates=self.dates,
+            values=_nan_reduce(np.nanmean, self.values.reshape(len(self.dates), 24, per_hour), axis=2),
+            interval_minutes=60,
+            timezone=self.timezone,
+            by_interval_end=self.by_interval_end,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        the matrix as a frame indexed by the dates with a column per interval of the day.
+        """
+        return pd.DataFrame(
+            self.values,
+            index=pd.Index(self.date_list(), name="date"),
+            columns=pd.Index(range(self.width), name="interval"),
+        )
+
+
+def _local_day_and_column(
+    instants: pd.DatetimeIndex,
+    timezone: ZoneInfo,
+    interval_minutes: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # the local date (days since the epoch) and the interval of the day of each instant
+    if len(instants) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    wall_clock = instants.tz_convert(timezone).tz_localize(None).as_unit("ns").asi8
+    days = wall_clock // _DAY_NS
+    columns = (wall_clock - days * _DAY_NS) // (interval_minutes * _MINUTE_NS)
+    return days, columns
+
+
+def _nan_reduce(reduce, values: np.ndarray, axis: int) -> np.ndarray:
+    # the all nan rows (or columns) are nan, without the runtime warning numpy gives for them
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return reduce(values, axis=axis)
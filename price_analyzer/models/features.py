@@ -1,61 +1,55 @@
 import pandas as pd
 from zoneinfo import ZoneInfo
-from sklearn.cluster import KMeans
-from typing import List
+import numpy as np
+from typing import List, Optional
+from price_analyzer.models.alignment import dam_rtm_dart
+from price_analyzer.models.calendar_table import calendar_features
+from price_analyzer.models.daily_profile import DailyProfileMatrix
+from price_analyzer.models.peak_segmentation import PERIOD_LABELS, peak_period_codes
 
 def local_time_date_hour(df: pd.DataFrame, timezone: ZoneInfo) -> pd.DataFrame:
     df_new = df[["interval_end_utc"]].copy()
     df_new["interval_end_local"] = df_new["interval_end_utc"].dt.tz_convert(timezone)
-    df_new["hour"] = df_new["interval_end_local"].dt.hour
-    df_new["date"] = df_new["interval_end_local"].dt.date
-    df_new["day_of_week"] = df_new["interval_end_local"].dt.day_of_week
+    # the calendar features are a lookup in the calendar table, see calendar_table
+    calendar = calendar_features(df_new["interval_end_utc"], timezone)
+    df_new["hour"] = calendar["hour"]
+    df_new["date"] = calendar["date"]
+    df_new["day_of_week"] = calendar["day_of_week"]
 
     return df_new
 
 def weekly_monthly_info(df: pd.DataFrame, timezone: ZoneInfo) -> pd.DataFrame:
-    hour_info = local_time_date_hour(df, timezone)
+    calendar = calendar_features(df["interval_end_utc"], timezone)
 
     df_new = df[["interval_end_utc"]].copy()
-    df_new["day_of_week"] = hour_info["interval_end_local"].dt.day_of_week
-    df_new["month"] = hour_info["interval_end_local"].dt.month
-    df_new["year"] = hour_info["interval_end_local"].dt.isocalendar().year
-    df_new["week_of_month"] = hour_info["interval_end_local"].apply(lambda d: (d.day - 1) // 7 + 1)
-    df_new["is_weekend"] = df_new["day_of_week"].apply(lambda x: True if x >= 5 else False)
+    df_new["day_of_week"] = calendar["day_of_week"]
+    df_new["month"] = calendar["month"]
+    df_new["year"] = calendar["year"]
+    df_new["week_of_month"] = calendar["week_of_month"]
+    df_new["is_weekend"] = df_new["day_of_week"] >= 5
 
     return df_new
 
-def peak_offpeak_labels(df: pd.DataFrame, timezone: ZoneInfo) -> pd.DataFrame:
+def peak_offpeak_labels(
+    df: pd.DataFrame,
+    timezone: ZoneInfo,
+    profile: Optional[DailyProfileMatrix] = None,
+) -> pd.DataFrame:
 
     df_copy = df[['price']].copy()
-    hour_info = local_time_date_hour(df, timezone)
-
-    df_copy  = pd.concat([df_copy, hour_info], axis=1)
-
-    for date, group in df_copy.groupby('date'):
-        hourly = group.groupby('hour')['price'].mean().reset_index()
-
-        # Ensure exactly 24 hourly values for clustering
-        if len(hourly) != 24:
-            continue  # skip incomplete days
+    # one row of 24 hourly means per day, by the hour ending like the hour_info, the days with a
+    # missing hour have a nan and are skipped. It can be passed in when it is already there (see PriceFrame)
+    if profile is None:
+        profile = DailyProfileMatrix.from_frame(df, timezone, interval_minutes=60, by_interval_end=True)
 
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init='auto')
-        hourly['cluster'] = kmeans.fit_predict(hourly[['price']].values.reshape(-1, 1))
+    # all the days are clustered at once, see peak_segmentation
+    codes = peak_period_codes(profile.values)
 
-        # Rank clusters by average price
-        cluster_order = hourly.groupby('cluster')['price'].mean().sort_values()
-        cluster_to_label = {
-            cluster_order.index[0]: 'off_peak',
-            cluster_order.index[1]: 'mid_peak',
-            cluster_order.index[2]: 'peak'
-        }
-
-        hourly['label'] = hourly['cluster'].map(cluster_to_label)
-
-        # Map back to main df
-        hourly_label_map = hourly.set_index('hour')['label'].to_dict()
-
-        date_mask = df_copy['date'] == date
-        df_copy.loc[date_mask, 'price_period'] = df_copy.loc[date_mask, 'hour'].map(hourly_label_map)
+    # Map back to main df
+    rows, columns = profile.locate(df)
+    row_codes = codes[rows, columns] if len(codes) else np.full(len(df_copy), -1)
+    labeled = (rows >= 0) & (row_codes >= 0)
+    df_copy['price_period'] = np.where(labeled, PERIOD_LABELS[np.maximum(row_codes, 0)], np.nan)
 
     return df_copy[["price_period"]]
 
@@ -65,9 +59,12 @@ def attach_peak_offpeak_labels(
     offpeak_hours: List[int],
     midpeak_hours: List[int],
     timezone: ZoneInfo,
+    hour_info: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     
-    df_copy = local_time_date_hour(df, timezone)
+    if hour_info is None:
+        hour_info = local_time_date_hour(df, timezone)
+    df_copy = hour_info[['hour']].copy()
 
     # Assign a period label based on the hour
     def assign_period(hour):
@@ -89,27 +86,24 @@ def dam_rtm_hourly_dif(
     rtm_df: pd.DataFrame,
     timezone: ZoneInfo,
 ) -> pd.DataFrame:
-    
-    hour_info = local_time_date_hour(dam_df, timezone)
-    df_copy = dam_df[['price']].copy()
-    dam_df_copy = pd.concat([df_copy, hour_info], axis=1)
-
-    dam_df_copy.set_index("interval_end_local", inplace=True)
-    dam_df_copy.resample('15T').ffill()
-    dam_df_copy.reset_index(inplace=True)
-
-    dam_df_copy["dart"] = dam_df_copy["price"] - rtm_df["price"]
+    # NOTE: the DAM hours are broadcast onto the RTM intervals by timestamp, see alignment,
+    # so there is one dart per RTM interval and the timezone only matters to the callers
+    dart = dam_rtm_dart(dam_df, rtm_df)
 
-    return dam_df_copy[['interval_end_utc', 'dart']]
+    return dart[['interval_end_utc', 'dart']]
 
 
 def price_hourly_variations(
     df: pd.DataFrame,
     timezone: ZoneInfo,
+    hour_info: Optional[pd.DataFrame] = None,
+    price_period: Optional[pd.DataFrame] = None,
 ) -> pd.DataFrame:
     
-    hour_info = local_time_date_hour(df, timezone)
-    price_period = peak_offpeak_labels(df, timezone)
+    if hour_info is None:
+        hour_info = local_time_date_hour(df, timezone)
+    if price_period is None:
+        price_period = peak_offpeak_labels(df, timezone)
     df_copy = df[['price']].copy()
     df_copy = pd.concat([df_copy, hour_info, price_period], axis=1)
 
@@ -118,4 +112,4 @@ def price_hourly_variations(
     df = df_copy.merge(period_avg, on='price_period')
     df['delta_from_avg'] = df['price'] - df['period_avg_price']
 
-    return df[['interval_end_utc', 'price_period', 'period_avg_price','delta_from_avg']]
\ No newline at end of file
+    return df[['interval_end_utc', 'hour', 'price_period', 'period_avg_price','delta_from_avg']]
\ No newline at end of file
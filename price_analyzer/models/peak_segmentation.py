@@ -0,0 +1,176 @@
+import numpy as np
+
+PERIOD_LABELS = np.array(['off_peak', 'mid_peak', 'peak'], dtype=object)
+
+N_CLUSTERS = 3
+RANDOM_STATE = 42
+MAX_ITER = 300
+TOL = 1e-4
+
+# NOTE: the peak labels used to come from a KMeans(n_clusters=3, random_state=42, n_init='auto')
+# fit per day on its 24 hourly prices, i.e. one k-means++ seeding and one Lloyd run per day.
+# With a fixed random_state the seeding draws do not depend on the data, so every day gets the
+# same draws, and Lloyd in 1-D is a handful of elementwise steps, so we run the exact same
+# algorithm for all days at once on the (days, hours) matrix and get the same labels.
+# The ties (an hour right in between two centers, two seeding candidates as good as each other)
+# are common with prices rounded to the dollar, they go the same way as in sklearn as long as we
+# get the same floats, so every step does its arithmetic in the order sklearn does: the products
+# one by one, the sums of the centers in the order of the hours, the potentials through the same
+# matmul, and the first of equal distances wins. The empty clusters are moved like sklearn does too.
+
+
+def peak_period_codes(hourly_prices: np.ndarray) -> np.ndarray:
+    """
+    The peak period of every hour of every day of a (days, hours) matrix, 0 for off peak,
+    1 for mid peak and 2 for peak, from the 3 clusters of the day ranked by their mean price.
+    The days with a nan, or with fewer than 3 distinct prices, are not labeled and get -1.
+    """
+    values = np.asarray(hourly_prices, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError("hourly_prices should be (days, hours)")
+    codes = np.full(values.shape, -1, dtype=np.int8)
+    if values.shape[1] < N_CLUSTERS:
+        return codes
+
+    ordered = np.sort(values, axis=1)
+    valid = ~np.isnan(values).any(axis=1) & ((np.diff(ordered, axis=1) > 0).sum(axis=1) >= N_CLUSTERS - 1)
+    if not valid.any():
+        return codes
+
+    labels = _batched_kmeans(values[valid])
+    codes[valid] = _rank_by_mean(values[valid], labels)
+    return codes
+
+
+def _batched_kmeans(values: np.ndarray) -> np.ndarray:
+    # the tolerance is on the variance of the prices, and sklearn clusters the centered prices
+    tolerance = np.var(values, axis=1) * TOL
+    x = values - values.mean(axis=1, keepdims=True)
+    centers = _kmeans_plusplus(x)
+
+    labels = np.full(x.shape, -1, dtype=np.int64)
+    strict = np.zeros(len(x), dtype=bool)
+    active = np.ones(len(x), dtype=bool)
+    for _ in range(MAX_ITER):
+        rows = np.flatnonzero(active)
+        if len(rows) == 0:
+            break
+        new_labels = _assign(x[rows], centers[rows])
+        new_centers = _update_centers(x[rows], centers[rows], new_labels)
+
+        shift = _center_shift(centers[rows], new_centers)
+        centers[rows] = new_centers
+        converged = (new_labels == labels[rows]).all(axis=1)
+        strict[rows[converged]] = True
+        labels[rows] = new_labels
+        active[rows[converged | (shift <= tolerance[rows])]] = False
+
+    # like sklearn, the labels of a run that stopped on the tolerance follow its last centers
+    loose = np.flatnonzero(~strict)
+    if len(loose):
+        labels[loose] = _assign(x[loose], centers[loose])
+    return labels
+
+
+def _kmeans_plusplus(x: np.ndarray) -> np.ndarray:
+    days, hours = x.shape
+    weights = np.ones(hours)
+    random_state = np.random.RandomState(RANDOM_STATE)
+    n_local_trials = 2 + int(np.log(N_CLUSTERS))
+    first = random_state.choice(hours, p=weights / weights.sum())
+    days_range = np.arange(days)
+
+    centers = np.empty((days, N_CLUSTERS))
+    centers[:, 0] = x[:, first]
+    closest = _squared_distances(x[:, first][:, None], x)[:, 0, :]
+    # NOTE: a (1, hours) @ (hours,) per day like sklearn, a (days, hours) @ (hours,) sums in another order
+    potential = np.matmul(closest[:, None, :], weights)[:, 0]
+    for cluster in range(1, N_CLUSTERS):
+        draws = random_state.uniform(size=n_local_trials)[None, :] * potential[:, None]
+        cumulative = np.cumsum(closest, axis=1)
+        # the searchsorted of the draws in the cumulative distances, for all days at once
+        candidates = np.minimum((cumulative[:, None, :] < draws[:, :, None]).sum(axis=2), hours - 1)
+        candidate_values = np.take_along_axis(x, candidates, axis=1)
+
+        distances = np.minimum(closest[:, None, :], _squared_distances(candidate_values, x))
+        potentials = (distances @ weights.reshape(-1, 1))[:, :, 0]
+        best = np.argmin(potentials, axis=1)
+        centers[:, cluster] = candidate_values[days_range, best]
+        closest = distances[days_range, best]
+        potential = potentials[days_range, best]
+    return centers
+
+
+def _squared_distances(points: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # (days, points) against (days, hours), in the order sklearn computes them
+    distances = -2 * points[:, :, None] * x[:, None, :]
+    distances += (points ** 2)[:, :, None]
+    distances += (x ** 2)[:, None, :]
+    return np.maximum(distances, 0)
+
+
+def _assign(x: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    # the squared norm of the price is the same for every center, so it is left out like sklearn does,
+    # argmin keeps the first of equal distances like the strict < of sklearn
+    distances = (centers ** 2)[:, None, :] - 2 * x[:, :, None] * centers[:, None, :]
+    return np.argmin(distances, axis=2)
+
+
+def _update_centers(x: np.ndarray, old_centers: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    days, hours = x.shape
+    days_range = np.arange(days)
+    sums = np.zeros((days, N_CLUSTERS))
+    counts = np.zeros((days, N_CLUSTERS))
+    # one hour at a time, so every sum adds up in the order of the hours like sklearn
+    for hour in range(hours):
+        sums[days_range, labels[:, hour]] += x[:, hour]
+        counts[days_range, labels[:, hour]] += 1.0
+
+    for row in np.flatnonzero((counts == 0).any(axis=1)):
+        _relocate_empty_clusters(x[row], old_centers[row], labels[row], sums[row], counts[row])
+
+    # in the order of the clusters, an empty one takes the (maybe not yet averaged) biggest one
+    biggest = np.argmax(counts, axis=1)
+    for cluster in range(N_CLUSTERS):
+        filled = counts[:, cluster] > 0
+        with np.errstate(divide='ignore'):
+            averaged = sums[:, cluster] * (1.0 / counts[:, cluster])
+        sums[:, cluster] = np.where(filled, averaged, sums[days_range, biggest])
+    return sums
+
+
+def _relocate_empty_clusters(
+    x: np.ndarray,
+    old_centers: np.ndarray,
+    labels: np.ndarray,
+    sums: np.ndarray,
+    counts: np.ndarray,
+) -> None:
+    # the empty clusters take the hours that are the farthest from their centers, in place,
+    # with the same numpy calls as sklearn so the hours picked out of equal distances are the same
+    empty = np.flatnonzero(counts == 0)
+    distances = (x - old_centers[labels]) ** 2
+    farthest = np.argpartition(distances, -len(empty))[:-len(empty) - 1:-1]
+    if np.max(distances) == 0:
+        return
+    for cluster, hour in zip(empty, farthest):
+        old_cluster = labels[hour]
+        sums[old_cluster] -= x[hour]
+        sums[cluster] = x[hour]
+        counts[cluster] = 1.0
+        counts[old_cluster] -= 1.0
+
+
+def _center_shift(old_centers: np.ndarray, new_centers: np.ndarray) -> np.ndarray:
+    # the sum of the squared distances each center moved, through the sqrt like sklearn
+    return (np.sqrt((new_centers - old_centers) ** 2) ** 2).sum(axis=1)
+
+
+def _rank_by_mean(values: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    # rank the clusters of each day by their mean price, like the labels of the KMeans clusters
+    members = labels[:, :, None] == np.arange(N_CLUSTERS)[None, None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (members * values[:, :, None]).sum(axis=1) / members.sum(axis=1)
+    means = np.where(np.isnan(means), np.inf, means)
+    ranks = np.argsort(np.argsort(means, axis=1, kind='stable'), axis=1)
+    return np.take_along_axis(ranks, labels, axis=1).astype(np.int8)
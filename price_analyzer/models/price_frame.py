@@ -0,0 +1,74 @@
+from typing import Optional, Union
+from zoneinfo import ZoneInfo
+import pandas as pd
+
+from price_analyzer.models.daily_profile import DailyProfileMatrix
+from price_analyzer.models.features import (
+    local_time_date_hour,
+    weekly_monthly_info,
+    peak_offpeak_labels,
+)
+
+
+class PriceFrame:
+    """
+    A price frame with its local time calendar features and peak period labels, each of them
+    computed the first time it is used and kept, so the stats run on one frame do the
+    timezone conversion and the peak labeling once between them.
+    The features are indexed like the frame, so they go with it in a pd.concat(axis=1).
+    NOTE: the frame and the features are shared by the stats, so they should not be modified
+    in place, the stats concat them into their own copy.
+    """
+
+    def __init__(self, df: pd.DataFrame, timezone: ZoneInfo):
+        self.df = df
+        self.timezone = timezone
+        self._hour_info: Optional[pd.DataFrame] = None
+        self._week_info: Optional[pd.DataFrame] = None
+        self._price_period: Optional[pd.DataFrame] = None
+        self._hourly_profile: Optional[DailyProfileMatrix] = None
+
+    @property
+    def hour_info(self) -> pd.DataFrame:
+        # interval_end_utc, interval_end_local, hour, date, day_of_week
+        if self._hour_info is None:
+            self._hour_info = local_time_date_hour(self.df, self.timezone)
+        return self._hour_info
+
+    @property
+    def week_info(self) -> pd.DataFrame:
+        # interval_end_utc, day_of_week, month, year, week_of_month, is_weekend
+        if self._week_info is None:
+            self._week_info = weekly_monthly_info(self.df, self.timezone)
+        return self._week_info
+
+    @property
+    def hourly_profile(self) -> DailyProfileMatrix:
+        # the (days, 24) matrix of the hourly means, by the hour ending like the hour_info
+        if self._hourly_profile is None:
+            self._hourly_profile = DailyProfileMatrix.from_frame(
+                self.df, self.timezone, interval_minutes=60, by_interval_end=True,
+            )
+        return self._hourly_profile
+
+    @property
+    def price_period(self) -> pd.DataFrame:
+        # price_period, the peak labels of peak_offpeak_labels
+        if self._price_period is None:
+            self._price_period = peak_offpeak_labels(self.df, self.timezone, self.hourly_profile)
+        return self._price_period
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+
+def as_price_frame(df: Union[pd.DataFrame, PriceFrame], timezone: ZoneInfo) -> PriceFrame:
+    """
+    the PriceFrame of a frame, a PriceFrame in the same timezone is used as it is, so the
+    stats can take either a plain frame or a PriceFrame that was built once for all of them.
+    """
+    if isinstance(df, PriceFrame):
+        if df.timezone == timezone:
+            return df
+        df = df.df
+    return PriceFrame(df, timezone)
@@ -10,6 +10,8 @@ from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
 from sklearn.decomposition import PCA
 import matplotlib
+from zoneinfo import ZoneInfo
+from price_analyzer.models.daily_profile import DailyProfileMatrix
 # Example: create dummy hourly LMP data for 90 days
 rng = pd.date_range("2025-01-01", periods=24*90, freq="H")
 np.random.seed(42)
@@ -25,9 +27,10 @@ df["hour"] = df["timestamp"].dt.hour
 
 # fig.show
 # fig.show()
-# Pivot so rows = days, columns = hours
-daily_matrix = df.pivot_table(index="date", columns="hour", values="price")
-daily_matrix = daily_matrix.fillna(method="ffill")  # Handle missing values
+# rows = days, columns = hours
+df["interval_start_utc"] = df["timestamp"].dt.tz_localize("UTC")
+daily_matrix = DailyProfileMatrix.from_frame(df, ZoneInfo("UTC"), interval_minutes=60).to_frame()
+daily_matrix = daily_matrix.ffill()  # Handle missing values
 
 
 shape_mat   = daily_matrix.sub(daily_matrix.mean(axis=1), axis=0)
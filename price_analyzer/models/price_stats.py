@@ -1,21 +1,28 @@
 import pandas as pd
 from zoneinfo import ZoneInfo
-from typing import List, Tuple
+from typing import List, Tuple, Union
 from sklearn.cluster import KMeans
 import numpy as np
+from price_analyzer.models.daily_profile import DailyProfileMatrix
 from price_analyzer.models.features import(
     local_time_date_hour,
-    weekly_monthly_info,
     peak_offpeak_labels,
     attach_peak_offpeak_labels,
     dam_rtm_hourly_dif,
     price_hourly_variations as price_hourly_variations_feature,
 )
+from price_analyzer.models.price_frame import PriceFrame, as_price_frame
+from price_analyzer.models.topk_stats import price_daily_stats_top_k
 
-def price_daily_stats(df: pd.DataFrame, timezone: ZoneInfo) -> pd.DataFrame:
+# NOTE: the stats take either a frame or a PriceFrame, with a PriceFrame the calendar features
+# and the peak labels are computed once for all the stats that are run on it
+PriceData = Union[pd.DataFrame, PriceFrame]
+
+def price_daily_stats(df: PriceData, timezone: ZoneInfo) -> pd.DataFrame:
     
-    hour_info = local_time_date_hour(df, timezone)
-    df_copy = df[["price"]].copy()
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
+    df_copy = frame.df[["price"]].copy()
     df_copy = pd.concat([df_copy, hour_info], axis=1)
 
     daily_stats = df_copy.groupby('date')['price'].agg(['mean', 'median', 'min', 'max', 'std']).reset_index()
@@ -23,68 +30,26 @@ def price_daily_stats(df: pd.DataFrame, timezone: ZoneInfo) -> pd.DataFrame:
     daily_stats = daily_stats.merge(day_of_week_map, on='date')
     return daily_stats
 
-def price_weekly_stats(df: pd.DataFrame, timezone: ZoneInfo) -> pd.DataFrame:
-    week_info = weekly_monthly_info(df, timezone)
+def price_weekly_stats(df: PriceData, timezone: ZoneInfo) -> pd.DataFrame:
+    frame = as_price_frame(df, timezone)
+    week_info = frame.week_info
 
-    df_copy = df[["price"]].copy()
+    df_copy = frame.df[["price"]].copy()
     df_copy = pd.concat([df_copy, week_info], axis=1)
     
     weekly_stats = df_copy.groupby(['year', 'month', 'week_of_month'])['price'].agg(['mean', 'median', 'min', 'max', 'std']).reset_index()
     return weekly_stats
 
 def price_daily_stats_extended(
-    df: pd.DataFrame,
+    df: PriceData,
     timezone: ZoneInfo,
 ) -> pd.DataFrame:
-    # Add local time column (assume interval_start_utc is already UTC-aware)
+    # the top 3/2 and bottom 3/2 prices of each day, from one sort of the (days, hours) matrix,
+    # see topk_stats
+    return price_daily_stats_top_k(df, timezone, top=(3, 2), bottom=(3, 2))
 
-    hour_info = local_time_date_hour(df, timezone)
-    df_copy = df[["price"]].copy()
-    df_copy = pd.concat([df_copy, hour_info], axis=1)
-    stats_list = []
-
-    for date, group in df_copy.groupby('date'):
-        group = group.copy()
-        group['hour'] = group['interval_end_local'].dt.hour
-
-        peak_indices_t3 = group['price'].nlargest(3).index.tolist()
-        peak_prices_t3 = group.loc[peak_indices_t3, 'price'].values
-        peak_hours_t3 = group.loc[peak_indices_t3, 'hour'].tolist()
-
-        peak_indices_t2 = group['price'].nlargest(2).index.tolist()
-        peak_prices_t2 = group.loc[peak_indices_t2, 'price'].values
-        peak_hours_t2 = group.loc[peak_indices_t2, 'hour'].tolist()
-
-        offpeak_indices_b3 = group['price'].nsmallest(3).index.tolist()
-        offpeak_prices_b3 = group.loc[offpeak_indices_b3, 'price'].values
-        offpeak_hours_b3 = group.loc[offpeak_indices_b3, 'hour'].tolist()
-
-        offpeak_indices_b2 = group['price'].nsmallest(2).index.tolist()
-        offpeak_prices_b2 = group.loc[offpeak_indices_b2, 'price'].values
-        offpeak_hours_b2 = group.loc[offpeak_indices_b2, 'hour'].tolist()
-
-        stats = {
-            'date': date,
-            'day_of_week': group["day_of_week"].drop_duplicates().values[0],
-            'mean_peak_top3': peak_prices_t3.mean() if len(peak_prices_t3) > 0 else None,
-            'mean_peak_top2': peak_prices_t2.mean() if len(peak_prices_t2) > 0 else None,
-            'peak_top3_hours': peak_hours_t3,
-            'peak_top2_hours': peak_hours_t2,
-            'mean_offpeak_bottom3': offpeak_prices_b3.mean() if len(offpeak_prices_b3) > 0 else None,
-            'mean_offpeak_bottom2': offpeak_prices_b2.mean() if len(offpeak_prices_b2) > 0 else None,
-            'offpeak_bottom3_hours': offpeak_hours_b3,
-            'offpeak_bottom2_hours': offpeak_hours_b2,
-            'std_peak_top3': peak_prices_t3.std() if len(peak_prices_t3) > 0 else None,
-            'std_peak_top2': peak_prices_t2.std() if len(peak_prices_t2) > 0 else None,
-            'std_offpeak_bottom3': offpeak_prices_b3.std() if len(offpeak_prices_b3) > 0 else None,
-            'std_offpeak_bottom2': offpeak_prices_b2.std() if len(offpeak_prices_b2) > 0 else None,            
-        }
-        stats_list.append(stats)
-
-    return pd.DataFrame(stats_list)
-   
 def price_peak_offpeak_hours_aprox(
-    df: pd.DataFrame,
+    df: PriceData,
     timezone: ZoneInfo,
 ) -> Tuple[List[int], List[int], List[int]]:
     # here I want to do some classification to determine (a) peak hours in a set of prices
@@ -92,9 +57,10 @@ def price_peak_offpeak_hours_aprox(
     # the sum of these hours should be 24 hours
     # we need to use a classification algorithm to determine these hours
     
-    hour_info = local_time_date_hour(df, timezone)
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
 
-    df_copy = df[["price"]].copy()
+    df_copy = frame.df[["price"]].copy()
     df_copy = pd.concat([df_copy,hour_info], axis=1)
 
     # Aggregate prices by hour
@@ -121,14 +87,15 @@ def price_peak_offpeak_hours_aprox(
     return peak_hours, midpeak_hours, offpeak_hours 
 
 def price_peak_offpeak_hours(
-    df: pd.DataFrame,
+    df: PriceData,
     timezone: ZoneInfo,
 ) -> Tuple[List[int], List[int], List[int]]:
     
-    hour_info = local_time_date_hour(df,timezone)
-    peak_labels = peak_offpeak_labels(df, timezone)
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
+    peak_labels = frame.price_period
     
-    df_copy = df[['price']].copy()
+    df_copy = frame.df[['price']].copy()
     df_copy = pd.concat([df_copy, hour_info, peak_labels], axis=1)
     dominant_label_dict = _dominant_hourly_category(df_copy)
 
@@ -156,7 +123,7 @@ def _dominant_hourly_category(df: pd.DataFrame) -> dict:
     return result
         
 def price_daily_stats_peak_off_peak(
-    df: pd.DataFrame,
+    df: PriceData,
     peak_hours: List[int],
     offpeak_hours: List[int],
     midpeak_hours: List[int],
@@ -165,9 +132,12 @@ def price_daily_stats_peak_off_peak(
     # group the price data into 3 group per day peak, off-peak, and mid-peak
     # and then calculate the stats for each group
     
-    hour_info  = local_time_date_hour(df, timezone)
-    price_period = attach_peak_offpeak_labels(peak_hours, offpeak_hours, midpeak_hours)
-    df_copy = df[['price']].copy()
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
+    price_period = attach_peak_offpeak_labels(
+        frame.df, peak_hours, offpeak_hours, midpeak_hours, timezone, hour_info,
+    )
+    df_copy = frame.df[['price']].copy()
     df_copy = pd.concat([df_copy, hour_info, price_period], axis=1)
     
     # Group by date and period, then calculate statistics
@@ -175,14 +145,15 @@ def price_daily_stats_peak_off_peak(
     return grouped
 
 def price_daily_stats_infer_peak(
-    df: pd.DataFrame,    
+    df: PriceData,    
     timezone: ZoneInfo,
 ) -> pd.DataFrame:
     # group the price data into 3 group per day peak, off-peak, and mid-peak
     # and then calculate the stats for each group
-    hour_info = local_time_date_hour(df, timezone)
-    price_period = peak_offpeak_labels(df, timezone)
-    df_copy = df[['price']].copy()
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
+    price_period = frame.price_period
+    df_copy = frame.df[['price']].copy()
     df_copy = pd.concat([df_copy, hour_info, price_period], axis=1)
 
     # Group by date and period, then calculate statistics
@@ -194,13 +165,14 @@ def price_daily_stats_infer_peak(
     return grouped_pivot
 
 def price_stat_weekly_extended(
-    df: pd.DataFrame,    
+    df: PriceData,    
     timezone: ZoneInfo,
 ) -> pd.DataFrame:        
 
-    week_info = weekly_monthly_info(df, timezone)
-    price_period = peak_offpeak_labels(df, timezone)
-    df_copy = df[['price']].copy()
+    frame = as_price_frame(df, timezone)
+    week_info = frame.week_info
+    price_period = frame.price_period
+    df_copy = frame.df[['price']].copy()
     df_copy = pd.concat([df_copy, week_info, price_period], axis=1)
 
     weekly_stats = df_copy.groupby(
@@ -218,13 +190,14 @@ def price_stat_weekly_extended(
     return weekly_stats_pivot
 
 def price_stat_weekly_weekday_separated(
-    df: pd.DataFrame,    
+    df: PriceData,    
     timezone: ZoneInfo,
 ) -> pd.DataFrame:
 
-    week_info = weekly_monthly_info(df, timezone)
-    price_period = peak_offpeak_labels(df, timezone)
-    df_copy = df[['price']].copy()
+    frame = as_price_frame(df, timezone)
+    week_info = frame.week_info
+    price_period = frame.price_period
+    df_copy = frame.df[['price']].copy()
     df_copy = pd.concat([df_copy, week_info, price_period], axis=1)
     df_copy['day_type'] = df_copy['is_weekend'].apply(lambda x: 'weekend' if x else 'weekday')
 
@@ -243,33 +216,40 @@ def price_stat_weekly_weekday_separated(
     return weekly_stats_pivot
 
 def price_hourly_means(
-    df: pd.DataFrame,
+    df: Union[PriceData, DailyProfileMatrix],
     timezone: ZoneInfo,    
 ) -> List[float]:
-    hour_info = local_time_date_hour(df, timezone)
-    df_copy = df[['price']].copy()
+    # NOTE: a profile is the mean of its days, so each day weighs the same even when some of its
+    # intervals are missing, build it by_interval_end for the hours of the hour_info
+    if isinstance(df, DailyProfileMatrix):
+        return list(df.hourly().interval_mean())
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
+    df_copy = frame.df[['price']].copy()
     df_copy = pd.concat([df_copy, hour_info], axis=1)
     values = df_copy.groupby("hour")["price"].mean().values
     return list(values)
 
 def price_period_means(
-    df: pd.DataFrame,
+    df: PriceData,
     timezone: ZoneInfo,
 ) -> List[float]:
     
-    hour_info = local_time_date_hour(df, timezone)
-    price_period = peak_offpeak_labels(df, timezone)
-    df_copy = df[['price']].copy()
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
+    price_period = frame.price_period
+    df_copy = frame.df[['price']].copy()
     df_copy = pd.concat([df_copy, hour_info, price_period], axis=1)
 
     df = df_copy.groupby("price_period")["price"].mean()
     return list(df.values)
 
 def price_hourly_variations(
-    df: pd.DataFrame,
+    df: PriceData,
     timezone: ZoneInfo,
 ) -> pd.DataFrame:
-    df_copy = price_hourly_variations_feature(df, timezone)
+    frame = as_price_frame(df, timezone)
+    df_copy = price_hourly_variations_feature(frame.df, timezone, frame.hour_info, frame.price_period)
     std_delta = (
         df_copy.groupby('hour')['delta_from_avg'].apply(lambda x: np.sqrt(np.mean(x ** 2)))  # std around fixed mean (avg_price)
     .rename('hourly_delta_std')
@@ -301,8 +281,8 @@ def dam_rtm_hourly_dif_short_term(
 ) -> pd.DataFrame:
     
     dart = dam_rtm_hourly_dif(dam_df, rtm_df, timezone)
-    dart_peak_info = attach_peak_offpeak_labels(dart, peak_hours, offpeak_hours, midpeak_hours, timezone)
     dart_hour_info = local_time_date_hour(dart, timezone)
+    dart_peak_info = attach_peak_offpeak_labels(dart, peak_hours, offpeak_hours, midpeak_hours, timezone, dart_hour_info)
     dart = pd.concat([dart, dart_peak_info, dart_hour_info], axis=1)
 
     # rtm_peak_info = attach_peak_offpeak_labels(rtm_df, peak_hours, offpeak_hours, midpeak_hours, timezone)
@@ -0,0 +1,138 @@
+from typing import List, Sequence, Tuple, Union
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+from price_analyzer.models.daily_profile import DailyProfileMatrix
+from price_analyzer.models.price_frame import PriceFrame, as_price_frame
+
+# NOTE: the top-k stats of a day are the same whatever the k, a stable sort of the day puts the
+# intervals in the order nlargest/nsmallest pick them (ties go to the earlier interval, nan last),
+# so one sort along the intervals of a (days, intervals) matrix gives every k at once.
+
+
+def top_k_order(values: np.ndarray, largest: bool = True) -> np.ndarray:
+    """
+    the positions along the last axis from the largest (or smallest) value down, ties in
+    the order they come and nan last, like nlargest/nsmallest with keep='first'.
+    Works on any leading dimensions, e.g. (days, intervals) or (nodes, days, intervals).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.argsort(-values if largest else values, axis=-1, kind='stable')
+
+
+def top_k_stats(
+    values: np.ndarray,
+    order: np.ndarray,
+    k: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    the mean, the std (ddof=0) and the positions of the first k values in the order,
+    the positions of the missing values (a day with fewer than k prices) are -1 and a
+    day with no price at all has a nan mean and std.
+    """
+    positions = order[..., :k]
+    picked = np.take_along_axis(np.asarray(values, dtype=np.float64), positions, axis=-1)
+    valid = ~np.isnan(picked)
+    counts = valid.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(valid, picked, 0.0).sum(axis=-1) / counts
+        deviations = np.where(valid, picked - means[..., None], 0.0)
+        stds = np.sqrt((deviations ** 2).sum(axis=-1) / counts)
+    return means, stds, np.where(valid, positions, -1)
+
+
+def daily_matrix(
+    df: Union[pd.DataFrame, PriceFrame, DailyProfileMatrix],
+    timezone: ZoneInfo,
+    value_column: str = 'price',
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    the local dates (sorted), their day of week, and the (days, intervals) matrices of the values
+    and of the hours, the intervals of a day in the order they are in the frame, nan (and hour -1)
+    padded for the shorter days.
+    A DailyProfileMatrix is already that matrix, in the order of the intervals of the day, only
+    the days without any price are dropped.
+    """
+    if isinstance(df, DailyProfileMatrix):
+        return _profile_matrix(df)
+    frame = as_price_frame(df, timezone)
+    hour_info = frame.hour_info
+    codes, dates = pd.factorize(hour_info['date'], sort=True)
+    has_date = codes >= 0
+    codes = codes[has_date]
+    values = frame.df[value_column].to_numpy(dtype=np.float64)[has_date]
+    hours = hour_info['hour'].to_numpy()[has_date]
+    day_of_week = hour_info['day_of_week'].to_numpy()[has_date]
+
+    # the position of each interval within its day, keeping the order of the frame
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(len(dates)))
+    positions = np.empty(len(codes), dtype=np.int64)
+    positions[order] = np.arange(len(codes)) - starts[codes[order]]
+    width = int(positions.max()) + 1 if len(positions) else 0
+
+    value_matrix = np.full((len(dates), width), np.nan)
+    value_matrix[codes, positions] = values
+    hour_matrix = np.full((len(dates), width), -1, dtype=np.int64)
+    hour_matrix[codes, positions] = hours
+    first_day_of_week = day_of_week[order[starts]] if len(codes) else day_of_week[:0]
+    return np.asarray(dates, dtype=object), first_day_of_week, value_matrix, hour_matrix
+
+
+def price_daily_stats_top_k(
+    df: Union[pd.DataFrame, PriceFrame, DailyProfileMatrix],
+    timezone: ZoneInfo,
+    top: Sequence[int] = (3, 2),
+    bottom: Sequence[int] = (3, 2),
+) -> pd.DataFrame:
+    """
+    per local date the mean, the std and the hours of the top k (peak) and bottom k (off peak)
+    prices for each k, the columns of price_daily_stats_extended for top=bottom=(3, 2).
+    """
+    dates, day_of_week, values, hours = daily_matrix(df, timezone)
+    peak = _stats_by_k(values, hours, top_k_order(values, largest=True), top)
+    offpeak = _stats_by_k(values, hours, top_k_order(values, largest=False), bottom)
+
+    columns = {'date': dates, 'day_of_week': day_of_week}
+    for k, (means, _, _) in zip(top, peak):
+        columns[f'mean_peak_top{k}'] = means
+    for k, (_, _, day_hours) in zip(top, peak):
+        columns[f'peak_top{k}_hours'] = day_hours
+    for k, (means, _, _) in zip(bottom, offpeak):
+        columns[f'mean_offpeak_bottom{k}'] = means
+    for k, (_, _, day_hours) in zip(bottom, offpeak):
+        columns[f'offpeak_bottom{k}_hours'] = day_hours
+    for k, (_, stds, _) in zip(top, peak):
+        columns[f'std_peak_top{k}'] = stds
+    for k, (_, stds, _) in zip(bottom, offpeak):
+        columns[f'std_offpeak_bottom{k}'] = stds
+    return pd.DataFrame(columns)
+
+
+def _profile_matrix(profile: DailyProfileMatrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    has_price = profile.mask.any(axis=1)
+    dates = np.array(profile.date_list(), dtype=object)[has_price]
+    hours = np.broadcast_to(profile.interval_hours, (len(dates), profile.width))
+    return dates, profile.day_of_week[has_price], profile.values[has_price], hours
+
+
+def _stats_by_k(
+    values: np.ndarray,
+    hours: np.ndarray,
+    order: np.ndarray,
+    ks: Sequence[int],
+) -> List[Tuple[np.ndarray, np.ndarray, List[List[int]]]]:
+    stats = []
+    for k in ks:
+        means, stds, positions = top_k_stats(values, order, k)
+        day_hours = np.take_along_axis(hours, np.maximum(positions, 0), axis=-1)
+        stats.append((means, stds, _hour_lists(day_hours, positions >= 0)))
+    return stats
+
+
+def _hour_lists(day_hours: np.ndarray, valid: np.ndarray) -> List[List[int]]:
+    # the hours are lists in the stats, in one go when every day has its k prices
+    if valid.all():
+        return day_hours.tolist()
+    return [row[row_valid].tolist() for row, row_valid in zip(day_hours, valid)]
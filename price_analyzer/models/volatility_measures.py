@@ -1,13 +1,20 @@
 
-from typing import List
+from typing import List, Union
 
 import numpy as np
 
+from price_analyzer.dtos.prices import Price
+from price_analyzer.models.daily_profile import DailyProfileMatrix
+
+# a list of floats, an array, or a Price, they all go through np.asarray so arrays are not copied.
+# A DailyProfileMatrix is already one row per day, so it is used as it is (gaps and DST hours are nan)
+PriceVector = Union[List[float], np.ndarray, Price, DailyProfileMatrix]
+
 
 
 
 def calc_price_vector_daily_mean(
-    price_vector: List[float],
+    price_vector: PriceVector,
     daily_resolution: int,
 ) -> List[float]:
     """
@@ -17,7 +24,7 @@ def calc_price_vector_daily_mean(
         We are making the assumption that the price vector is comming with the same resolutoin
         that is given by the daily_resolution parameter.
         Parameters:
-        price_vector: List[float]
+        price_vector: PriceVector
             The price vector to calculate the daily mean values of, length of vector should be multiple of 24
         daily_resolution: int
             The number of interval in a day (e.g. 24 for hourly data)
@@ -27,6 +34,13 @@ def calc_price_vector_daily_mean(
     # we construct the price vector for each day by reshaping the price vector
     # and then calculate the mean of the price vector for each interval, across multiple days
 
+    if isinstance(price_vector, DailyProfileMatrix):
+        if price_vector.width != daily_resolution:
+            raise ValueError(f"The days of the profile should have {daily_resolution} intervals")
+        return price_vector.interval_mean().tolist()
+
+    price_vector = np.asarray(price_vector)
+
     # Ensure the price vector length is a multiple of daily_resolution
     if len(price_vector) % daily_resolution != 0:
         raise ValueError(f"Length of price_vector should be a multiple of {daily_resolution}")
@@ -41,7 +55,7 @@ def calc_price_vector_daily_mean(
 
 
 def calc_price_vector_volatility_variance(
-    price_vector: List[float],
+    price_vector: PriceVector,
     base_daily_mean_vals: List[float],
 ) -> float:
     """
@@ -49,7 +63,7 @@ def calc_price_vector_volatility_variance(
     noise, relative to the base_daily_mean_vals.
     The base_daily_mean_vals are the mean values of the price vector
     Parameters:
-    price_vector: List[float]
+    price_vector: PriceVector
         The price vector to calculate the volatility of, length of vector should be multiple of 24
     base_daily_mean_vals: List[float] 
         The mean values of the price vector, length of vector should be 24
@@ -60,6 +74,15 @@ def calc_price_vector_volatility_variance(
     # then, we get the noise by subtracting the mean value price vector from the price vector
     # and then calculate the variance of the noise
 
+    if isinstance(price_vector, DailyProfileMatrix):
+        if len(base_daily_mean_vals) != price_vector.width:
+            raise ValueError(f"Length of base_daily_mean_vals should be {price_vector.width}")
+        # the base broadcasts over the days, the missing intervals are left out
+        noise = price_vector.values - np.asarray(base_daily_mean_vals)
+        return np.nanvar(noise)
+
+    price_vector = np.asarray(price_vector)
+
     # Ensure the price vector length is a multiple of 24
     _validate_inputs(price_vector, base_daily_mean_vals)
     
@@ -67,7 +90,7 @@ def calc_price_vector_volatility_variance(
     mean_value_price_vector = np.tile(base_daily_mean_vals, len(price_vector) // 24)
 
     # Calculate the noise
-    noise = np.array(price_vector) - mean_value_price_vector
+    noise = price_vector - mean_value_price_vector
 
     # Calculate and return the variance of the noise
     return np.var(noise)
@@ -76,7 +99,7 @@ def calc_price_vector_volatility_variance(
 
 
 
-def _validate_inputs(price_vector: List[float], base_daily_mean_vals: List[float]) -> None:
+def _validate_inputs(price_vector: PriceVector, base_daily_mean_vals: List[float]) -> None:
     if len(price_vector) % 24 != 0:
         raise ValueError("Length of price_vector should be a multiple of 24")
     if len(base_daily_mean_vals) != 24:
@@ -16,6 +16,7 @@ from price_analyzer.models.price_stats import (
     price_hourly_variations,
     dam_rtm_hourly_dif_short_term,
 )
+from price_analyzer.models.price_frame import PriceFrame
 
 
 
@@ -40,9 +41,11 @@ def get_price_stats(
         resolution_minutes=60,
     )
     
-    daily_stats = price_daily_stats(df, timezone=TIMEZONE)
+    # the stats below share the local time features of the frame
+    frame = PriceFrame(df, TIMEZONE)
+    daily_stats = price_daily_stats(frame, timezone=TIMEZONE)
     
-    daily_stats_extended = price_daily_stats_extended(df, timezone=TIMEZONE)
+    daily_stats_extended = price_daily_stats_extended(frame, timezone=TIMEZONE)
     return daily_stats, daily_stats_extended
 
 def get_period_price_stats(
@@ -66,11 +69,13 @@ def get_period_price_stats(
     #     df=df,
     #     timezone=TIMEZONE,
     # )
+    # the peak labels are computed once for both
+    frame = PriceFrame(df, TIMEZONE)
     peak_hours = price_peak_offpeak_hours(
-        df=df,
+        df=frame,
         timezone=TIMEZONE,
     )
-    stat_for_periods = price_daily_stats_infer_peak(df, TIMEZONE)
+    stat_for_periods = price_daily_stats_infer_peak(frame, TIMEZONE)
     return peak_hours, stat_for_periods
 
 def get_weekly_price_stats(
@@ -89,9 +94,11 @@ def get_weekly_price_stats(
         end_time=end_time,
         resolution_minutes=60,
     )
-    weekly_stats = price_weekly_stats(df, TIMEZONE)
-    weekly_stats_extended = price_stat_weekly_extended(df, TIMEZONE)
-    weekday_weekend_stats = price_stat_weekly_weekday_separated(df, TIMEZONE)
+    # the week features and the peak labels are computed once for the three of them
+    frame = PriceFrame(df, TIMEZONE)
+    weekly_stats = price_weekly_stats(frame, TIMEZONE)
+    weekly_stats_extended = price_stat_weekly_extended(frame, TIMEZONE)
+    weekday_weekend_stats = price_stat_weekly_weekday_separated(frame, TIMEZONE)
     return  weekly_stats, weekly_stats_extended, weekday_weekend_stats
 
 def get_hourly_mean(
@@ -112,8 +119,9 @@ def get_hourly_mean(
             resolution_minutes=60,
         )
     
-    price_hourly_mean = price_hourly_means(df, TIMEZONE)
-    hourly_variations = price_hourly_variations(df, TIMEZONE)
+    frame = PriceFrame(df, TIMEZONE)
+    price_hourly_mean = price_hourly_means(frame, TIMEZONE)
+    hourly_variations = price_hourly_variations(frame, TIMEZONE)
     return price_hourly_mean, hourly_variations
 
 def get_dam_rtm_price_stats(
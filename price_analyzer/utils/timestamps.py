@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+NANOSECONDS_PER_MINUTE = 60_000_000_000
+
+# the windows the callers pass come naive (taken as UTC) or tz-aware, these put them on UTC so
+# they can be compared with each other and with the interval_*_utc columns
+
+
+def to_utc(timestamp: Optional[datetime]) -> Optional[pd.Timestamp]:
+    if timestamp is None:
+        return None
+    timestamp = pd.Timestamp(timestamp)
+    return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+
+
+def to_ns(timestamp: datetime) -> int:
+    # nanoseconds since the epoch, the unit of the asi8 of the timestamp columns
+    return to_utc(timestamp).value
+
+
+def column_ns(column: pd.Series) -> np.ndarray:
+    # NOTE: to_datetime walks the values even when they are typed timestamps already, so only
+    # strings go through it, the naive timestamps are taken as UTC
+    if not pd.api.types.is_datetime64_any_dtype(column):
+        column = pd.to_datetime(column, utc=True)
+    return pd.DatetimeIndex(column).as_unit("ns").asi8
+
+
+def infer_resolution_minutes(df: pd.DataFrame) -> int:
+    """
+    the interval length of the records, the most common one if they are mixed.
+    """
+    lengths = column_ns(df["interval_end_utc"]) - column_ns(df["interval_start_utc"])
+    values, counts = np.unique(lengths // NANOSECONDS_PER_MINUTE, return_counts=True)
+    return int(values[np.argmax(counts)])
@@ -0,0 +1,58 @@
+"""
+the DART of a year of hourly DAM against 15 min RTM prices for many nodes,
+the searchsorted alignment against pandas merge_asof per node:
+    python -m tests.benchmarks.bench_alignment
+"""
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+from price_analyzer.models.alignment import dam_rtm_dart_many
+from tests.utils.gridstatus_stand_in import synthetic_prices
+
+UTC = ZoneInfo("UTC")
+
+START_TIME = datetime(2024, 1, 1, tzinfo=UTC)
+END_TIME = datetime(2025, 1, 1, tzinfo=UTC)
+NODES = [f"HB_NODE_{i}" for i in range(50)]
+
+
+def _timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<48} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def _frames(dataset: str, column: str):
+    records = synthetic_prices(dataset, pd.Timestamp(START_TIME), pd.Timestamp(END_TIME), NODES)
+    records = records.rename(columns={column: "price"})
+    return {node: df.reset_index(drop=True) for node, df in records.groupby("location", sort=False)}
+
+
+def _merge_asof(dam_frames, rtm_frames):
+    return {
+        node: pd.merge_asof(
+            rtm_frames[node], dam_frames[node][["interval_start_utc", "price"]],
+            on="interval_start_utc", suffixes=("_rtm", "_dam"),
+        )
+        for node in dam_frames
+    }
+
+
+def main():
+    dam_frames = _frames("ercot_spp_day_ahead_hourly", "spp")
+    rtm_frames = _frames("ercot_spp_real_time_15_min", "spp")
+    print(f"{len(NODES)} nodes, {len(rtm_frames[NODES[0]])} 15 min intervals each")
+
+    merged = _timed("  pandas merge_asof per node", lambda: _merge_asof(dam_frames, rtm_frames))
+    darts = _timed("  dam_rtm_dart_many", lambda: dam_rtm_dart_many(dam_frames, rtm_frames))
+
+    for node in NODES:
+        assert np.allclose(darts[node]["dam_price"], merged[node]["price_dam"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+the peak labels of a year of hourly prices, a KMeans per day against the batched k-means,
+for prices rounded to the dollar (lots of ties), to the cent and not rounded:
+    python -m tests.benchmarks.bench_peak_segmentation
+"""
+import time
+import warnings
+import numpy as np
+from sklearn.cluster import KMeans
+
+from price_analyzer.models.peak_segmentation import _rank_by_mean, peak_period_codes
+
+DAYS = 365
+
+
+def _timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<44} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def _kmeans_per_day(prices: np.ndarray) -> np.ndarray:
+    codes = np.empty(prices.shape, dtype=np.int8)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for day, day_prices in enumerate(prices):
+            labels = KMeans(n_clusters=3, random_state=42, n_init="auto").fit_predict(day_prices.reshape(-1, 1))
+            codes[day] = _rank_by_mean(day_prices[None, :], labels[None, :])[0]
+    return codes
+
+
+def main():
+    rng = np.random.default_rng(0)
+    hours = np.arange(24)
+    shape = 30 + 15 * np.sin((hours - 8) / 24 * 2 * np.pi)
+    prices = shape * rng.uniform(0.5, 2, (DAYS, 1)) + rng.normal(0, 4, (DAYS, 24))
+
+    for label, decimals in (("dollars", 0), ("cents", 2), ("not rounded", None)):
+        day_prices = np.round(prices, decimals) if decimals is not None else prices
+        print(f"{DAYS} days of hourly prices, {label}")
+        expected = _timed("  KMeans per day", lambda: _kmeans_per_day(day_prices))
+        codes = _timed("  peak_period_codes, all days", lambda: peak_period_codes(day_prices))
+        assert np.array_equal(codes, expected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+end-to-end throughput of the cached price client against the offline GridStatus stand-in,
+no network needed:
+    python -m tests.benchmarks.bench_price_cache
+"""
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api import persist_cache
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+from tests.utils.gridstatus_stand_in import GridStatusStandIn
+
+UTC = ZoneInfo("UTC")
+
+NODES = ["HB_HOUSTON", "HB_NORTH", "HB_SOUTH", "HB_WEST", "LZ_HOUSTON", "LZ_NORTH", "LZ_SOUTH", "LZ_WEST"]
+START_TIME = datetime(2024, 1, 1, tzinfo=UTC)
+END_TIME = datetime(2024, 7, 1, tzinfo=UTC)
+FRAGMENTED_END_TIME = datetime(2024, 2, 1, tzinfo=UTC)
+
+
+def _timed(label: str, fn) -> None:
+    started = time.perf_counter()
+    fn()
+    print(f"{label:<48} {time.perf_counter() - started:8.3f}s")
+
+
+def _fill(client: GridStatusPriceClient, start_time: datetime, end_time: datetime) -> None:
+    for node in NODES:
+        client.get_energy_price_actual_with_cache(
+            iso=ISOType.ERCOT,
+            market_type=MarketType.RTM,
+            price_type=PriceType.SPP,
+            node=node,
+            start_time=start_time,
+            end_time=end_time,
+        )
+
+
+def _fragmented_fill(client: GridStatusPriceClient) -> None:
+    # every other day is cached, so the next fill of the window has a lot of gaps
+    day = START_TIME
+    while day < FRAGMENTED_END_TIME:
+        _fill(client, day, day + timedelta(days=1))
+        day += timedelta(days=2)
+
+
+def main(latency_seconds: float = 0.05):
+    for max_in_flight in [1, 4, 8]:
+        persist_cache.CACHE_VOLUME_PATH = Path(tempfile.mkdtemp())
+        persist_cache.MEMORY_CACHE.invalidate()
+        stand_in = GridStatusStandIn(latency_seconds=latency_seconds)
+        client = GridStatusPriceClient(stand_in, max_in_flight=max_in_flight)
+
+        print(f"max_in_flight={max_in_flight}, latency={latency_seconds}s, {len(NODES)} nodes RTM 15 min")
+        _timed("  cold backfill, 6 months", lambda: _fill(client, START_TIME, END_TIME))
+        _timed("  warm, same window", lambda: _fill(client, START_TIME, END_TIME))
+
+        persist_cache.CACHE_VOLUME_PATH = Path(tempfile.mkdtemp())
+        persist_cache.MEMORY_CACHE.invalidate()
+        _timed("  fragmented cache, every other day of a month", lambda: _fragmented_fill(client))
+        calls_before = len(stand_in.calls)
+        _timed("  fill the gaps of the fragmented month", lambda: _fill(client, START_TIME, FRAGMENTED_END_TIME))
+        print(f"  requests for the gaps: {len(stand_in.calls) - calls_before}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+resampling a year of 15 min prices to hourly and back for many nodes,
+the regular grid engine against pandas resample per node:
+    python -m tests.benchmarks.bench_resampling
+"""
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+import pandas as pd
+
+from price_analyzer.data_client.service.resampling import UpsamplePolicy, resample_prices, resample_regular
+from tests.utils.gridstatus_stand_in import synthetic_prices
+
+UTC = ZoneInfo("UTC")
+
+START_TIME = datetime(2024, 1, 1, tzinfo=UTC)
+END_TIME = datetime(2025, 1, 1, tzinfo=UTC)
+NODES = [f"HB_NODE_{i}" for i in range(50)]
+
+
+def _timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<56} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def _pandas_round_trip(frames):
+    for df in frames:
+        prices = df.set_index("interval_start_utc")["price"]
+        hourly = prices.resample("60min").mean()
+        hourly.resample("15min").ffill()
+
+
+def _frames_round_trip(frames):
+    for df in frames:
+        hourly = resample_prices(df, START_TIME, END_TIME, 60)
+        resample_regular(hourly, 60, 15, UpsamplePolicy.FFILL)
+
+
+def main():
+    records = synthetic_prices(
+        "ercot_spp_real_time_15_min", pd.Timestamp(START_TIME), pd.Timestamp(END_TIME), NODES,
+    ).rename(columns={"spp": "price"})
+    frames = [df.reset_index(drop=True) for _, df in records.groupby("location", sort=False)]
+    # the records come sorted by time and then location, so this is (intervals, nodes)
+    matrix = records["price"].to_numpy().reshape(-1, len(NODES))
+    print(f"{len(NODES)} nodes, {matrix.shape[0]} 15 min intervals each")
+
+    _timed("  pandas resample per node, 15 min -> hourly -> 15 min", lambda: _pandas_round_trip(frames))
+    _timed("  resample_prices per node, 15 min -> hourly -> 15 min", lambda: _frames_round_trip(frames))
+
+    hourly = _timed("  resample_regular all nodes, 15 min -> hourly", lambda: resample_regular(matrix, 15, 60))
+    _timed("  resample_regular all nodes, hourly -> 15 min ffill", lambda: resample_regular(hourly, 60, 15))
+    _timed("  resample_regular all nodes, hourly -> 15 min linear", lambda: resample_regular(hourly, 60, 15, UpsamplePolicy.LINEAR))
+
+    expected = matrix.reshape(-1, 4, len(NODES)).mean(axis=1)
+    assert np.allclose(hourly, expected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+the top/bottom 3 and 2 daily stats of a year of hourly prices for many nodes,
+the groupby/nlargest loop against the sorted (days, hours) matrix:
+    python -m tests.benchmarks.bench_topk_stats
+"""
+import time
+import numpy as np
+import pandas as pd
+
+from price_analyzer.models.topk_stats import top_k_order, top_k_stats
+
+NODES = 500
+DAYS = 365
+
+
+def _timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<44} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def _pandas_one_node(prices: np.ndarray):
+    series = pd.Series(prices.ravel())
+    for _, day in series.groupby(np.repeat(np.arange(DAYS), 24)):
+        for k in (3, 2):
+            day.nlargest(k).mean(), day.nsmallest(k).mean()
+
+
+def _matrix_all_nodes(prices: np.ndarray):
+    stats = []
+    for largest in (True, False):
+        order = top_k_order(prices, largest=largest)
+        stats.extend(top_k_stats(prices, order, k) for k in (3, 2))
+    return stats
+
+
+def main():
+    rng = np.random.default_rng(0)
+    hours = np.arange(24)
+    prices = 30 + 20 * np.sin((hours - 8) / 24 * 2 * np.pi) + rng.normal(0, 10, (NODES, DAYS, 24))
+    print(f"{NODES} nodes, {DAYS} days of hourly prices")
+
+    _timed("  groupby + nlargest/nsmallest, one node", lambda: _pandas_one_node(prices[0]))
+    stats = _timed("  top_k_order + top_k_stats, all nodes", lambda: _matrix_all_nodes(prices))
+
+    expected = np.sort(prices, axis=-1)[..., -3:].mean(axis=-1)
+    assert np.allclose(stats[0][0], expected)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import pytest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api.async_gridstatus_price import AsyncGridStatusPriceClient
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.data_client.service.gridstatus.async_price_service import AsyncPriceService
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType, PriceLocationType
+from price_analyzer.dtos.prices import PriceLocation, PriceRequest
+from tests.utils.gridstatus_stand_in import GridStatusStandIn
+
+UTC = ZoneInfo("UTC")
+
+START = datetime(2024, 10, 1, tzinfo=UTC)
+END = datetime(2024, 10, 2, tzinfo=UTC)
+
+HUBS = ["HB_HOUSTON", "HB_NORTH", "HB_SOUTH", "HB_WEST", "HB_PAN", "HB_BUSAVG"]
+
+
+class CountingStandIn(GridStatusStandIn):
+    """ keeps the highest number of queries that were in flight at the same time """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._count_lock = threading.Lock()
+
+    def get_dataset(self, **kwargs):
+        with self._count_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return super().get_dataset(**kwargs)
+        finally:
+            with self._count_lock:
+                self.in_flight -= 1
+
+
+def test_async_client_runs_requests_concurrently():
+    stand_in = CountingStandIn(latency_seconds=0.2)
+    client = AsyncGridStatusPriceClient(GridStatusPriceClient(api_clinet=stand_in), max_concurrency=3)
+    requests = [(MarketType.DAM, PriceType.SPP, hub, START, END) for hub in HUBS]
+
+    results = asyncio.run(client.gather_energy_price_actual_with_cache(ISOType.ERCOT, requests))
+
+    assert [result["location"].iloc[0] for result in results] == HUBS
+    assert all(len(result) == 24 for result in results)
+    # the requests overlap, but never more than max_concurrency of them
+    assert stand_in.max_in_flight == 3
+
+
+def test_async_client_can_be_used_from_more_than_one_loop():
+    client = AsyncGridStatusPriceClient(GridStatusPriceClient(api_clinet=GridStatusStandIn()))
+    for _ in range(2):
+        result = asyncio.run(client.get_energy_price_actual_with_cache(
+            ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON", START, END,
+        ))
+        assert len(result) == 24
+
+
+def test_async_client_rejects_bad_concurrency():
+    with pytest.raises(ValueError):
+        AsyncGridStatusPriceClient(GridStatusPriceClient(api_clinet=GridStatusStandIn()), max_concurrency=0)
+
+
+def test_async_price_service_gather():
+    stand_in = GridStatusStandIn()
+    service = AsyncPriceService(AsyncGridStatusPriceClient(GridStatusPriceClient(api_clinet=stand_in)))
+    service.initialize_service_iso(ISOType.ERCOT)
+    requests = [
+        PriceRequest(market_type, PriceType.SPP, PriceLocation(hub, PriceLocationType.HUB), START, END, 60)
+        for market_type in (MarketType.DAM, MarketType.RTM)
+        for hub in HUBS[:3]
+    ]
+
+    results = asyncio.run(service.gather_price_actual_df(requests))
+
+    assert [len(result) for result in results] == [24] * 3 + [96] * 3
+    assert [result["location"].iloc[0] for result in results] == HUBS[:3] * 2
+
+
+def test_async_price_service_many():
+    service = AsyncPriceService(AsyncGridStatusPriceClient(GridStatusPriceClient(api_clinet=GridStatusStandIn())))
+    service.initialize_service_iso(ISOType.ERCOT)
+    locations = [PriceLocation(hub, PriceLocationType.HUB) for hub in HUBS]
+
+    results = asyncio.run(service.get_price_actual_df_many(MarketType.DAM, PriceType.SPP, locations, START, END, 60))
+
+    assert set(results) == set(HUBS)
+    with pytest.raises(ValueError):
+        asyncio.run(service.get_price_actual_df_many(MarketType.DAM, PriceType.REGUP, locations, START, END, 60))
+
+
+def test_async_client_runs_more_calls_than_the_default_executor():
+    # the default executor of a loop has at most 32 threads
+    stand_in = CountingStandIn(latency_seconds=0.5)
+    nodes = [f"HB_NODE_{i}" for i in range(40)]
+
+    async def gather():
+        async with AsyncGridStatusPriceClient(GridStatusPriceClient(api_clinet=stand_in), max_concurrency=40) as client:
+            return await client.gather_energy_price_actual_with_cache(
+                ISOType.ERCOT, [(MarketType.DAM, PriceType.SPP, node, START, END) for node in nodes],
+            )
+
+    results = asyncio.run(gather())
+
+    assert [result["location"].iloc[0] for result in results] == nodes
+    assert stand_in.max_in_flight == 40
@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api import persist_cache
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.data_client.service.gridstatus.price_service import PriceService
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+from tests.utils.gridstatus_stand_in import GridStatusStandIn
+
+UTC = ZoneInfo("UTC")
+
+START = datetime(2024, 10, 1, tzinfo=UTC)
+END = datetime(2024, 10, 3, tzinfo=UTC)
+
+AS_PRODUCTS = [PriceType.REGUP, PriceType.REGDOWN, PriceType.RRS]
+
+
+def _service(stand_in: GridStatusStandIn) -> PriceService:
+    service = PriceService(GridStatusPriceClient(api_clinet=stand_in))
+    service.initialize_service_iso(ISOType.ERCOT)
+    return service
+
+
+def test_all_as_products_in_one_call():
+    stand_in = GridStatusStandIn()
+    service = _service(stand_in)
+
+    wide = service.get_as_prices_actual_df(MarketType.DAM, AS_PRODUCTS, START, END)
+
+    assert len(stand_in.calls) == 1
+    assert stand_in.calls[0]["dataset"] == "ercot_as_prices"
+    assert stand_in.calls[0]["filter_column"] is None
+    assert list(wide.columns) == [
+        "interval_start_utc", "interval_end_utc", "market",
+        "regulation_up", "regulation_down", "responsive_reserves",
+    ]
+    assert len(wide) == 48
+    assert wide[["regulation_up", "regulation_down", "responsive_reserves"]].notnull().all().all()
+
+
+def test_each_product_served_from_the_shared_record(cache_volume):
+    stand_in = GridStatusStandIn()
+    service = _service(stand_in)
+
+    frames = {
+        price_type: service.get_price_actual_df(MarketType.DAM, price_type, None, START, END, 60)
+        for price_type in AS_PRODUCTS
+    }
+
+    assert len(stand_in.calls) == 1
+    assert all(list(frame.columns) == ["interval_start_utc", "interval_end_utc", "market", "price"] for frame in frames.values())
+    assert not frames[PriceType.REGUP]["price"].equals(frames[PriceType.RRS]["price"])
+    # one cache key for all the products, with all the columns of the table
+    cache_dirs = [path.parent for path in cache_volume.rglob("manifest.json")]
+    assert cache_dirs == [cache_volume / "ERCOT" / "DAM" / "AS" / "SYSTEM"]
+    cached = persist_cache.get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.RRS, persist_cache.AS_CACHE_NODE)
+    assert list(cached.columns) == persist_cache.AS_COLUMN_NAMES
+
+
+def test_as_cache_fills_only_the_missing_period():
+    stand_in = GridStatusStandIn()
+    client = GridStatusPriceClient(api_clinet=stand_in)
+
+    client.get_as_price_actual_with_cache(ISOType.ERCOT, MarketType.DAM, [PriceType.REGUP], START, datetime(2024, 10, 2, tzinfo=UTC))
+    result = client.get_as_price_actual_with_cache(ISOType.ERCOT, MarketType.DAM, [PriceType.REGDOWN], START, END)
+
+    assert len(result) == 48
+    assert [(call["start"], call["end"]) for call in stand_in.calls][1] == (
+        "2024-10-02T00:00:00+00:00", "2024-10-03T00:00:00+00:00",
+    )
+
+
+def test_as_prices_without_cache():
+    client = GridStatusPriceClient(api_clinet=GridStatusStandIn())
+    result = client.get_as_price_actual(ISOType.ERCOT, MarketType.DAM, START, END)
+    assert len(result) == 48
+    assert set(persist_cache.AS_PRODUCT_COLUMNS) <= set(result.columns)
+
+
+def test_as_prices_reject_energy_price_types():
+    client = GridStatusPriceClient(api_clinet=GridStatusStandIn())
+    with pytest.raises(ValueError):
+        client.get_as_price_actual_with_cache(ISOType.ERCOT, MarketType.DAM, [PriceType.SPP], START, END)
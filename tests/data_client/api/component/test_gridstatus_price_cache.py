@@ -0,0 +1,177 @@
+import threading
+import time
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api import persist_cache, gridstatus_price
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.data_client.api.fetch_planner import FetchCostModel
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+
+UTC = ZoneInfo("UTC")
+
+# requests are free, so the planner never coalesces the gaps
+NO_COALESCING = FetchCostModel(request_cost_seconds=0.0)
+
+
+class HourlyClientStub:
+    """ returns an hourly spp record for every hour in the query, and tracks the concurrency
+    """
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_dataset(self, dataset, start, end, limit, filter_column, filter_value, **kwargs):
+        with self._lock:
+            self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+        locations = filter_value if isinstance(filter_value, list) else [filter_value]
+        starts = pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq="1h", inclusive="left")
+        return pd.DataFrame({
+            "interval_start_utc": starts.repeat(len(locations)),
+            "interval_end_utc": (starts + pd.Timedelta("1h")).repeat(len(locations)),
+            "location": locations * len(starts),
+            "location_type": "Trading Hub",
+            "market": "DAY_AHEAD_HOURLY",
+            "spp": [float(ts.hour) for ts in starts.repeat(len(locations))],
+        }).iloc[:limit]
+
+
+def _get(client, start_hour, end_hour):
+    return client.get_energy_price_actual_with_cache(
+        iso=ISOType.ERCOT,
+        market_type=MarketType.DAM,
+        price_type=PriceType.SPP,
+        node="HB_HOUSTON",
+        start_time=datetime(2024, 10, 1, start_hour, tzinfo=UTC),
+        end_time=datetime(2024, 10, 1, end_hour, tzinfo=UTC),
+    )
+
+
+def test_with_cache_only_queries_missing_periods():
+    stub = HourlyClientStub()
+    client = GridStatusPriceClient(stub, fetch_cost_model=NO_COALESCING)
+
+    _get(client, 2, 4)
+    _get(client, 8, 10)
+    result = _get(client, 0, 12)
+
+    assert len(result) == 12
+    assert result["interval_start_utc"].is_monotonic_increasing
+    assert [(start.hour, end.hour) for start, end in stub.calls[2:]] == [(0, 2), (4, 8), (10, 12)]
+
+    _get(client, 0, 12)
+    assert len(stub.calls) == 5
+
+
+def test_with_cache_queries_missing_periods_concurrently():
+    stub = HourlyClientStub(latency=0.05)
+    client = GridStatusPriceClient(stub, max_in_flight=2, fetch_cost_model=NO_COALESCING)
+    for hour in range(1, 12, 2):
+        _get(client, hour, hour + 1)
+    stub.max_in_flight = 0
+
+    result = _get(client, 0, 12)
+
+    assert len(result) == 12
+    assert result["price"].tolist() == [float(hour) for hour in range(12)]
+    assert stub.max_in_flight == 2
+
+
+def test_with_cache_coalesces_nearby_gaps():
+    stub = HourlyClientStub()
+    client = GridStatusPriceClient(stub)
+    for hour in range(1, 12, 2):
+        _get(client, hour, hour + 1)
+
+    result = _get(client, 0, 12)
+
+    assert len(result) == 12
+    assert len(stub.calls) == 6 + 1
+    assert client.last_fetch_plan.redundant_rows == 5
+    assert len(client.last_fetch_plan.periods) == 1
+
+
+def test_get_energy_price_actual_chunks_windows_under_query_limit(monkeypatch):
+    monkeypatch.setattr(gridstatus_price, "QUERY_LIMIT", 5)
+    stub = HourlyClientStub()
+    client = GridStatusPriceClient(stub)
+
+    result = _get(client, 0, 23)
+
+    assert len(result) == 23
+    assert result["interval_start_utc"].is_unique
+    assert len(stub.calls) == 6
+    assert all(end - start <= pd.Timedelta("4h") for start, end in stub.calls)
+
+
+def test_get_energy_price_actual_splits_truncated_windows(monkeypatch):
+    monkeypatch.setattr(gridstatus_price, "QUERY_LIMIT", 5)
+    # pretend the dataset is every two hours, so the planned windows come back truncated
+    monkeypatch.setitem(gridstatus_price.DATASET_INTERVAL_MINUTES, "ercot_spp_day_ahead_hourly", 120)
+    stub = HourlyClientStub()
+    client = GridStatusPriceClient(stub)
+
+    result = _get(client, 0, 20)
+
+    assert result["price"].tolist() == [float(hour) for hour in range(20)]
+
+
+def test_with_cache_many_queries_all_nodes_together():
+    stub = HourlyClientStub()
+    client = GridStatusPriceClient(stub)
+    _get(client, 0, 6)
+
+    results = client.get_energy_price_actual_many_with_cache(
+        iso=ISOType.ERCOT,
+        market_type=MarketType.DAM,
+        price_type=PriceType.SPP,
+        nodes=["HB_HOUSTON", "HB_NORTH", "LZ_WEST"],
+        start_time=datetime(2024, 10, 1, 0, tzinfo=UTC),
+        end_time=datetime(2024, 10, 1, 12, tzinfo=UTC),
+    )
+
+    assert len(stub.calls) == 2
+    assert {node: len(df) for node, df in results.items()} == {"HB_HOUSTON": 12, "HB_NORTH": 12, "LZ_WEST": 12}
+    assert set(results["LZ_WEST"]["location"]) == {"LZ_WEST"}
+
+    # everything is cached per node now
+    result = client.get_energy_price_actual_with_cache(
+        iso=ISOType.ERCOT,
+        market_type=MarketType.DAM,
+        price_type=PriceType.SPP,
+        node="HB_NORTH",
+        start_time=datetime(2024, 10, 1, 0, tzinfo=UTC),
+        end_time=datetime(2024, 10, 1, 12, tzinfo=UTC),
+    )
+    assert len(result) == 12
+    assert len(stub.calls) == 2
+
+
+def test_with_cache_concurrent_callers_share_one_fill():
+    stub = HourlyClientStub(latency=0.1)
+    client = GridStatusPriceClient(stub)
+    barrier = threading.Barrier(3)
+    results = []
+
+    def caller():
+        barrier.wait()
+        results.append(_get(client, 0, 12))
+
+    threads = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stub.calls) == 1
+    assert [len(result) for result in results] == [12, 12, 12]
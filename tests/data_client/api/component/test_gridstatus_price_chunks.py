@@ -0,0 +1,94 @@
+import threading
+import pytest
+import pandas as pd
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.data_client.service.gridstatus.price_service import PriceService
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType, PriceLocationType
+from price_analyzer.dtos.prices import PriceLocation
+from tests.utils.gridstatus_stand_in import GridStatusStandIn
+
+UTC = ZoneInfo("UTC")
+
+START = datetime(2024, 10, 1, tzinfo=UTC)
+END = datetime(2024, 10, 11, tzinfo=UTC)
+
+
+def test_chunks_are_time_ordered_and_cover_the_window():
+    client = GridStatusPriceClient(api_clinet=GridStatusStandIn())
+
+    chunks = list(client.iter_energy_price_actual_chunks(
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON", START, END, chunk=timedelta(days=3),
+    ))
+    whole = client.get_energy_price_actual_with_cache(
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON", START, END,
+    )
+
+    assert [len(chunk) for chunk in chunks] == [72, 72, 72, 24]
+    stitched = pd.concat(chunks, ignore_index=True)
+    assert stitched["interval_start_utc"].is_monotonic_increasing
+    pd.testing.assert_series_equal(stitched["price"], whole["price"].reset_index(drop=True))
+
+
+def test_next_chunk_is_fetched_while_the_current_one_is_processed():
+    stand_in = GridStatusStandIn()
+    client = GridStatusPriceClient(api_clinet=stand_in)
+    second_fetched = threading.Event()
+    original = stand_in.get_dataset
+
+    def get_dataset(**kwargs):
+        results = original(**kwargs)
+        if len(stand_in.calls) == 2:
+            second_fetched.set()
+        return results
+
+    stand_in.get_dataset = get_dataset
+    chunks = client.iter_energy_price_actual_chunks(
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON", START, END, chunk=timedelta(days=5),
+    )
+
+    next(chunks)
+    # we have not asked for the second chunk, it is fetched ahead anyway
+    assert second_fetched.wait(timeout=5)
+    assert len(list(chunks)) == 1
+
+
+def test_stopping_early_does_not_fetch_the_rest():
+    stand_in = GridStatusStandIn()
+    client = GridStatusPriceClient(api_clinet=stand_in)
+
+    chunks = client.iter_energy_price_actual_chunks(
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON", START, END, chunk=timedelta(days=1),
+    )
+    next(chunks)
+    chunks.close()
+
+    # the first chunk and the one fetched ahead
+    assert len(stand_in.calls) <= 2
+
+
+def test_bad_chunk_fails_on_the_call():
+    client = GridStatusPriceClient(api_clinet=GridStatusStandIn())
+    with pytest.raises(ValueError):
+        client.iter_energy_price_actual_chunks(
+            ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON", START, END, chunk=timedelta(0),
+        )
+
+
+def test_price_service_many_chunks():
+    service = PriceService(GridStatusPriceClient(api_clinet=GridStatusStandIn()))
+    service.initialize_service_iso(ISOType.ERCOT)
+    locations = [
+        PriceLocation("HB_HOUSTON", PriceLocationType.HUB),
+        PriceLocation("HB_NORTH", PriceLocationType.HUB),
+    ]
+
+    chunks = list(service.iter_price_actual_chunks_many(
+        MarketType.DAM, PriceType.SPP, locations, START, END, 60, chunk=timedelta(days=5),
+    ))
+
+    assert len(chunks) == 2
+    assert all(set(chunk) == {"HB_HOUSTON", "HB_NORTH"} for chunk in chunks)
+    assert all(len(frame) == 5 * 24 for chunk in chunks for frame in chunk.values())
@@ -0,0 +1,103 @@
+import pytest
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api import persist_cache
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+from tests.utils.gridstatus_stand_in import GridStatusStandIn
+
+UTC = ZoneInfo("UTC")
+
+
+def test_stand_in_honors_window_interval_and_location():
+    stand_in = GridStatusStandIn()
+
+    result = stand_in.get_dataset(
+        dataset="ercot_spp_real_time_15_min",
+        start="2024-10-01T00:00:00+00:00",
+        end="2024-10-01T02:00:00+00:00",
+        limit=10_000,
+        filter_column="location",
+        filter_value="HB_NORTH",
+    )
+
+    assert len(result) == 8
+    assert set(result["location"]) == {"HB_NORTH"}
+    assert set(result["location_type"]) == {"Trading Hub"}
+    assert (result["interval_end_utc"] - result["interval_start_utc"] == pd.Timedelta("15min")).all()
+
+
+def test_stand_in_is_deterministic_across_windows_and_honors_limit():
+    stand_in = GridStatusStandIn()
+    kwargs = dict(dataset="ercot_spp_day_ahead_hourly", filter_column="location", filter_value="HB_HOUSTON")
+
+    whole = stand_in.get_dataset(start="2024-10-01T00:00:00+00:00", end="2024-10-02T00:00:00+00:00", **kwargs)
+    part = stand_in.get_dataset(start="2024-10-01T06:00:00+00:00", end="2024-10-02T00:00:00+00:00", limit=5, **kwargs)
+
+    assert len(part) == 5
+    assert part["spp"].tolist() == whole["spp"].iloc[6:11].tolist()
+
+
+def test_stand_in_many_locations():
+    stand_in = GridStatusStandIn()
+
+    result = stand_in.get_dataset(
+        dataset="ercot_spp_day_ahead_hourly",
+        start="2024-10-01T00:00:00+00:00",
+        end="2024-10-01T03:00:00+00:00",
+        filter_column="location",
+        filter_value=["HB_HOUSTON", "LZ_WEST"],
+        filter_operator="in",
+    )
+
+    assert result["location"].tolist() == ["HB_HOUSTON", "LZ_WEST"] * 3
+
+
+def test_stand_in_failure_injection():
+    stand_in = GridStatusStandIn(failure_rate=1.0)
+    with pytest.raises(Exception, match="Error 503"):
+        stand_in.get_dataset(dataset="ercot_spp_day_ahead_hourly", start="2024-10-01", end="2024-10-02")
+
+
+def test_price_client_with_stand_in():
+    stand_in = GridStatusStandIn()
+    client = GridStatusPriceClient(api_clinet=stand_in)
+
+    result = client.get_energy_price_actual_with_cache(
+        iso=ISOType.ERCOT,
+        market_type=MarketType.RTM,
+        price_type=PriceType.SPP,
+        node="HB_HOUSTON",
+        start_time=datetime(2024, 10, 1, tzinfo=UTC),
+        end_time=datetime(2024, 10, 8, tzinfo=UTC),
+    )
+
+    assert len(result) == 7 * 24 * 4
+    assert result["price"].notnull().all()
+
+
+def test_price_client_float32_prices():
+    stand_in = GridStatusStandIn()
+    client = GridStatusPriceClient(api_clinet=stand_in, price_dtype="float32")
+    kwargs = dict(
+        iso=ISOType.ERCOT,
+        market_type=MarketType.RTM,
+        price_type=PriceType.SPP,
+        node="HB_HOUSTON",
+        start_time=datetime(2024, 10, 1, tzinfo=UTC),
+        end_time=datetime(2024, 10, 2, tzinfo=UTC),
+    )
+
+    fetched = client.get_energy_price_actual_with_cache(**kwargs)
+    cached = client.get_energy_price_actual_with_cache(**kwargs)
+
+    assert len(stand_in.calls) == 1
+    for result in (fetched, cached):
+        assert list(result.columns) == persist_cache.COLUMN_NAMES
+        assert result["price"].dtype == "float32"
+        assert result["location"].dtype == "category"
+
+    with pytest.raises(ValueError):
+        GridStatusPriceClient(api_clinet=stand_in, price_dtype="float16")
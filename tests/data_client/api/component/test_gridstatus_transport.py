@@ -0,0 +1,47 @@
+import pytest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.data_client.api.transport import RequestBudgetExceeded, RetryingTransport, RetryPolicy
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+from tests.utils.gridstatus_stand_in import GridStatusStandIn
+
+UTC = ZoneInfo("UTC")
+
+NO_WAIT = RetryPolicy(max_retries=8, base_delay_seconds=0.0, max_delay_seconds=0.0)
+
+
+def _fill(client: GridStatusPriceClient, node: str = "HB_HOUSTON"):
+    return client.get_energy_price_actual_with_cache(
+        iso=ISOType.ERCOT,
+        market_type=MarketType.RTM,
+        price_type=PriceType.SPP,
+        node=node,
+        start_time=datetime(2024, 10, 1, tzinfo=UTC),
+        end_time=datetime(2024, 10, 8, tzinfo=UTC),
+    )
+
+
+def test_cache_fill_survives_injected_failures():
+    stand_in = GridStatusStandIn(failure_rate=0.3, seed=3)
+    transport = RetryingTransport(stand_in, retry_policy=NO_WAIT, seed=0)
+    client = GridStatusPriceClient(api_clinet=stand_in, transport=transport)
+
+    result = _fill(client)
+
+    assert len(result) == 7 * 24 * 4
+    assert transport.retries_made > 0
+    assert transport.requests_made == len(stand_in.calls)
+    assert transport.latency_histograms["ercot_spp_real_time_15_min"].count == len(stand_in.calls)
+
+
+def test_cache_fill_stops_at_the_request_budget():
+    stand_in = GridStatusStandIn(failure_rate=1.0)
+    transport = RetryingTransport(stand_in, retry_policy=NO_WAIT, request_budget=3)
+    client = GridStatusPriceClient(api_clinet=stand_in, transport=transport, max_in_flight=1)
+
+    with pytest.raises(RequestBudgetExceeded):
+        _fill(client)
+
+    assert len(stand_in.calls) == 3
@@ -0,0 +1,83 @@
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api.coverage_index import CoverageIndex
+
+UTC = ZoneInfo("UTC")
+
+
+def _frame(start: datetime, periods: int) -> pd.DataFrame:
+    starts = pd.date_range(start=start, periods=periods, freq="1h")
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta("1h"),
+        "price": 1.0,
+    })
+
+
+def test_from_frame_merges_contiguous_intervals():
+    df = pd.concat([
+        _frame(datetime(2024, 10, 1, 0, tzinfo=UTC), 3),
+        _frame(datetime(2024, 10, 1, 5, tzinfo=UTC), 2),
+    ])
+
+    coverage = CoverageIndex.from_frame(df)
+
+    assert len(coverage) == 2
+
+
+def test_from_frame_with_many_value_columns():
+    df = _frame(datetime(2024, 10, 1, 0, tzinfo=UTC), 3).rename(columns={"price": "regulation_up"})
+    df["regulation_down"] = [None, 2.0, None]
+    df.loc[1, "regulation_up"] = None
+    df.loc[2, "regulation_up"] = None
+
+    coverage = CoverageIndex.from_frame(df, ["regulation_up", "regulation_down"])
+
+    # an interval is covered if any of the products has a price
+    assert coverage.missing(
+        datetime(2024, 10, 1, 0, tzinfo=UTC), datetime(2024, 10, 1, 3, tzinfo=UTC),
+    ) == [(pd.Timestamp("2024-10-01 02:00", tz="UTC"), pd.Timestamp("2024-10-01 03:00", tz="UTC"))]
+
+
+def test_from_frame_skips_null_prices():
+    df = _frame(datetime(2024, 10, 1, 0, tzinfo=UTC), 3)
+    df.loc[1, "price"] = None
+
+    coverage = CoverageIndex.from_frame(df)
+
+    assert coverage.missing(
+        datetime(2024, 10, 1, 0, tzinfo=UTC), datetime(2024, 10, 1, 3, tzinfo=UTC),
+    ) == [(pd.Timestamp("2024-10-01 01:00", tz="UTC"), pd.Timestamp("2024-10-01 02:00", tz="UTC"))]
+
+
+def test_missing_empty_index_is_whole_window():
+    start, end = datetime(2024, 10, 1, tzinfo=UTC), datetime(2024, 10, 2, tzinfo=UTC)
+    assert CoverageIndex().missing(start, end) == [(pd.Timestamp(start), pd.Timestamp(end))]
+
+
+def test_missing_gaps_at_edges_and_inside():
+    coverage = CoverageIndex.from_frame(pd.concat([
+        _frame(datetime(2024, 10, 1, 2, tzinfo=UTC), 2),
+        _frame(datetime(2024, 10, 1, 6, tzinfo=UTC), 2),
+    ]))
+
+    missing = coverage.missing(datetime(2024, 10, 1, 0, tzinfo=UTC), datetime(2024, 10, 1, 10, tzinfo=UTC))
+
+    assert [(start.hour, end.hour) for start, end in missing] == [(0, 2), (4, 6), (8, 10)]
+
+
+def test_missing_fully_covered():
+    coverage = CoverageIndex.from_frame(_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), 24))
+    assert coverage.missing(datetime(2024, 10, 1, 3, tzinfo=UTC), datetime(2024, 10, 1, 9, tzinfo=UTC)) == []
+
+
+def test_union_and_round_trip():
+    first = CoverageIndex.from_frame(_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), 2))
+    second = CoverageIndex.from_frame(_frame(datetime(2024, 10, 1, 2, tzinfo=UTC), 2))
+
+    coverage = CoverageIndex.from_dict(first.union(second).to_dict())
+
+    assert len(coverage) == 1
+    assert coverage.missing(datetime(2024, 10, 1, 0, tzinfo=UTC), datetime(2024, 10, 1, 4, tzinfo=UTC)) == []
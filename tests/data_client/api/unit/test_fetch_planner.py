@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api.fetch_planner import FetchCostModel, plan_fetches
+
+UTC = ZoneInfo("UTC")
+HOUR = timedelta(hours=1)
+
+
+def _gap(start_hour: int, end_hour: int):
+    return (datetime(2024, 10, 1, start_hour, tzinfo=UTC), datetime(2024, 10, 1, end_hour, tzinfo=UTC))
+
+
+def test_plan_fetches_no_missing_periods():
+    plan = plan_fetches([], HOUR, FetchCostModel())
+    assert plan.periods == []
+    assert plan.estimated_cost_seconds == 0.0
+
+
+def test_plan_fetches_merges_gaps_when_requests_are_expensive():
+    gaps = [_gap(0, 1), _gap(2, 3), _gap(4, 5)]
+
+    plan = plan_fetches(gaps, HOUR, FetchCostModel(request_cost_seconds=1.0, row_cost_seconds=0.1))
+
+    assert plan.periods == [_gap(0, 5)]
+    assert plan.redundant_rows == 2
+    assert plan.estimated_cost_seconds == 1.0 + 5 * 0.1
+
+
+def test_plan_fetches_keeps_gaps_when_spans_between_are_large():
+    gaps = [_gap(0, 1), _gap(2, 3), _gap(20, 21)]
+
+    plan = plan_fetches(gaps, HOUR, FetchCostModel(request_cost_seconds=1.0, row_cost_seconds=0.1))
+
+    assert plan.periods == [_gap(0, 3), _gap(20, 21)]
+    assert plan.redundant_rows == 1
+
+
+def test_plan_fetches_counts_rows_for_all_locations():
+    gaps = [_gap(0, 1), _gap(2, 3)]
+
+    plan = plan_fetches(
+        gaps, HOUR, FetchCostModel(request_cost_seconds=1.0, row_cost_seconds=0.1), locations_count=20,
+    )
+
+    assert plan.periods == gaps
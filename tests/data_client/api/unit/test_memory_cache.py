@@ -0,0 +1,81 @@
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api.memory_cache import LRUFrameCache
+
+UTC = ZoneInfo("UTC")
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"price": [1.0] * rows})
+
+
+def test_get_miss_then_hit():
+    cache = LRUFrameCache()
+    assert cache.get("a", generation=0) is None
+
+    frame = _frame(10)
+    cache.put("a", 0, frame)
+
+    assert cache.get("a", generation=0) is frame
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_get_stale_generation_is_a_miss():
+    cache = LRUFrameCache()
+    cache.put("a", 0, _frame(10))
+
+    assert cache.get("a", generation=1) is None
+    assert cache.stats.misses == 1
+
+
+def test_get_window_outside_loaded_window_is_a_miss():
+    cache = LRUFrameCache()
+    cache.put(
+        "a", 0, _frame(10),
+        start_time=datetime(2024, 10, 1, tzinfo=UTC),
+        end_time=datetime(2024, 10, 10, tzinfo=UTC),
+    )
+
+    assert cache.get(
+        "a", 0, datetime(2024, 10, 2, tzinfo=UTC), datetime(2024, 10, 3, tzinfo=UTC),
+    ) is not None
+    assert cache.get(
+        "a", 0, datetime(2024, 10, 2, tzinfo=UTC), datetime(2024, 10, 11, tzinfo=UTC),
+    ) is None
+    assert cache.get("a", 0) is None
+
+
+def test_get_window_mixing_naive_and_aware_timestamps():
+    cache = LRUFrameCache()
+    cache.put(
+        "a", 0, _frame(10),
+        start_time=datetime(2024, 10, 1, tzinfo=UTC),
+        end_time=datetime(2024, 10, 10),
+    )
+
+    # naive timestamps are UTC, aware ones are compared in UTC
+    assert cache.get("a", 0, datetime(2024, 10, 2), datetime(2024, 10, 3, tzinfo=UTC)) is not None
+    assert cache.get(
+        "a", 0, datetime(2024, 10, 1, tzinfo=ZoneInfo("US/Central")), datetime(2024, 10, 9, 18, tzinfo=ZoneInfo("US/Central")),
+    ) is not None
+    assert cache.get("a", 0, datetime(2024, 9, 30, 23), datetime(2024, 10, 3)) is None
+    assert cache.get(
+        "a", 0, datetime(2024, 10, 2), datetime(2024, 10, 9, 20, tzinfo=ZoneInfo("US/Central")),
+    ) is None
+
+
+def test_put_evicts_least_recently_used_over_budget():
+    frame_size = int(_frame(100).memory_usage(deep=True).sum())
+    cache = LRUFrameCache(max_bytes=2 * frame_size)
+    cache.put("a", 0, _frame(100))
+    cache.put("b", 0, _frame(100))
+    cache.get("a", 0)
+
+    cache.put("c", 0, _frame(100))
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) is not None
+    assert cache.stats.evictions == 1
+    assert cache.size_bytes == 2 * frame_size
@@ -0,0 +1,274 @@
+import pytest
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api import persist_cache
+from price_analyzer.data_client.api.persist_cache import (
+    get_cache_dir,
+    get_cache_file,
+    get_legacy_cache_file_path,
+    persist_cache_file,
+    migrate_csv_cache,
+    append_cache_segment,
+    compact_cache,
+    read_manifest,
+    get_coverage_index,
+    get_missing_periods,
+    compact_frame,
+    get_cache_footprint,
+)
+from price_analyzer.data_client.api.memory_cache import LRUFrameCache
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType
+
+UTC = ZoneInfo("UTC")
+
+
+def _price_frame(start: datetime, periods: int, freq: str = "1h") -> pd.DataFrame:
+    starts = pd.date_range(start=start, periods=periods, freq=freq)
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta(freq),
+        "location": "HB_HOUSTON",
+        "location_type": "Trading Hub",
+        "market": "DAY_AHEAD_HOURLY",
+        "price": [float(i) for i in range(periods)],
+    })
+
+
+def test_persist_cache_file_writes_monthly_partitions():
+    df = _price_frame(datetime(2024, 9, 30, 22, tzinfo=UTC), periods=4)
+
+    persist_cache_file(df, ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    cache_dir = get_cache_dir(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert sorted(path.name for path in cache_dir.glob("*.parquet")) == ["2024-09.parquet", "2024-10.parquet"]
+
+
+def test_get_cache_file_reads_only_overlapping_partitions():
+    df = _price_frame(datetime(2024, 9, 30, 22, tzinfo=UTC), periods=4)
+    persist_cache_file(df, ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    result = get_cache_file(
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+        start_time=datetime(2024, 10, 1, 0, tzinfo=UTC),
+        end_time=datetime(2024, 10, 1, 2, tzinfo=UTC),
+    )
+    assert len(result) == 2
+    assert str(result["interval_start_utc"].dtype) == "datetime64[ns, UTC]"
+
+
+def test_persist_cache_file_merges_with_existing_records():
+    first = _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=3)
+    second = _price_frame(datetime(2024, 10, 1, 2, tzinfo=UTC), periods=3)
+    second["price"] = 100.0
+
+    persist_cache_file(first, ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    persist_cache_file(second, ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    result = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert result["price"].tolist() == [0.0, 1.0, 100.0, 100.0, 100.0]
+
+
+def test_get_cache_file_empty():
+    result = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert result.empty
+    assert list(result.columns) == persist_cache.COLUMN_NAMES
+
+
+def test_migrate_csv_cache():
+    df = _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=5)
+    csv_path = get_legacy_cache_file_path(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    df.to_csv(csv_path, index=False)
+
+    migrated = migrate_csv_cache(remove_csv=True)
+
+    assert migrated == [csv_path]
+    assert not csv_path.exists()
+    result = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert result["price"].tolist() == df["price"].tolist()
+
+
+def test_append_cache_segment_is_read_back_without_touching_partitions():
+    base = _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=3)
+    persist_cache_file(base, ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    cache_dir = get_cache_dir(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    partition_mtime = (cache_dir / "2024-10.parquet").stat().st_mtime_ns
+
+    generation = read_manifest(cache_dir)["generation"]
+
+    gap = _price_frame(datetime(2024, 10, 1, 3, tzinfo=UTC), periods=2)
+    append_cache_segment(gap, ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    assert (cache_dir / "2024-10.parquet").stat().st_mtime_ns == partition_mtime
+    manifest = read_manifest(cache_dir)
+    assert manifest["generation"] == generation + 1
+    assert [segment["rows"] for segment in manifest["segments"]] == [2]
+
+    result = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert len(result) == 5
+    assert result["interval_start_utc"].is_monotonic_increasing
+
+
+def test_get_cache_file_skips_segments_outside_window():
+    append_cache_segment(
+        _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=2),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+    append_cache_segment(
+        _price_frame(datetime(2024, 10, 5, 0, tzinfo=UTC), periods=2),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+
+    result = get_cache_file(
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+        start_time=datetime(2024, 10, 5, 0, tzinfo=UTC),
+        end_time=datetime(2024, 10, 6, 0, tzinfo=UTC),
+    )
+    assert len(result) == 2
+
+
+def test_compact_cache_folds_segments_into_partitions():
+    for day in range(1, 4):
+        append_cache_segment(
+            _price_frame(datetime(2024, 10, day, 0, tzinfo=UTC), periods=2),
+            ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+        )
+    before = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    compact_cache(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    cache_dir = get_cache_dir(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert read_manifest(cache_dir)["segments"] == []
+    assert list((cache_dir / "segments").iterdir()) == []
+    after = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    pd.testing.assert_frame_equal(before, after)
+
+
+def test_get_cache_file_served_from_memory_until_next_write(monkeypatch):
+    memory_cache = LRUFrameCache()
+    monkeypatch.setattr(persist_cache, "MEMORY_CACHE", memory_cache)
+    persist_cache_file(
+        _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=3),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+
+    first = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    second = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert second is first
+    assert (memory_cache.stats.hits, memory_cache.stats.misses) == (1, 1)
+
+    append_cache_segment(
+        _price_frame(datetime(2024, 10, 1, 3, tzinfo=UTC), periods=1),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+    third = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert len(third) == 4
+    assert memory_cache.stats.misses == 2
+
+
+def test_get_missing_periods_from_coverage_updated_on_append():
+    append_cache_segment(
+        _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=2),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+    append_cache_segment(
+        _price_frame(datetime(2024, 10, 1, 4, tzinfo=UTC), periods=2),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+
+    coverage = get_coverage_index(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    missing = get_missing_periods(
+        coverage, datetime(2024, 10, 1, 0, tzinfo=UTC), datetime(2024, 10, 1, 8, tzinfo=UTC),
+    )
+
+    assert [(start.hour, end.hour) for start, end in missing] == [(2, 4), (6, 8)]
+
+
+def test_get_coverage_index_built_for_cache_without_index():
+    persist_cache_file(
+        _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=3),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+    cache_dir = get_cache_dir(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    manifest = read_manifest(cache_dir)
+    del manifest["coverage"]
+    persist_cache._write_manifest(cache_dir, manifest)
+
+    coverage = get_coverage_index(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    assert len(coverage) == 1
+    assert "coverage" in read_manifest(cache_dir)
+
+
+def test_compact_frame_projects_columns_and_encodes_strings():
+    df = _price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=24)
+    df["interval_start_local"] = df["interval_start_utc"]
+
+    compacted = compact_frame(df, price_dtype="float32")
+
+    assert list(compacted.columns) == persist_cache.COLUMN_NAMES
+    assert all(compacted[column].dtype == "category" for column in persist_cache.CATEGORICAL_COLUMNS)
+    assert compacted["price"].dtype == "float32"
+    assert compacted.memory_usage(deep=True).sum() < df.memory_usage(deep=True).sum() / 2
+    with pytest.raises(ValueError):
+        compact_frame(df, price_dtype="float16")
+
+
+def test_cached_frames_keep_compact_dtypes():
+    df = compact_frame(_price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=3), price_dtype="float32")
+    append_cache_segment(df, ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    persist_cache_file(
+        _price_frame(datetime(2024, 10, 1, 3, tzinfo=UTC), periods=3).assign(location_type="Hub"),
+        ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+    )
+
+    cache_df = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    assert len(cache_df) == 6
+    # categoricals with different categories are concatenated as objects, so they are encoded again
+    assert cache_df["location_type"].dtype == "category"
+    assert list(cache_df["location_type"].cat.categories) == ["Hub", "Trading Hub"]
+
+
+def test_get_cache_footprint(monkeypatch):
+    monkeypatch.setattr(persist_cache, "MEMORY_CACHE", LRUFrameCache())
+    key = (ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    assert get_cache_footprint(*key) == persist_cache.CacheFootprint(memory_bytes=0, disk_bytes=0)
+
+    append_cache_segment(_price_frame(datetime(2024, 10, 1, 0, tzinfo=UTC), periods=3), *key)
+    on_disk = get_cache_footprint(*key)
+    assert on_disk.memory_bytes == 0
+    assert on_disk.disk_bytes > 0
+
+    cache_df = get_cache_file(*key)
+    assert get_cache_footprint(*key).memory_bytes == cache_df.memory_usage(deep=True).sum()
+
+
+def test_get_cache_file_reads_again_when_compacted_under_it(monkeypatch):
+    monkeypatch.setattr(persist_cache, "MEMORY_CACHE", LRUFrameCache())
+    for day in range(1, 4):
+        append_cache_segment(
+            _price_frame(datetime(2024, 10, day, 0, tzinfo=UTC), periods=2),
+            ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON",
+        )
+    expected = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+    monkeypatch.setattr(persist_cache, "MEMORY_CACHE", LRUFrameCache())
+
+    # the reader gets the manifest with the segments, then another worker compacts them away
+    original_read_manifest = persist_cache.read_manifest
+    compacted = []
+
+    def read_manifest_then_compact(cache_dir):
+        manifest = original_read_manifest(cache_dir)
+        if not compacted:
+            compacted.append(True)
+            compact_cache(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+        return manifest
+
+    monkeypatch.setattr(persist_cache, "read_manifest", read_manifest_then_compact)
+    cache_df = get_cache_file(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON")
+
+    assert compacted
+    assert original_read_manifest(get_cache_dir(ISOType.ERCOT, MarketType.DAM, PriceType.SPP, "HB_HOUSTON"))["segments"] == []
+    pd.testing.assert_frame_equal(cache_df, expected)
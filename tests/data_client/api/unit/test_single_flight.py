@@ -0,0 +1,66 @@
+import threading
+import time
+import pytest
+
+from price_analyzer.data_client.api.single_flight import SingleFlight, cache_key_lock
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers():
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(4)
+    results = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.1)
+        return "result"
+
+    def caller():
+        barrier.wait()
+        results.append(flight.do("key", slow_call))
+
+    threads = [threading.Thread(target=caller) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["result"] * 4
+
+
+def test_single_flight_runs_again_after_a_call_is_done():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+
+
+def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+
+    def failing_call():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", failing_call)
+
+
+def test_cache_key_lock_is_reentrant_and_exclusive(tmp_path):
+    cache_dir = tmp_path / "ERCOT" / "DAM" / "SPP" / "HB_HOUSTON"
+    events = []
+
+    def other_writer():
+        with cache_key_lock(cache_dir):
+            events.append("other")
+
+    with cache_key_lock(cache_dir):
+        with cache_key_lock(cache_dir):
+            thread = threading.Thread(target=other_writer)
+            thread.start()
+            time.sleep(0.1)
+            events.append("first")
+    thread.join()
+
+    assert events == ["first", "other"]
+    assert (cache_dir / ".lock").exists()
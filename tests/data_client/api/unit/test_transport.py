@@ -0,0 +1,140 @@
+import time
+import pytest
+import requests
+
+from price_analyzer.data_client.api.transport import (
+    LatencyHistogram,
+    RequestBudgetExceeded,
+    RetryingTransport,
+    RetryPolicy,
+    TokenBucket,
+    is_retryable,
+)
+
+
+class FlakyClient:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def get_dataset(self, dataset, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"{dataset} records"
+
+
+def _transport(client, **kwargs):
+    sleeps = []
+    transport = RetryingTransport(client, sleep=sleeps.append, seed=0, **kwargs)
+    return transport, sleeps
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (Exception("Error 503: service unavailable"), True),
+    (Exception("Error 429: too many requests"), True),
+    (Exception("Rate limited. Retrying in 2 seconds"), True),
+    (requests.ConnectionError("connection reset"), True),
+    (requests.Timeout("read timed out"), True),
+    (Exception("Error 404: dataset not found"), False),
+    (Exception("Error 401: invalid api key"), False),
+    (ValueError("something else"), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) == retryable
+
+
+def test_retries_transient_errors_with_backoff():
+    client = FlakyClient([Exception("Error 503: down"), Exception("Error 502: bad gateway")])
+    transport, sleeps = _transport(client, retry_policy=RetryPolicy(base_delay_seconds=1.0, max_delay_seconds=10.0))
+
+    assert transport.get_dataset("ercot_spp_day_ahead_hourly") == "ercot_spp_day_ahead_hourly records"
+
+    assert client.calls == 3
+    assert transport.retries_made == 2
+    # full jitter, under the exponential cap of each attempt
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1.0
+    assert 0 <= sleeps[1] <= 2.0
+
+
+def test_does_not_retry_other_errors():
+    client = FlakyClient([Exception("Error 404: dataset not found")])
+    transport, sleeps = _transport(client)
+
+    with pytest.raises(Exception, match="Error 404"):
+        transport.get_dataset("unknown")
+
+    assert client.calls == 1
+    assert sleeps == []
+
+
+def test_gives_up_after_max_retries():
+    client = FlakyClient([Exception("Error 503: down")] * 10)
+    transport, sleeps = _transport(client, retry_policy=RetryPolicy(max_retries=2))
+
+    with pytest.raises(Exception, match="Error 503"):
+        transport.get_dataset("ercot_spp_day_ahead_hourly")
+
+    assert client.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_backoff_is_capped():
+    transport, _ = _transport(FlakyClient([]), retry_policy=RetryPolicy(base_delay_seconds=1.0, max_delay_seconds=3.0))
+    assert all(transport._backoff_seconds(attempt) <= 3.0 for attempt in range(10))
+
+
+def test_request_budget_counts_retries():
+    client = FlakyClient([Exception("Error 503: down")])
+    transport, _ = _transport(client, request_budget=2)
+
+    transport.get_dataset("ercot_spp_day_ahead_hourly")
+    assert transport.requests_made == 2
+
+    with pytest.raises(RequestBudgetExceeded):
+        transport.get_dataset("ercot_spp_day_ahead_hourly")
+    assert client.calls == 2
+
+    transport.reset_budget(3)
+    transport.get_dataset("ercot_spp_day_ahead_hourly")
+    assert transport.requests_made == 1
+
+
+def test_latency_histograms_per_dataset():
+    client = FlakyClient([Exception("Error 503: down")])
+    transport, _ = _transport(client)
+
+    transport.get_dataset("ercot_spp_day_ahead_hourly")
+    transport.get_dataset("ercot_spp_real_time_15_min")
+
+    assert transport.latency_histograms["ercot_spp_day_ahead_hourly"].count == 2
+    assert transport.latency_histograms["ercot_spp_real_time_15_min"].count == 1
+
+
+def test_latency_histogram_buckets():
+    histogram = LatencyHistogram([0.1, 1.0])
+    for seconds in [0.05, 0.5, 0.5, 5.0]:
+        histogram.record(seconds)
+
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.mean_seconds == pytest.approx(1.5125)
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate_per_second=20, burst=2)
+
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    elapsed = time.monotonic() - started
+
+    # the burst goes right away, the other 4 wait for a token each
+    assert elapsed >= 4 / 20 * 0.9
+
+
+def test_token_bucket_rejects_bad_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate_per_second=0)
@@ -0,0 +1,10 @@
+import pytest
+
+from price_analyzer.data_client.api import persist_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_volume(tmp_path, monkeypatch):
+    # every test gets its own empty cache volume, away from the real one
+    monkeypatch.setattr(persist_cache, "CACHE_VOLUME_PATH", tmp_path)
+    return tmp_path
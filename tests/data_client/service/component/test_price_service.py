@@ -0,0 +1,130 @@
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.api.gridstatus_price import GridStatusPriceClient
+from price_analyzer.data_client.service.gridstatus.price_service import PriceService, resample_dataframe
+from price_analyzer.dtos.basic_types import ISOType, MarketType, PriceType, PriceLocationType
+from price_analyzer.dtos.prices import PriceLocation
+from tests.utils.gridstatus_stand_in import GridStatusStandIn
+
+UTC = ZoneInfo("UTC")
+
+START = datetime(2024, 10, 1, 6, tzinfo=UTC)
+END = datetime(2024, 10, 2, 6, tzinfo=UTC)
+HOUSTON = PriceLocation("HB_HOUSTON", PriceLocationType.HUB)
+
+
+@pytest.fixture
+def service() -> PriceService:
+    service = PriceService(GridStatusPriceClient(api_clinet=GridStatusStandIn()))
+    service.initialize_service_iso(ISOType.ERCOT)
+    return service
+
+
+def test_get_price_actual_rtm_to_hourly(service):
+    price = service.get_price_actual(MarketType.RTM, PriceType.SPP, HOUSTON, START, END, 60)
+    df = service.get_price_actual_df(MarketType.RTM, PriceType.SPP, HOUSTON, START, END, 60)
+
+    assert price.start_time == START
+    assert price.interval_duration == timedelta(minutes=60)
+    assert len(price.values) == 24
+    np.testing.assert_allclose(price.values, df["price"].to_numpy().reshape(24, 4).mean(axis=1), rtol=1e-6)
+
+
+def test_get_price_actual_dam_to_15_min(service):
+    price = service.get_price_actual(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 15)
+    assert len(price.values) == 96
+    assert price.tolist()[:4] == [price.values[0]] * 4
+
+
+def test_get_price_actual_as_product(service):
+    price = service.get_price_actual(MarketType.DAM, PriceType.REGUP, None, START, END, 60)
+    assert len(price.values) == 24
+    assert not np.isnan(price.values).any()
+
+
+def test_resample_dataframe(service):
+    df = service.get_price_actual_df(MarketType.RTM, PriceType.SPP, HOUSTON, START, END, 60)
+
+    hourly = resample_dataframe(df, 60)
+
+    assert len(hourly) == 24
+    assert hourly.index.name == "interval_start_utc"
+    assert hourly.index[0] == START
+    assert (hourly["interval_end_utc"] - hourly.index == timedelta(hours=1)).all()
+    assert resample_dataframe(df.iloc[0:0], 60).empty
+
+
+def test_get_price_actual_is_a_view_when_the_records_are_the_grid(service, monkeypatch):
+    df = service.get_price_actual_df(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+    monkeypatch.setattr(service.price_data_client, "get_energy_price_actual", lambda **kwargs: df)
+
+    price = service.get_price_actual(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+
+    assert len(price) == 24
+    assert np.shares_memory(price.values, df["price"].to_numpy())
+
+
+def test_get_price_matrix(service):
+    locations = [HOUSTON, PriceLocation("HB_NORTH", PriceLocationType.HUB), PriceLocation("HB_WEST", PriceLocationType.HUB)]
+
+    matrix = service.get_price_matrix(locations, MarketType.RTM, PriceType.SPP, START, END, 60)
+
+    assert matrix.shape == (3, 24)
+    assert matrix.values.flags["C_CONTIGUOUS"]
+    assert matrix.mask.all()
+    assert matrix.interval_starts[0] == START and matrix.end_time == END
+    for location in locations:
+        expected = service.get_price_actual(MarketType.RTM, PriceType.SPP, location, START, END, 60)
+        np.testing.assert_allclose(matrix.price(location.name).values, expected.values, rtol=1e-6)
+    assert list(matrix.to_frame().columns) == ["HB_HOUSTON", "HB_NORTH", "HB_WEST"]
+
+
+def test_get_price_matrix_gaps_are_nan(service, monkeypatch):
+    frames = service.get_price_actual_df_many(MarketType.DAM, PriceType.SPP, [HOUSTON], START, END, 60)
+    frames["HB_NORTH"] = frames["HB_HOUSTON"].iloc[0:0]
+    frames["HB_HOUSTON"] = frames["HB_HOUSTON"].iloc[2:]
+    monkeypatch.setattr(service, "get_price_actual_df_many", lambda *args: frames)
+
+    matrix = service.get_price_matrix(
+        [HOUSTON, PriceLocation("HB_NORTH", PriceLocationType.HUB)], MarketType.DAM, PriceType.SPP, START, END, 60,
+    )
+
+    assert matrix.mask.sum(axis=1).tolist() == [22, 0]
+    assert not matrix.mask[0, :2].any()
+
+
+def test_session_reads_each_series_once(service):
+    stand_in = service.price_data_client.client
+    narrower_start = START + timedelta(hours=6)
+
+    with service.session():
+        whole = service.get_price_actual_df(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+        part = service.get_price_actual_df(MarketType.DAM, PriceType.SPP, HOUSTON, narrower_start, END, 60)
+        price = service.get_price_actual(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+        with service.session():
+            again = service.get_price_actual_df(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+        assert service._memo.stats.hits == 3
+
+    assert len(stand_in.calls) == 1
+    assert len(part) == 18 and part["interval_start_utc"].iloc[0] == narrower_start
+    assert again is whole
+    assert len(price) == 24
+    assert service._memo is None
+
+
+def test_session_invalidate(service, monkeypatch):
+    calls = []
+    original = service._get_price_actual_df
+    monkeypatch.setattr(service, "_get_price_actual_df", lambda *args: calls.append(args) or original(*args))
+
+    with service.session():
+        service.get_price_actual_df(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+        service.invalidate(market_type=MarketType.RTM)
+        service.get_price_actual_df(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+        service.invalidate(location=HOUSTON)
+        service.get_price_actual_df(MarketType.DAM, PriceType.SPP, HOUSTON, START, END, 60)
+
+    assert len(calls) == 2
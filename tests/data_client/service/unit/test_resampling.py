@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.service.resampling import (
+    UpsamplePolicy,
+    resample_prices,
+    resample_regular,
+    to_regular_grid,
+)
+from price_analyzer.utils.timestamps import infer_resolution_minutes
+
+UTC = ZoneInfo("UTC")
+
+
+def _frame(start: datetime, prices, minutes: int) -> pd.DataFrame:
+    starts = pd.date_range(start=start, periods=len(prices), freq=pd.Timedelta(minutes=minutes))
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta(minutes=minutes),
+        "price": prices,
+    })
+
+
+def test_downsample_is_the_mean_of_whole_intervals():
+    values = np.array([1.0, 2.0, 3.0, 4.0, 10.0, 20.0, 30.0, 40.0])
+    np.testing.assert_allclose(resample_regular(values, 15, 60), [2.5, 25.0])
+
+
+def test_downsample_is_time_weighted_for_uneven_ratios():
+    # 40 min targets over 15 min prices, the second 15 min interval is split 10/5
+    values = np.array([1.0, 4.0, 7.0, 10.0])
+    expected = [(15 * 1.0 + 15 * 4.0 + 10 * 7.0) / 40, (5 * 7.0 + 15 * 10.0) / 20]
+    np.testing.assert_allclose(resample_regular(values, 15, 40), expected)
+
+
+def test_downsample_skips_missing_prices():
+    values = np.array([1.0, np.nan, 3.0, np.nan, np.nan, np.nan, np.nan, np.nan])
+    result = resample_regular(values, 15, 60)
+    assert result[0] == pytest.approx(2.0)
+    assert np.isnan(result[1])
+
+
+def test_upsample_policies():
+    values = np.array([10.0, 20.0, np.nan])
+
+    np.testing.assert_allclose(
+        resample_regular(values, 60, 30, UpsamplePolicy.FFILL), [10, 10, 20, 20, np.nan, np.nan],
+    )
+    np.testing.assert_allclose(
+        resample_regular(values, 60, 30, UpsamplePolicy.LINEAR), [10, 15, 20, 20, np.nan, np.nan],
+    )
+
+
+def test_resample_many_nodes_at_once():
+    values = np.random.default_rng(0).normal(size=(96, 5))
+    hourly = resample_regular(values, 15, 60)
+
+    assert hourly.shape == (24, 5)
+    np.testing.assert_allclose(hourly, values.reshape(24, 4, 5).mean(axis=1))
+    np.testing.assert_allclose(resample_regular(hourly, 60, 15), np.repeat(hourly, 4, axis=0))
+
+
+def test_to_regular_grid_leaves_gaps_and_outside_records_out():
+    df = _frame(datetime(2024, 10, 1, 0, tzinfo=UTC), [1.0, 2.0, 3.0, 4.0], 60).drop(index=1)
+
+    grid = to_regular_grid(df, datetime(2024, 10, 1, 1, tzinfo=UTC), datetime(2024, 10, 1, 5, tzinfo=UTC), 60)
+
+    np.testing.assert_allclose(grid, [np.nan, 3.0, 4.0, np.nan])
+
+
+def test_resample_prices_matches_pandas_mean_on_whole_hours():
+    prices = np.random.default_rng(1).normal(30, 10, size=96)
+    df = _frame(datetime(2024, 10, 1, 0, tzinfo=UTC), prices, 15)
+
+    hourly = resample_prices(df, datetime(2024, 10, 1, tzinfo=UTC), datetime(2024, 10, 2, tzinfo=UTC), 60)
+    expected = df.set_index("interval_start_utc")["price"].resample("60min").mean().to_numpy()
+
+    assert infer_resolution_minutes(df) == 15
+    np.testing.assert_allclose(hourly, expected)
+
+
+def test_resample_prices_empty_frame():
+    result = resample_prices(
+        _frame(datetime(2024, 10, 1, tzinfo=UTC), [], 60),
+        datetime(2024, 10, 1, tzinfo=UTC), datetime(2024, 10, 1, 3, tzinfo=UTC), 60,
+    )
+    assert len(result) == 3 and np.isnan(result).all()
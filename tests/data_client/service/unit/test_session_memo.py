@@ -0,0 +1,67 @@
+import pandas as pd
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from price_analyzer.data_client.service.session_memo import SessionMemo
+
+UTC = ZoneInfo("UTC")
+
+
+def _hour(hour: int) -> datetime:
+    return datetime(2024, 10, 1, hour, tzinfo=UTC)
+
+
+def _frame(start_hour: int, end_hour: int) -> pd.DataFrame:
+    starts = pd.date_range(start=_hour(start_hour), end=_hour(end_hour), freq="1h", inclusive="left")
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta("1h"),
+        "price": range(len(starts)),
+    })
+
+
+def test_sub_window_is_sliced_from_the_loaded_one():
+    memo = SessionMemo()
+    frame = _frame(0, 12)
+    memo.put("key", _hour(0), _hour(12), frame)
+
+    assert memo.get("key", _hour(0), _hour(12)) is frame
+    assert memo.get("key", _hour(3), _hour(6))["price"].tolist() == [3, 4, 5]
+    assert memo.get("key", _hour(6), _hour(13)) is None
+    assert memo.get("other", _hour(3), _hour(6)) is None
+    assert (memo.stats.hits, memo.stats.misses) == (2, 2)
+
+
+def test_naive_and_aware_windows_are_compared_in_utc():
+    memo = SessionMemo()
+    frame = _frame(0, 12)
+    memo.put("key", datetime(2024, 10, 1, 0), _hour(12), frame)
+
+    assert memo.get("key", _hour(0), datetime(2024, 10, 1, 12)) is frame
+    assert memo.get("key", datetime(2024, 10, 1, 3), _hour(6))["price"].tolist() == [3, 4, 5]
+    # 2am in Chicago is 7am UTC
+    central = ZoneInfo("US/Central")
+    assert memo.get("key", datetime(2024, 10, 1, 2, tzinfo=central), _hour(9))["price"].tolist() == [7, 8]
+    assert memo.get("key", datetime(2024, 10, 1, 6), datetime(2024, 10, 1, 8, tzinfo=central)) is None
+
+
+def test_wider_window_replaces_the_ones_it_contains():
+    memo = SessionMemo()
+    memo.put("key", _hour(2), _hour(4), _frame(2, 4))
+    memo.put("key", _hour(8), _hour(10), _frame(8, 10))
+    memo.put("key", _hour(0), _hour(6), _frame(0, 6))
+
+    assert len(memo) == 2
+
+
+def test_invalidate():
+    memo = SessionMemo()
+    memo.put(("DAM", "HB_HOUSTON"), _hour(0), _hour(2), _frame(0, 2))
+    memo.put(("RTM", "HB_HOUSTON"), _hour(0), _hour(2), _frame(0, 2))
+
+    memo.invalidate(lambda key: key[0] == "DAM")
+    assert memo.get(("DAM", "HB_HOUSTON"), _hour(0), _hour(2)) is None
+    assert memo.get(("RTM", "HB_HOUSTON"), _hour(0), _hour(2)) is not None
+
+    memo.invalidate()
+    assert len(memo) == 0
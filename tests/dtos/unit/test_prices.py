@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from price_analyzer.dtos.basic_types import PriceType, PriceLocationType
+from price_analyzer.dtos.prices import Price, PriceLocation, PriceMatrix
+
+UTC = ZoneInfo("UTC")
+START = datetime(2024, 10, 1, tzinfo=UTC)
+HOUR = timedelta(hours=1)
+
+
+def test_price_converts_lists_once():
+    price = Price(PriceType.SPP, [1, 2, 3], START, HOUR)
+
+    assert isinstance(price.values, np.ndarray)
+    assert price.values.dtype == np.float64
+    assert price.tolist() == [1.0, 2.0, 3.0]
+    assert len(price) == 3
+    assert price.end_time == START + 3 * HOUR
+
+
+def test_price_keeps_arrays_and_float32():
+    values = np.arange(24, dtype=np.float32)
+    price = Price(PriceType.SPP, values, START, HOUR)
+
+    assert price.values is values
+    assert np.asarray(price) is values
+
+
+def test_price_from_frame_is_a_view():
+    df = pd.DataFrame({"price": np.arange(24, dtype=np.float64)})
+
+    price = Price.from_frame(df, PriceType.SPP, START, HOUR)
+
+    assert np.shares_memory(price.values, df["price"].to_numpy())
+
+
+def test_price_equality():
+    first = Price(PriceType.SPP, [1.0, np.nan], START, HOUR)
+    assert first == Price(PriceType.SPP, np.array([1.0, np.nan]), START, HOUR)
+    assert first != Price(PriceType.LMP, [1.0, np.nan], START, HOUR)
+
+
+def test_dtos_are_slotted():
+    price = Price(PriceType.SPP, [1.0], START, HOUR)
+    location = PriceLocation("HB_HOUSTON", PriceLocationType.HUB)
+
+    for dto in (price, location):
+        assert not hasattr(dto, "__dict__")
+        with pytest.raises(AttributeError):
+            dto.something_else = 1
+
+
+def test_price_matrix_checks_the_shape():
+    locations = [PriceLocation("HB_HOUSTON", PriceLocationType.HUB)]
+    with pytest.raises(ValueError):
+        PriceMatrix(PriceType.SPP, locations, np.zeros((2, 24)), START, HOUR)
+
+    matrix = PriceMatrix(PriceType.SPP, locations, np.zeros((1, 24)), START, HOUR)
+    assert np.shares_memory(matrix.price("HB_HOUSTON").values, matrix.values)
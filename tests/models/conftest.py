@@ -0,0 +1,12 @@
+import pytest
+
+from price_analyzer.models import calendar_table
+
+
+@pytest.fixture(scope="session", autouse=True)
+def calendar_volume(tmp_path_factory):
+    # the calendar tables are built once for the session and away from the real table dir
+    path = tmp_path_factory.mktemp("calendar_tables")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(calendar_table, "CALENDAR_TABLE_PATH", path)
+        yield path
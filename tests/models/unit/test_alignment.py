@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from price_analyzer.dtos.basic_types import PriceLocationType, PriceType
+from price_analyzer.dtos.prices import PriceLocation, PriceMatrix
+from price_analyzer.models.alignment import (
+    align_to_intervals,
+    dam_rtm_dart,
+    dam_rtm_dart_many,
+    dart_matrix,
+)
+from price_analyzer.models.features import dam_rtm_hourly_dif
+
+UTC = ZoneInfo("UTC")
+START = datetime(2024, 10, 1, 5, tzinfo=UTC)
+
+
+def _frame(start: datetime, periods: int, minutes: int, prices) -> pd.DataFrame:
+    starts = pd.date_range(start=start, periods=periods, freq=f"{minutes}min")
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta(minutes=minutes),
+        "price": prices,
+    })
+
+
+def test_dam_hours_are_broadcast_onto_rtm_intervals():
+    dam = _frame(START, 3, 60, [10.0, 20.0, 30.0])
+    rtm = _frame(START, 12, 15, np.arange(12, dtype=float))
+
+    dart = dam_rtm_dart(dam, rtm)
+
+    assert dart["dam_price"].tolist() == [10.0] * 4 + [20.0] * 4 + [30.0] * 4
+    np.testing.assert_array_equal(dart["dart"], dart["dam_price"] - np.arange(12))
+    assert dart["interval_start_utc"].dt.tz is not None
+
+
+def test_gaps_and_mismatched_windows_are_nan():
+    # the DAM misses its second hour, and the RTM starts half an hour before it and ends after it
+    dam = _frame(START, 3, 60, [10.0, 20.0, 30.0]).drop(index=1)
+    rtm = _frame(START - timedelta(minutes=30), 18, 15, np.zeros(18))
+
+    aligned = align_to_intervals(dam, rtm)
+
+    expected = [np.nan] * 2 + [10.0] * 4 + [np.nan] * 4 + [30.0] * 4 + [np.nan] * 4
+    np.testing.assert_array_equal(aligned, expected)
+
+
+def test_unsorted_source_is_aligned_by_timestamp():
+    dam = _frame(START, 2, 60, [10.0, 20.0]).iloc[::-1]
+    rtm = _frame(START, 8, 15, np.zeros(8))
+
+    assert align_to_intervals(dam, rtm).tolist() == [10.0] * 4 + [20.0] * 4
+
+
+def test_dam_rtm_hourly_dif_is_aligned_by_time():
+    dam = _frame(START, 2, 60, [10.0, 20.0])
+    rtm = _frame(START, 8, 15, np.ones(8))
+
+    dart = dam_rtm_hourly_dif(dam, rtm, ZoneInfo("US/Central"))
+
+    assert dart.columns.tolist() == ["interval_end_utc", "dart"]
+    assert dart["dart"].tolist() == [9.0] * 4 + [19.0] * 4
+
+
+def test_dart_for_many_nodes():
+    houston = _frame(START, 2, 60, [10.0, 20.0])
+    north = _frame(START, 2, 60, [1.0, 2.0])
+    rtm = _frame(START, 8, 15, np.ones(8))
+
+    darts = dam_rtm_dart_many({"HOUSTON": houston, "NORTH": north}, {"HOUSTON": rtm, "NORTH": rtm, "WEST": rtm})
+
+    assert list(darts) == ["HOUSTON", "NORTH"]
+    assert darts["NORTH"]["dart"].tolist() == [0.0] * 4 + [1.0] * 4
+
+
+def test_dart_matrix():
+    houston = PriceLocation("HB_HOUSTON", PriceLocationType.HUB)
+    north = PriceLocation("HB_NORTH", PriceLocationType.HUB)
+    west = PriceLocation("HB_WEST", PriceLocationType.HUB)
+    dam = PriceMatrix(PriceType.SPP, [north, houston], [[1.0, 2.0], [10.0, 20.0]], START, timedelta(hours=1))
+    rtm = PriceMatrix(
+        PriceType.SPP, [houston, north, west], np.ones((3, 6)), START + timedelta(minutes=30), timedelta(minutes=15),
+    )
+
+    dart = dart_matrix(dam, rtm)
+
+    assert dart.shape == (3, 6)
+    assert dart.start_time == rtm.start_time
+    np.testing.assert_array_equal(dart.values[0], [9.0, 9.0, 19.0, 19.0, 19.0, 19.0])
+    np.testing.assert_array_equal(dart.values[1], [0.0, 0.0, 1.0, 1.0, 1.0, 1.0])
+    assert np.isnan(dart.values[2]).all()
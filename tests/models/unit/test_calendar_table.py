@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from zoneinfo import ZoneInfo
+
+from price_analyzer.models import calendar_table
+from price_analyzer.models.calendar_table import calendar_features
+
+TIMEZONE = ZoneInfo("US/Central")
+
+
+def _expected(interval_end_utc: pd.Series, timezone: ZoneInfo) -> pd.DataFrame:
+    # the features the way they used to be computed, with the .dt accessors
+    local = interval_end_utc.dt.tz_convert(timezone)
+    return pd.DataFrame({
+        "hour": local.dt.hour,
+        "date": local.dt.date,
+        "day_of_week": local.dt.day_of_week,
+        "month": local.dt.month,
+        "year": local.dt.isocalendar().year,
+        "week_of_month": local.apply(lambda d: (d.day - 1) // 7 + 1),
+    })
+
+
+@pytest.mark.parametrize("start", [
+    "2024-03-09 00:00",  # spring forward
+    "2024-11-02 00:00",  # fall back
+    "2020-12-27 00:00",  # the ISO year is not the calendar year
+    "2010-01-01 00:00",  # first rows of the table
+])
+def test_features_match_the_dt_accessors(start):
+    interval_end_utc = pd.Series(pd.date_range(start, periods=4 * 24 * 3, freq="15min", tz="UTC"))
+
+    pd.testing.assert_frame_equal(
+        calendar_features(interval_end_utc, TIMEZONE), _expected(interval_end_utc, TIMEZONE),
+    )
+
+
+def test_timestamps_off_the_table():
+    interval_end_utc = pd.Series(
+        pd.to_datetime(["2009-12-31 23:00:00", "2024-10-01 06:00:30", "2045-06-01 12:00:00", "2024-10-01 06:05:00"], utc=True),
+        index=[10, 11, 12, 13],
+    )
+
+    features = calendar_features(interval_end_utc, TIMEZONE)
+
+    pd.testing.assert_frame_equal(features, _expected(interval_end_utc, TIMEZONE))
+
+
+def test_table_is_saved_and_memory_mapped(calendar_volume):
+    table = calendar_table.calendar_table(TIMEZONE)
+
+    assert isinstance(table, np.memmap)
+    assert len(table) == (calendar_table.CALENDAR_END - calendar_table.CALENDAR_START) // pd.Timedelta(minutes=5)
+    assert (calendar_volume / "US_Central.npy").exists()
+    assert calendar_table.calendar_table(TIMEZONE) is table
+
+
+def test_save_table_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "US_Central.npy"
+    table = calendar_table._calendar_rows(pd.date_range("2024-01-01", periods=3, freq="5min", tz="UTC"), TIMEZONE)
+
+    # a second build of the same table (e.g. another process) just replaces the first one
+    calendar_table._save_table(path, table)
+    calendar_table._save_table(path, table)
+
+    assert [file.name for file in tmp_path.iterdir()] == ["US_Central.npy"]
+    np.testing.assert_array_equal(np.load(path), table)
+
+
+def test_saved_table_is_readable_by_everyone(tmp_path):
+    path = tmp_path / "US_Central.npy"
+    table = calendar_table._calendar_rows(pd.date_range("2024-01-01", periods=3, freq="5min", tz="UTC"), TIMEZONE)
+
+    calendar_table._save_table(path, table)
+
+    assert path.stat().st_mode & 0o777 == 0o644 & ~calendar_table._umask()
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path, monkeypatch):
+    def failing_save(file_handler, table):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(calendar_table.np, "save", failing_save)
+    with pytest.raises(OSError):
+        calendar_table._save_table(tmp_path / "US_Central.npy", np.empty(0, dtype=calendar_table.CALENDAR_DTYPE))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_table_is_kept_in_memory_when_it_cannot_be_saved(tmp_path, monkeypatch):
+    built = calendar_table._calendar_rows(pd.date_range("2024-01-01", periods=3, freq="5min", tz="UTC"), TIMEZONE)
+
+    def read_only(path, table):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(calendar_table, "CALENDAR_TABLE_PATH", tmp_path / "read_only")
+    monkeypatch.setattr(calendar_table, "build_calendar_table", lambda timezone: built)
+    monkeypatch.setattr(calendar_table, "_save_table", read_only)
+
+    assert calendar_table.calendar_table(TIMEZONE) is built
+    assert calendar_table.calendar_table(TIMEZONE) is built
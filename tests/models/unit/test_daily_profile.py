@@ -0,0 +1,143 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from zoneinfo import ZoneInfo
+
+from price_analyzer.dtos.basic_types import PriceType
+from price_analyzer.dtos.prices import Price
+from price_analyzer.models.daily_profile import DailyProfileMatrix
+from price_analyzer.models.features import peak_offpeak_labels
+from price_analyzer.models.topk_stats import price_daily_stats_top_k
+from price_analyzer.models.volatility_measures import (
+    calc_price_vector_daily_mean,
+    calc_price_vector_volatility_variance,
+)
+
+TIMEZONE = ZoneInfo("US/Central")
+
+
+def _df(start: str, periods: int, freq: str = "1h") -> pd.DataFrame:
+    starts = pd.date_range(start, periods=periods, freq=freq, tz="UTC")
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta(freq),
+        "price": np.arange(periods, dtype=float),
+    })
+
+
+def test_from_frame_puts_each_day_on_a_row():
+    # US/Central midnight is 06:00 UTC in the winter
+    df = _df("2024-01-01 06:00", 48)
+
+    profile = DailyProfileMatrix.from_frame(df, TIMEZONE)
+
+    assert profile.shape == (2, 24)
+    assert profile.date_list() == [date(2024, 1, 1), date(2024, 1, 2)]
+    assert profile.values.flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(profile.values.ravel(), np.arange(48.0))
+    np.testing.assert_array_equal(profile.day_of_week, [0, 1])
+    np.testing.assert_array_equal(profile.daily_mean(), [11.5, 35.5])
+
+
+def test_dst_days_keep_the_same_width():
+    spring = DailyProfileMatrix.from_frame(_df("2024-03-10 06:00", 23), TIMEZONE)
+    fall = DailyProfileMatrix.from_frame(_df("2024-11-03 05:00", 25), TIMEZONE)
+
+    # no 2am on the spring day, and the two 1am of the fall day are averaged
+    assert spring.shape == (1, 24)
+    assert np.isnan(spring.values[0, 2]) and spring.mask.sum() == 23
+    assert fall.shape == (1, 24)
+    assert fall.values[0, 1] == 1.5
+    assert fall.complete_days.all()
+
+
+def test_gaps_are_nan_and_sub_intervals_are_averaged():
+    df = _df("2024-01-01 06:00", 4 * 48, freq="15min")
+    df = df.drop(index=range(4 * 24, 4 * 24 + 8))
+
+    profile = DailyProfileMatrix.from_frame(df, TIMEZONE, interval_minutes=60)
+
+    assert profile.shape == (2, 24)
+    assert np.isnan(profile.values[1, :2]).all()
+    assert profile.values[0, 0] == 1.5
+    assert not profile.complete_days[1]
+
+
+def test_by_interval_end_follows_the_hour_ending():
+    df = _df("2024-01-01 06:00", 24)
+
+    profile = DailyProfileMatrix.from_frame(df, TIMEZONE, by_interval_end=True)
+
+    # the hour ending at midnight is the first one of the next day
+    assert profile.date_list() == [date(2024, 1, 1), date(2024, 1, 2)]
+    assert np.isnan(profile.values[0, 0])
+    assert profile.values[1, 0] == 23.0
+
+    rows, columns = profile.locate(df)
+    np.testing.assert_array_equal(profile.values[rows, columns], df["price"].to_numpy())
+
+
+def test_from_price_matches_from_frame():
+    df = _df("2024-01-01 06:00", 4 * 48, freq="15min")
+    price = Price(
+        price_type=PriceType.SPP,
+        start_time=datetime(2024, 1, 1, 6),
+        interval_duration=timedelta(minutes=15),
+        values=df["price"].to_numpy(),
+    )
+
+    from_price = DailyProfileMatrix.from_price(price, TIMEZONE)
+    from_frame = DailyProfileMatrix.from_frame(df, TIMEZONE)
+
+    assert from_price.interval_minutes == 15
+    np.testing.assert_array_equal(from_price.values, from_frame.values)
+    np.testing.assert_array_equal(from_price.hourly().values, from_frame.hourly().values)
+
+
+def test_bad_shapes_are_rejected():
+    with pytest.raises(ValueError):
+        DailyProfileMatrix(np.array(["2024-01-01"], dtype="datetime64[D]"), np.zeros((1, 23)), 60, TIMEZONE, False)
+    with pytest.raises(ValueError):
+        DailyProfileMatrix.from_frame(_df("2024-01-01 06:00", 24), TIMEZONE, interval_minutes=7)
+
+
+def test_peak_labels_from_a_profile():
+    df = _df("2024-01-01 06:00", 24 * 5)
+    df["price"] = np.tile(np.r_[np.full(8, 10.0), np.full(8, 20.0), np.full(8, 30.0)], 5)
+    profile = DailyProfileMatrix.from_frame(df, TIMEZONE, interval_minutes=60, by_interval_end=True)
+
+    labels = peak_offpeak_labels(df, TIMEZONE, profile)
+
+    assert labels.equals(peak_offpeak_labels(df, TIMEZONE))
+    # the first and the last hours of the frame are days with missing hours
+    assert labels["price_period"].isna().sum() == 24
+    assert set(labels["price_period"].dropna()) == {"off_peak", "mid_peak", "peak"}
+
+
+def test_volatility_takes_a_profile():
+    df = _df("2024-01-01 06:00", 24 * 3)
+    profile = DailyProfileMatrix.from_frame(df, TIMEZONE)
+
+    base = calc_price_vector_daily_mean(profile, 24)
+
+    assert base == calc_price_vector_daily_mean(df["price"].to_numpy(), 24)
+    assert calc_price_vector_volatility_variance(profile, base) == pytest.approx(
+        calc_price_vector_volatility_variance(df["price"].to_numpy(), base)
+    )
+    with pytest.raises(ValueError):
+        calc_price_vector_daily_mean(profile, 96)
+
+
+def test_top_k_stats_take_a_profile():
+    df = _df("2024-01-01 06:00", 24 * 3)
+    profile = DailyProfileMatrix.from_frame(df, TIMEZONE, by_interval_end=True)
+
+    stats = price_daily_stats_top_k(profile, TIMEZONE)
+
+    # same days as the frame, the first day has no hour ending at midnight
+    assert stats["date"].tolist() == price_daily_stats_top_k(df, TIMEZONE)["date"].tolist()
+    assert stats["peak_top3_hours"].iloc[1] == [23, 22, 21]
+    assert stats["offpeak_bottom2_hours"].iloc[0] == [1, 2]
+    assert stats["mean_peak_top2"].iloc[1] == 45.5
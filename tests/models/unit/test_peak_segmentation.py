@@ -0,0 +1,81 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from zoneinfo import ZoneInfo
+from sklearn.cluster import KMeans
+
+from price_analyzer.models.features import peak_offpeak_labels
+from price_analyzer.models.peak_segmentation import _assign, _update_centers, peak_period_codes
+
+
+def _kmeans_codes(prices: np.ndarray) -> np.ndarray:
+    # the labels the per day KMeans used to give, ranked by the mean price of the clusters
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        labels = KMeans(n_clusters=3, random_state=42, n_init="auto").fit_predict(prices.reshape(-1, 1))
+    means = [prices[labels == cluster].mean() for cluster in range(3)]
+    ranks = np.empty(3, dtype=int)
+    ranks[np.argsort(means)] = range(3)
+    return ranks[labels]
+
+
+def _days(count: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    hours = np.arange(24)
+    days = 30 + 20 * np.sin((hours - 8) / 24 * 2 * np.pi) + rng.normal(0, 10, (count, 24))
+    days[rng.random(count) < 0.1, 18] += 400
+    return np.round(days, 2)
+
+
+@pytest.mark.parametrize("rounding", [0.01, 1.0, 5.0])
+def test_codes_match_kmeans(rounding):
+    days = np.round(_days(300) / rounding) * rounding
+
+    codes = peak_period_codes(days)
+
+    for day, day_codes in zip(days, codes):
+        np.testing.assert_array_equal(day_codes, _kmeans_codes(day))
+
+
+def test_empty_cluster_takes_the_farthest_hour():
+    x = np.array([[0.0, 1.0, 2.0, 10.0]])
+    # the first two centers are the same, so the second one gets no hour
+    centers = np.array([[0.0, 0.0, 10.0]])
+
+    labels = _assign(x, centers)
+    new_centers = _update_centers(x, centers, labels)
+
+    np.testing.assert_array_equal(labels, [[0, 0, 0, 2]])
+    # like sklearn, the hour farthest from its center (2.0) moves to the empty cluster
+    np.testing.assert_array_equal(new_centers, [[0.5, 2.0, 10.0]])
+
+
+def test_days_that_cannot_be_labeled():
+    days = _days(3)
+    days[1, 5] = np.nan
+    days[2] = np.where(np.arange(24) < 12, 10.0, 20.0)
+
+    codes = peak_period_codes(days)
+
+    assert (codes[0] >= 0).all()
+    assert (codes[1:] == -1).all()
+
+
+def test_peak_offpeak_labels_on_frame():
+    timezone = ZoneInfo("US/Central")
+    starts = pd.date_range("2024-10-01 04:00", periods=24 * 3 + 5, freq="1h", tz="UTC")
+    df = pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta("1h"),
+        "price": _days(4).ravel()[:len(starts)],
+    })
+
+    labels = peak_offpeak_labels(df, timezone)
+
+    assert labels.index.equals(df.index)
+    # the last 5 hours are on an incomplete day
+    assert labels["price_period"].isna().sum() == 5
+    assert set(labels["price_period"].dropna()) == {"off_peak", "mid_peak", "peak"}
+    day = labels["price_period"].iloc[:24].map({"off_peak": 0, "mid_peak": 1, "peak": 2}).to_numpy()
+    np.testing.assert_array_equal(day, _kmeans_codes(df["price"].iloc[:24].to_numpy()))
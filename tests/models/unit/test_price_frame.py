@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from zoneinfo import ZoneInfo
+
+from price_analyzer.models import features, price_frame
+from price_analyzer.models.price_frame import PriceFrame, as_price_frame
+from price_analyzer.models.price_stats import (
+    price_daily_stats,
+    price_hourly_variations,
+    price_stat_weekly_extended,
+    price_stat_weekly_weekday_separated,
+    price_weekly_stats,
+)
+
+TIMEZONE = ZoneInfo("US/Central")
+
+
+def _df(days: int = 14) -> pd.DataFrame:
+    starts = pd.date_range("2024-10-01 05:00", periods=24 * days, freq="1h", tz="UTC")
+    rng = np.random.default_rng(0)
+    hours = np.arange(len(starts)) % 24
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta("1h"),
+        "price": np.round(30 + 20 * np.sin((hours - 8) / 24 * 2 * np.pi) + rng.normal(0, 5, len(starts)), 2),
+    })
+
+
+def test_features_are_computed_once(monkeypatch):
+    calls = []
+    for name in ["local_time_date_hour", "weekly_monthly_info", "peak_offpeak_labels"]:
+        original = getattr(price_frame, name)
+        monkeypatch.setattr(
+            price_frame, name, lambda *args, _name=name, _original=original: calls.append(_name) or _original(*args),
+        )
+
+    frame = PriceFrame(_df(), TIMEZONE)
+    price_daily_stats(frame, TIMEZONE)
+    price_weekly_stats(frame, TIMEZONE)
+    price_stat_weekly_extended(frame, TIMEZONE)
+    price_stat_weekly_weekday_separated(frame, TIMEZONE)
+
+    assert sorted(calls) == ["local_time_date_hour", "peak_offpeak_labels", "weekly_monthly_info"]
+
+
+def test_stats_are_the_same_for_a_frame_and_a_price_frame():
+    df = _df()
+    frame = PriceFrame(df, TIMEZONE)
+
+    pd.testing.assert_frame_equal(price_daily_stats(df, TIMEZONE), price_daily_stats(frame, TIMEZONE))
+    pd.testing.assert_frame_equal(
+        price_stat_weekly_extended(df, TIMEZONE), price_stat_weekly_extended(frame, TIMEZONE),
+    )
+    pd.testing.assert_series_equal(
+        price_hourly_variations(df, TIMEZONE), price_hourly_variations(frame, TIMEZONE),
+    )
+
+
+def test_features_are_kept():
+    df = _df()
+    frame = PriceFrame(df, TIMEZONE)
+
+    pd.testing.assert_frame_equal(frame.week_info, features.weekly_monthly_info(df, TIMEZONE))
+    assert frame.hour_info is frame.hour_info
+    assert frame.price_period.index.equals(df.index)
+
+
+def test_as_price_frame():
+    df = _df(1)
+    frame = PriceFrame(df, TIMEZONE)
+
+    assert as_price_frame(frame, TIMEZONE) is frame
+    other = as_price_frame(frame, ZoneInfo("UTC"))
+    assert other is not frame and other.df is df
+    assert as_price_frame(df, TIMEZONE).df is df
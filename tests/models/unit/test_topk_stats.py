@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from zoneinfo import ZoneInfo
+
+from price_analyzer.models.price_stats import price_daily_stats_extended
+from price_analyzer.models.topk_stats import price_daily_stats_top_k, top_k_order, top_k_stats
+
+TIMEZONE = ZoneInfo("US/Central")
+
+
+def _df(days: int) -> pd.DataFrame:
+    starts = pd.date_range("2024-10-01 05:00", periods=24 * days, freq="1h", tz="UTC")
+    rng = np.random.default_rng(0)
+    # rounded so there are ties, and a few missing prices
+    prices = np.round(rng.normal(30, 10, len(starts)))
+    prices[[5, 30, 31]] = np.nan
+    return pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + pd.Timedelta("1h"),
+        "price": prices,
+    })
+
+
+def _reference(df: pd.DataFrame, k: int, largest: bool) -> pd.DataFrame:
+    # what the groupby/nlargest loop of price_daily_stats_extended used to give
+    local = df["interval_end_utc"].dt.tz_convert(TIMEZONE)
+    rows = []
+    for _, group in df.assign(date=local.dt.date, hour=local.dt.hour).groupby("date"):
+        picked = group["price"].nlargest(k) if largest else group["price"].nsmallest(k)
+        rows.append((picked.values.mean(), picked.values.std(), group.loc[picked.index, "hour"].tolist()))
+    return pd.DataFrame(rows, columns=["mean", "std", "hours"])
+
+
+def test_extended_stats_match_nlargest_and_nsmallest():
+    df = _df(10)
+
+    stats = price_daily_stats_extended(df, TIMEZONE)
+
+    assert stats.columns.tolist() == [
+        "date", "day_of_week",
+        "mean_peak_top3", "mean_peak_top2", "peak_top3_hours", "peak_top2_hours",
+        "mean_offpeak_bottom3", "mean_offpeak_bottom2", "offpeak_bottom3_hours", "offpeak_bottom2_hours",
+        "std_peak_top3", "std_peak_top2", "std_offpeak_bottom3", "std_offpeak_bottom2",
+    ]
+    for k in (3, 2):
+        for largest, name in [(True, f"peak_top{k}"), (False, f"offpeak_bottom{k}")]:
+            expected = _reference(df, k, largest)
+            np.testing.assert_array_equal(stats[f"mean_{name}"], expected["mean"])
+            np.testing.assert_array_equal(stats[f"std_{name}"], expected["std"])
+            assert stats[f"{name}_hours"].tolist() == expected["hours"].tolist()
+
+
+def test_any_k():
+    df = _df(3)
+
+    stats = price_daily_stats_top_k(df, TIMEZONE, top=(1, 5), bottom=(4,))
+
+    assert "mean_peak_top5" in stats and "offpeak_bottom4_hours" in stats
+    assert stats["mean_peak_top1"].tolist() == _reference(df, 1, True)["mean"].tolist()
+
+
+def test_top_k_on_a_node_matrix():
+    values = np.array([
+        [[1.0, 5.0, 5.0, 2.0], [np.nan, 3.0, np.nan, np.nan]],
+        [[4.0, 3.0, 2.0, 1.0], [np.nan] * 4],
+    ])
+
+    means, stds, positions = top_k_stats(values, top_k_order(values), 2)
+
+    np.testing.assert_array_equal(means, [[5.0, 3.0], [3.5, np.nan]])
+    np.testing.assert_array_equal(stds, [[0.0, 0.0], [0.5, np.nan]])
+    np.testing.assert_array_equal(positions, [[[1, 2], [1, -1]], [[0, 1], [-1, -1]]])
@@ -1,4 +1,9 @@
 import pytest
+import numpy as np
+from datetime import datetime, timedelta
+
+from price_analyzer.dtos.basic_types import PriceType
+from price_analyzer.dtos.prices import Price
 
 from price_analyzer.models.volatility_measures import (
     calc_price_vector_daily_mean,
@@ -47,4 +52,16 @@ def test_validate_inputs_invalid_base_daily_mean_vals_length():
     price_vector = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23, 24]
     base_daily_mean_vals = [1, 2, 3, 4, 5]
     with pytest.raises(ValueError):
-        _validate_inputs(price_vector, base_daily_mean_vals)
\ No newline at end of file
+        _validate_inputs(price_vector, base_daily_mean_vals)
+
+
+def test_volatility_from_price_and_array():
+    values = np.tile(np.arange(24, dtype=float), 3)
+    values[::24] += 1.0
+    price = Price(PriceType.SPP, values, datetime(2024, 10, 1), timedelta(hours=1))
+
+    daily_mean = calc_price_vector_daily_mean(price, 24)
+
+    assert daily_mean == calc_price_vector_daily_mean(values.tolist(), 24)
+    assert calc_price_vector_volatility_variance(price, daily_mean) == pytest.approx(0.0)
+    assert calc_price_vector_volatility_variance(values, daily_mean) == pytest.approx(0.0)
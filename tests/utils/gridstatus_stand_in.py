@@ -0,0 +1,174 @@
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Union
+
+from price_analyzer.data_client.api.gridstatus_price import DATASET_INTERVAL_MINUTES
+
+DATASET_MARKETS: Dict[str, str] = {
+    "ercot_spp_day_ahead_hourly": "DAY_AHEAD_HOURLY",
+    "ercot_spp_real_time_15_min": "REAL_TIME_15_MIN",
+    "ercot_lmp_by_settlement_point": "REAL_TIME_SCED",
+    "ercot_lmp_by_bus_dam": "DAY_AHEAD_HOURLY",
+    "ercot_as_prices": "DAM",
+}
+
+# mean levels of the AS products, the columns of ercot_as_prices
+AS_PRODUCT_LEVELS = {
+    "non_spinning_reserves": 5.0,
+    "regulation_down": 3.0,
+    "regulation_up": 8.0,
+    "responsive_reserves": 6.0,
+    "ecrs": 7.0,
+}
+
+LOCATION_TYPES = {
+    "HB_": "Trading Hub",
+    "LZ_": "Load Zone",
+}
+
+
+class GridStatusStandIn:
+    """
+    An offline stand-in for the GridStatusClient, to be passed as
+    GridStatusPriceClient(api_clinet=GridStatusStandIn()).
+    It honors dataset, start, end, limit and the location filter, and generates a
+    deterministic synthetic ERCOT SPP/LMP series, the price of a location at a given
+    interval is always the same whatever the query window is.
+    ercot_as_prices gives a wide record per interval with a column per AS product.
+    Latency and failures can be injected to load test the client.
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        seed: int = 0,
+    ):
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.calls: List[dict] = []
+        self._random = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def get_dataset(
+        self,
+        dataset: str,
+        start: str = None,
+        end: str = None,
+        limit: int = None,
+        filter_column: str = None,
+        filter_value: Union[str, List[str]] = None,
+        filter_operator: str = "=",
+        **kwargs,
+    ) -> pd.DataFrame:
+        with self._lock:
+            self.calls.append(dict(
+                dataset=dataset, start=start, end=end, limit=limit,
+                filter_column=filter_column, filter_value=filter_value,
+            ))
+            delay = self.latency_seconds + self.latency_jitter_seconds * self._random.random()
+            fails = self._random.random() < self.failure_rate
+
+        time.sleep(delay)
+        if fails:
+            # the gridstatusio client raises plain exceptions with the status code in the message
+            raise Exception(f"Error {self.failure_status}: injected failure")
+
+        if dataset not in DATASET_MARKETS:
+            raise Exception(f"Error 404: dataset {dataset} not found")
+
+        if dataset == "ercot_as_prices":
+            results = synthetic_as_prices(pd.Timestamp(start), pd.Timestamp(end))
+        else:
+            locations = _locations(filter_column, filter_value, filter_operator)
+            results = synthetic_prices(dataset, pd.Timestamp(start), pd.Timestamp(end), locations)
+        return results.iloc[:limit] if limit is not None else results
+
+
+def synthetic_prices(
+    dataset: str,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    locations: List[str],
+) -> pd.DataFrame:
+    """
+    the records of the locations for the intervals starting in [start, end),
+    sorted by time and then by location like the api does.
+    """
+    interval = pd.Timedelta(minutes=DATASET_INTERVAL_MINUTES[dataset])
+    start = _to_utc(start).ceil(interval)
+    starts = pd.date_range(start=start, end=_to_utc(end), freq=interval, inclusive="left")
+
+    interval_starts = np.repeat(starts.asi8, len(locations))
+    location_seeds = np.tile(
+        np.array([zlib.crc32(location.encode()) for location in locations], dtype=np.uint64),
+        len(starts),
+    )
+    hour_of_day = (interval_starts // 3_600_000_000_000) % 24
+    daily_shape = 30 + 15 * np.sin(2 * np.pi * (hour_of_day - 9) / 24)
+    location_offset = (location_seeds % 1000) / 100
+    noise = _hash_uniform(interval_starts, location_seeds) * 10 - 5
+    value_column = "spp" if "_spp_" in dataset else "lmp"
+
+    return pd.DataFrame({
+        "interval_start_utc": pd.to_datetime(interval_starts, utc=True),
+        "interval_end_utc": pd.to_datetime(interval_starts, utc=True) + interval,
+        "location": np.tile(np.array(locations, dtype=object), len(starts)),
+        "location_type": np.tile(np.array([_location_type(location) for location in locations], dtype=object), len(starts)),
+        "market": DATASET_MARKETS[dataset],
+        value_column: np.round(daily_shape + location_offset + noise, 2),
+    })
+
+
+def synthetic_as_prices(start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """
+    the hourly AS records for the intervals starting in [start, end), one wide record per interval.
+    """
+    interval = pd.Timedelta(hours=1)
+    starts = pd.date_range(start=_to_utc(start).ceil(interval), end=_to_utc(end), freq=interval, inclusive="left")
+    results = pd.DataFrame({
+        "interval_start_utc": starts,
+        "interval_end_utc": starts + interval,
+        "market": DATASET_MARKETS["ercot_as_prices"],
+    })
+    for i, (product, level) in enumerate(AS_PRODUCT_LEVELS.items()):
+        noise = _hash_uniform(starts.asi8, np.full(len(starts), i, dtype=np.uint64))
+        results[product] = np.round(level * (0.5 + noise), 2)
+    return results
+
+
+def _locations(filter_column: str, filter_value: Union[str, List[str]], filter_operator: str) -> List[str]:
+    if filter_column != "location" or filter_value is None:
+        return ["HB_HOUSTON"]
+    if filter_operator == "in":
+        return list(filter_value) if not isinstance(filter_value, str) else filter_value.split(",")
+    return [filter_value]
+
+
+def _location_type(location: str) -> str:
+    for prefix, location_type in LOCATION_TYPES.items():
+        if location.startswith(prefix):
+            return location_type
+    return "Resource Node"
+
+
+def _hash_uniform(interval_starts: np.ndarray, location_seeds: np.ndarray) -> np.ndarray:
+    # a small integer hash of (interval, location), so the values do not depend on the query window
+    x = (interval_starts.astype(np.uint64) // np.uint64(60_000_000_000)) ^ (location_seeds * np.uint64(0x9E3779B1))
+    x = (x ^ (x >> np.uint64(16))) * np.uint64(0x45D9F3B)
+    x = (x ^ (x >> np.uint64(16))) * np.uint64(0x45D9F3B)
+    x = x ^ (x >> np.uint64(16))
+    return (x % np.uint64(1_000_000)).astype(np.float64) / 1_000_000
+
+
+def _to_utc(timestamp: pd.Timestamp) -> pd.Timestamp:
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize("UTC")
+    return timestamp.tz_convert("UTC")